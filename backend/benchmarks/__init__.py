@@ -0,0 +1,12 @@
+"""Offline benchmarks for the backend; run from the backend directory with python -m.
+
+Importing the package makes server importable without a .env: the Mongo
+settings get benchmark defaults unless already set.
+"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'jaipur_benchmark')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
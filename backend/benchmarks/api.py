@@ -0,0 +1,214 @@
+"""End-to-end API benchmark against the FastAPI app, fully local.
+
+Requests go through httpx's ASGI transport straight into the app, with its
+startup and shutdown hooks run as under uvicorn. The database is either a
+local mongod (--mongo-url; the benchmark database is dropped and reseeded)
+or, by default, an in-memory Motor stand-in (needs mongomock-motor). The
+in-memory store is far slower than mongod on writes and large scans, so
+only compare runs made against the same backend.
+
+    cd backend && python -m benchmarks.api --orders 200 --items 5 --output run.json
+
+The result is JSON: the configuration, the commit, and p50/p95/p99 and
+throughput per scenario.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, List
+
+for _env in ('IMAGE_STORE_DIR', 'CACHE_DIR', 'JOB_STORE_DIR'):
+    os.environ.setdefault(_env, tempfile.mkdtemp(prefix=f"bench-{_env.lower()}-"))
+
+import httpx
+
+import server
+
+from .seed import SeedConfig, SeededData, products_workbook, seed_database
+from .stats import latency_summary
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class Scenario:
+    """One endpoint to benchmark; call(client, n) makes the n-th request"""
+
+    def __init__(self, name: str, call: Callable, requests: int, concurrency: int):
+        self.name = name
+        self.call = call
+        self.requests = requests
+        self.concurrency = concurrency
+
+
+def build_scenarios(data: SeededData, config: SeedConfig, args) -> List[Scenario]:
+    orders, products, quotations = data.order_ids, data.product_ids, data.quotation_ids
+    workbook = products_workbook(config)
+    statuses = ["Draft", "In Production", "Shipped"]
+
+    async def cold_export(client, n, fmt):
+        # Drop the rendered file first, so every request measures a real render
+        order_id = orders[n % len(orders)]
+        await server.export_cache.invalidate_order(order_id)
+        return await client.get(f"/api/orders/{order_id}/export/{fmt}")
+
+    scenarios = [
+        ("list_orders_page", lambda c, n: c.get("/api/orders", params={"limit": 50}), args.requests, args.concurrency),
+        ("list_orders_summary", lambda c, n: c.get("/api/orders", params={"fields": "summary"}), args.requests, args.concurrency),
+        ("list_orders_full", lambda c, n: c.get("/api/orders"), args.requests, args.concurrency),
+        ("list_products_page", lambda c, n: c.get("/api/products", params={"limit": 100}), args.requests, args.concurrency),
+        ("list_products_full", lambda c, n: c.get("/api/products"), args.requests, args.concurrency),
+        ("list_quotations", lambda c, n: c.get("/api/quotations", params={"limit": 50}), args.requests, args.concurrency),
+        ("get_order", lambda c, n: c.get(f"/api/orders/{orders[n % len(orders)]}"), args.requests, args.concurrency),
+        ("get_product", lambda c, n: c.get(f"/api/products/{products[n % len(products)]}"), args.requests, args.concurrency),
+        ("get_quotation", lambda c, n: c.get(f"/api/quotations/{quotations[n % len(quotations)]}"), args.requests, args.concurrency),
+        ("update_order", lambda c, n: c.put(
+            f"/api/orders/{orders[n % len(orders)]}", json={"status": statuses[n % len(statuses)]}
+        ), args.requests, args.concurrency),
+        ("update_product", lambda c, n: c.put(
+            f"/api/products/{products[n % len(products)]}", json={"fob_price_usd": 100 + n}
+        ), args.requests, args.concurrency),
+        ("export_pdf_cold", lambda c, n: cold_export(c, n, "pdf"), args.export_requests, args.concurrency),
+        ("export_pdf_cached", lambda c, n: c.get(f"/api/orders/{orders[0]}/export/pdf"), args.requests, args.concurrency),
+        ("export_ppt_cold", lambda c, n: cold_export(c, n, "ppt"), args.export_requests, args.concurrency),
+        # Upsert: the first pass inserts the rows, later passes compare them
+        ("import_products_upsert", lambda c, n: c.post(
+            "/api/products/upload-excel", params={"mode": "upsert"},
+            files={"file": ("products.xlsx", workbook, XLSX_TYPE)}
+        ), args.import_requests, 1),
+    ]
+    selected = set(args.scenarios.split(',')) if args.scenarios else None
+    return [Scenario(*spec) for spec in scenarios if selected is None or spec[0] in selected]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, warmup: int) -> dict:
+    for n in range(warmup):
+        await scenario.call(client, n)
+
+    latencies = []
+    statuses = Counter()
+    sizes = []
+    semaphore = asyncio.Semaphore(scenario.concurrency)
+
+    async def one(n: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await scenario.call(client, warmup + n)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] += 1
+            sizes.append(len(response.content))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(scenario.requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": scenario.requests,
+        "concurrency": scenario.concurrency,
+        **latency_summary(latencies),
+        "throughput_rps": round(scenario.requests / elapsed, 2) if elapsed else None,
+        "statuses": dict(statuses),
+        "errors": sum(count for status, count in statuses.items() if not status.startswith('2')),
+        "mean_response_bytes": round(sum(sizes) / len(sizes)) if sizes else 0,
+    }
+
+
+def use_database(mongo_url: str, db_name: str) -> str:
+    """Point the app at mongod, or at the in-memory stand-in when mongo_url is empty"""
+    if mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        server.client = AsyncIOMotorClient(mongo_url, event_listeners=[server.MongoCommandTimer()])
+        backend = "mongod"
+    else:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("The in-memory backend needs mongomock-motor (pip install mongomock-motor), or pass --mongo-url")
+        server.client = AsyncMongoMockClient()
+        backend = "memory"
+    server.db = server.client[db_name]
+    return backend
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+async def run(args) -> dict:
+    config = SeedConfig(
+        products=args.products, orders=args.orders, items_per_order=args.items, image_kb=args.image_kb,
+        library_items=args.library_items, quotations=args.quotations, import_rows=args.import_rows, seed=args.seed,
+    )
+    backend = use_database(args.mongo_url, args.db_name)
+    await server.client.drop_database(args.db_name)
+
+    await server.app.router.startup()
+    try:
+        seed_start = time.perf_counter()
+        data = await seed_database(server.db, config)
+        await server.rebuild_order_counters()
+        seed_seconds = time.perf_counter() - seed_start
+
+        results = {}
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for scenario in build_scenarios(data, config, args):
+                results[scenario.name] = await run_scenario(client, scenario, args.warmup)
+    finally:
+        await server.app.router.shutdown()
+        if args.mongo_url:
+            await server.client.drop_database(args.db_name)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "backend": backend,
+        "config": {**vars(config), "warmup": args.warmup, "render_workers": server.RENDER_WORKERS},
+        "seed_seconds": round(seed_seconds, 2),
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-url", default="", help="local mongod to use instead of the in-memory stand-in")
+    parser.add_argument("--db-name", default="jaipur_benchmark", help="dropped and reseeded on every run")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--items", type=int, default=5, help="items per order and quotation")
+    parser.add_argument("--image-kb", type=int, default=100, help="approximate size of each image; 0 for none")
+    parser.add_argument("--library-items", type=int, default=30, help="leather and finish entries each")
+    parser.add_argument("--quotations", type=int, default=50)
+    parser.add_argument("--import-rows", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=50, help="timed requests per scenario")
+    parser.add_argument("--export-requests", type=int, default=10)
+    parser.add_argument("--import-requests", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=2, help="untimed requests before each scenario")
+    parser.add_argument("--scenarios", default="", help="comma-separated subset of scenario names")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Renderer micro-benchmarks: generate_pdf and generate_ppt on fixture orders.
+
+No HTTP and no Mongo: each case builds its order in a fresh process and
+calls the renderer directly, so peak RSS belongs to that case alone.
+Cases cover 1, 10 and 100 items, "plain" (no images, no swatches, a short
+note) and "rich" (camera-sized product photos, leather and finish
+swatches, long HTML notes).
+
+    cd backend && python -m benchmarks.renderers --update-baseline
+    cd backend && python -m benchmarks.renderers          # exits 1 on a regression
+
+Timings depend on the machine, so record the baseline on the box that
+runs the comparison. The baseline also records the fixture config; a run
+with a different config, or with cases or metrics the baseline lacks,
+fails rather than passing unchecked.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+os.environ.setdefault('IMAGE_STORE_DIR', tempfile.mkdtemp(prefix="bench-images-"))
+
+import server
+
+from .seed import make_image, make_photo
+
+RENDERERS = {"pdf": server.generate_pdf, "ppt": server.generate_ppt}
+ITEM_COUNTS = (1, 10, 100)
+VARIANTS = ("plain", "rich")
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "renderers.json"
+
+LONG_NOTES = "".join(
+    f"<p><b>Section {n}.</b> Solid wood frame, hand-rubbed finish and "
+    f"<i>antique brass</i> hardware; pack with corner guards.</p>"
+    f"<ul><li>Check joinery before finishing</li><li>Two coats of sealer</li></ul>"
+    for n in range(12)
+)
+
+
+def fixture_order(items: int, variant: str, photo_px: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    rich = variant == "rich"
+    photos = [server.store_image_bytes(make_photo(rng, photo_px, photo_px * 3 // 4)) for _ in range(6)] if rich else []
+    swatches = [server.store_image_bytes(make_photo(rng, photo_px // 4, photo_px // 4)) for _ in range(4)] if rich else []
+    order_items = []
+    for n in range(items):
+        item = server.OrderItem(
+            product_code=f"BENCH-{n:03d}",
+            description="Mango wood sideboard with three drawers",
+            category="Sideboard",
+            height_cm=85, depth_cm=45, width_cm=160, cbm=0.61,
+            quantity=n % 7 + 1,
+            leather_code="LTH-01" if rich else "",
+            finish_code="FIN-07" if rich else "",
+            notes=LONG_NOTES if rich else "Natural finish",
+        )
+        if rich:
+            item.images = rng.sample(photos, 3)
+            item.leather_image = rng.choice(swatches)
+            item.finish_image = rng.choice(swatches)
+        order_items.append(item)
+    return server.Order(
+        sales_order_ref="SO-BENCH", buyer_po_ref="PO-1", buyer_name="Benchmark Buyer",
+        factory="Jaipur", items=order_items,
+    ).model_dump()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure_case(renderer: str, items: int, variant: str, photo_px: int, repeat: int, seed: int) -> dict:
+    """Runs in its own process; the first render is reported apart as the cold one"""
+    order = fixture_order(items, variant, photo_px, seed)
+    settings = server.TemplateSettings().model_dump()
+    logo = make_image(random.Random(seed + 1), 40)
+    rss_before = peak_rss_mb()
+
+    timings = []
+    size = 0
+    for _ in range(repeat + 1):
+        start = time.perf_counter()
+        output = RENDERERS[renderer](order, settings, logo)
+        timings.append(time.perf_counter() - start)
+        size = len(output)
+    return {
+        "cold_ms": round(timings[0] * 1000, 1),
+        "wall_ms": round(statistics.median(timings[1:] or timings) * 1000, 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+        "size_bytes": size,
+    }
+
+
+def run_cases(args) -> dict:
+    renderers = args.renderers.split(',')
+    item_counts = [int(count) for count in args.items.split(',')]
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for renderer in renderers:
+        for items in item_counts:
+            for variant in VARIANTS:
+                name = f"{renderer}_{items}_{variant}"
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    results[name] = executor.submit(
+                        measure_case, renderer, items, variant, args.photo_px, args.repeat, args.seed
+                    ).result()
+                print(f"{name}: {results[name]}", file=sys.stderr)
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, thresholds: dict) -> tuple:
+    """Cases whose metric grew past baseline * (1 + threshold).
+    
+    Returns (regressions, unchecked); unchecked lists the case/metric pairs
+    the baseline has no value for, which the caller treats as a failure.
+    """
+    regressions = []
+    unchecked = []
+    for name, metrics in results.items():
+        reference = baseline.get(name) or {}
+        for metric, threshold in thresholds.items():
+            before, after = reference.get(metric), metrics.get(metric)
+            if before is None or after is None:
+                unchecked.append({"case": name, "metric": metric})
+            elif after > before * (1 + threshold):
+                regressions.append({
+                    "case": name, "metric": metric, "baseline": before, "current": after,
+                    "change": round(after / before - 1, 3) if before else None, "threshold": threshold,
+                })
+    return regressions, unchecked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renderers", default="pdf,ppt")
+    parser.add_argument("--items", default=",".join(str(count) for count in ITEM_COUNTS))
+    parser.add_argument("--photo-px", type=int, default=2400, help="long edge of each product photo, in pixels")
+    parser.add_argument("--repeat", type=int, default=3, help="warm renders per case after the cold one")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--max-time-regression", type=float, default=0.25, help="allowed wall_ms growth, as a fraction")
+    parser.add_argument("--max-cold-regression", type=float, default=0.30, help="allowed cold_ms growth")
+    parser.add_argument("--max-rss-regression", type=float, default=0.20, help="allowed peak_rss_mb growth")
+    parser.add_argument("--max-size-regression", type=float, default=0.10, help="allowed size_bytes growth")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    config = {"photo_px": args.photo_px, "repeat": args.repeat, "seed": args.seed}
+    results = run_cases(args)
+    report = {"config": config, "cases": results}
+
+    exit_code = 0
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({"config": config, "cases": results}, indent=2) + "\n")
+        report["baseline"] = f"updated {args.baseline}"
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        thresholds = {
+            "wall_ms": args.max_time_regression,
+            "cold_ms": args.max_cold_regression,
+            "peak_rss_mb": args.max_rss_regression,
+            "size_bytes": args.max_size_regression,
+        }
+        if baseline.get("config") != config:
+            # Output size tracks the fixture photos, so a different config is not comparable
+            report["baseline"] = f"recorded with config {baseline.get('config')}; rerun with it or --update-baseline"
+            exit_code = 1
+        else:
+            report["regressions"], report["unchecked"] = find_regressions(results, baseline["cases"], thresholds)
+            exit_code = 1 if report["regressions"] or report["unchecked"] else 0
+    else:
+        report["baseline"] = f"none at {args.baseline}; run with --update-baseline to record one"
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
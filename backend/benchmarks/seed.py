@@ -0,0 +1,231 @@
+"""Seeded synthetic catalog, orders and quotations for the benchmarks.
+
+The same seed always produces the same documents, images and workbook, so
+runs on different commits measure the same data.
+"""
+import io
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from openpyxl import Workbook
+from PIL import Image as PILImage
+
+import server
+
+CATEGORIES = ["Dining Table", "Coffee Table", "Sideboard", "Chair", "Bench", "Console", "Bookshelf"]
+WOODS = ["Mango", "Acacia", "Sheesham", "Teak", "Oak"]
+COLORS = ["Natural", "Walnut", "Black", "White Wash", "Honey"]
+
+
+@dataclass
+class SeedConfig:
+    products: int = 500
+    orders: int = 200
+    items_per_order: int = 5
+    image_kb: int = 100
+    library_items: int = 30
+    quotations: int = 50
+    import_rows: int = 200
+    seed: int = 42
+
+
+@dataclass
+class SeededData:
+    product_ids: List[str] = field(default_factory=list)
+    order_ids: List[str] = field(default_factory=list)
+    quotation_ids: List[str] = field(default_factory=list)
+
+
+def seeded_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def make_image(rng: random.Random, size_kb: int) -> bytes:
+    """A noise JPEG of roughly size_kb; noise barely compresses, so pixels track bytes"""
+    side = max(8, int((size_kb * 1024 / 1.1) ** 0.5))
+    pixels = rng.randbytes(side * side * 3)
+    buffer = io.BytesIO()
+    PILImage.frombytes('RGB', (side, side), pixels).save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def make_photo(rng: random.Random, width: int, height: int) -> bytes:
+    """A camera-like JPEG: smooth colour fields with fine grain.
+
+    Unlike make_image's noise, this compresses like a real photo, so a
+    large image is many pixels but modest bytes; a renderer that embeds it
+    unscaled shows up as a jump in output size.
+    """
+    fields = PILImage.frombytes('RGB', (8, 6), rng.randbytes(8 * 6 * 3)).resize((width, height), PILImage.BICUBIC)
+    grain_size = (max(1, width // 4), max(1, height // 4))
+    grain = PILImage.frombytes('RGB', grain_size, rng.randbytes(grain_size[0] * grain_size[1] * 3))
+    photo = PILImage.blend(fields, grain.resize((width, height), PILImage.BILINEAR), 0.15)
+    buffer = io.BytesIO()
+    photo.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def timestamps(count: int, start: datetime):
+    """Distinct, descending created_at values so keyset pagination is deterministic"""
+    return [(start - timedelta(seconds=n)).isoformat() for n in range(count)]
+
+
+def product_docs(rng: random.Random, config: SeedConfig, images: List[str]) -> List[dict]:
+    docs = []
+    now = datetime.now(timezone.utc)
+    for n, created_at in enumerate(timestamps(config.products, now)):
+        category = rng.choice(CATEGORIES)
+        height, depth, width = rng.randint(40, 200), rng.randint(30, 100), rng.randint(40, 240)
+        product = server.Product(
+            id=seeded_id(rng),
+            product_code=f"{category[:3].upper()}-{n:05d}",
+            description=f"{rng.choice(WOODS)} wood {category.lower()}",
+            category=category,
+            size=f"{width}*{depth} cm",
+            height_cm=height, depth_cm=depth, width_cm=width,
+            cbm=round(height * depth * width / 1_000_000, 3),
+            fob_price_usd=rng.randint(50, 900),
+            image=rng.choice(images) if images else "",
+            created_at=created_at, updated_at=created_at,
+        )
+        docs.append(server.with_product_keys(product.model_dump()))
+    return docs
+
+
+def library_docs(rng: random.Random, model, prefix: str, config: SeedConfig, images: List[str]) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        model(
+            id=seeded_id(rng),
+            code=f"{prefix}-{n:03d}",
+            name=f"{rng.choice(COLORS)} {prefix.lower()}",
+            color=rng.choice(COLORS),
+            image=rng.choice(images) if images else "",
+            created_at=created_at,
+        ).model_dump()
+        for n, created_at in enumerate(timestamps(config.library_items, now))
+    ]
+
+
+def order_docs(rng: random.Random, config: SeedConfig, products: List[dict], leathers: List[dict],
+               finishes: List[dict], images: List[str]) -> List[dict]:
+    docs = []
+    now = datetime.now(timezone.utc)
+    for n, created_at in enumerate(timestamps(config.orders, now)):
+        items = []
+        for _ in range(config.items_per_order):
+            product = rng.choice(products)
+            leather = rng.choice(leathers) if leathers else {}
+            finish = rng.choice(finishes) if finishes else {}
+            items.append(server.OrderItem(
+                id=seeded_id(rng),
+                product_code=product['product_code'],
+                description=product['description'],
+                category=product['category'],
+                height_cm=product['height_cm'], depth_cm=product['depth_cm'], width_cm=product['width_cm'],
+                cbm=product['cbm'],
+                quantity=rng.randint(1, 20),
+                leather_code=leather.get('code', ''), leather_image=leather.get('image', ''),
+                finish_code=finish.get('code', ''), finish_image=finish.get('image', ''),
+                notes="<p>Hand finished, <b>no</b> lacquer on the top.</p>",
+                images=[rng.choice(images)] if images else [],
+            ))
+        order = server.Order(
+            id=seeded_id(rng),
+            sales_order_ref=f"SO-{n:05d}",
+            buyer_po_ref=f"PO-{rng.randint(1000, 9999)}",
+            buyer_name=f"Buyer {n % 17}",
+            status=rng.choice(["Draft", "In Production", "Shipped"]),
+            factory=f"Factory {n % 5}",
+            items=items,
+            created_at=created_at, updated_at=created_at,
+        )
+        docs.append(order.model_dump())
+    return docs
+
+
+def quotation_docs(rng: random.Random, config: SeedConfig, products: List[dict]) -> List[dict]:
+    docs = []
+    now = datetime.now(timezone.utc)
+    for n, created_at in enumerate(timestamps(config.quotations, now)):
+        items = []
+        for product in rng.sample(products, min(len(products), config.items_per_order)):
+            quantity = rng.randint(1, 20)
+            items.append(server.QuotationItem(
+                id=seeded_id(rng),
+                product_id=product['id'],
+                product_code=product['product_code'],
+                description=product['description'],
+                height_cm=product['height_cm'], depth_cm=product['depth_cm'], width_cm=product['width_cm'],
+                cbm=product['cbm'],
+                quantity=quantity,
+                fob_price=product['fob_price_usd'],
+                total=product['fob_price_usd'] * quantity,
+                image=product['image'],
+            ))
+        quotation = server.Quotation(
+            id=seeded_id(rng),
+            reference=f"QT-{n:05d}",
+            customer_name=f"Customer {n % 11}",
+            items=items,
+            total_items=sum(item.quantity for item in items),
+            total_cbm=round(sum(item.cbm * item.quantity for item in items), 3),
+            total_value=sum(item.total for item in items),
+            created_at=created_at, updated_at=created_at,
+        )
+        docs.append(quotation.model_dump())
+    return docs
+
+
+async def seed_database(db, config: SeedConfig) -> SeededData:
+    """Fill db with the synthetic data set; images go to the configured image store"""
+    rng = random.Random(config.seed)
+    images = []
+    if config.image_kb > 0:
+        # A small pool of distinct images, shared the way real catalogs reuse photos
+        images = [server.store_image_bytes(make_image(rng, config.image_kb)) for _ in range(10)]
+
+    products = product_docs(rng, config, images)
+    leathers = library_docs(rng, server.LeatherLibraryItem, "LEATHER", config, images)
+    finishes = library_docs(rng, server.FinishLibraryItem, "FINISH", config, images)
+    orders = order_docs(rng, config, products, leathers, finishes, images)
+    quotations = quotation_docs(rng, config, products)
+
+    for collection, docs in (
+        (db.products, products), (db.leather_library, leathers), (db.finish_library, finishes),
+        (db.orders, orders), (db.quotations, quotations),
+    ):
+        if docs:
+            # insert_many adds _id to the dicts it is given
+            await collection.insert_many([dict(doc) for doc in docs])
+
+    return SeededData(
+        product_ids=[doc['id'] for doc in products],
+        order_ids=[doc['id'] for doc in orders],
+        quotation_ids=[doc['id'] for doc in quotations],
+    )
+
+
+def products_workbook(config: SeedConfig) -> bytes:
+    """A products sheet laid out like the real ones: a title row, then the headers"""
+    rng = random.Random(config.seed + 1)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Products"
+    sheet.append(["JAIPUR Product List"])
+    sheet.append(["Product Code", "Description", "Size ( in Cm )", "H", "D", "W", "CBM",
+                  "FOB India Price $", "FOB India Price £", "Photo Link"])
+    for n in range(config.import_rows):
+        category = rng.choice(CATEGORIES)
+        height, depth, width = rng.randint(40, 200), rng.randint(30, 100), rng.randint(40, 240)
+        sheet.append([
+            f"IMP-{n:05d}", f"{rng.choice(WOODS)} wood {category.lower()}", f"{width}*{depth} cm",
+            height, depth, width, round(height * depth * width / 1_000_000, 3),
+            rng.randint(50, 900), rng.randint(40, 700), "",
+        ])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
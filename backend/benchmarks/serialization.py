@@ -0,0 +1,83 @@
+"""Response serialization benchmark for a page of orders.
+
+Compares the validated path (documents re-validated against List[Order],
+jsonable_encoder, stdlib json) with the trusted orjson path read endpoints
+now use. No database is needed; the documents are synthetic.
+
+    cd backend && python -m benchmarks.serialization --orders 1000 --runs 50
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import server
+
+from .stats import latency_summary
+
+
+def make_orders(count: int, items_per_order: int) -> List[dict]:
+    """Orders shaped like stored documents, with image URLs rather than inline data"""
+    orders = []
+    for n in range(count):
+        items = [
+            server.OrderItem(
+                product_code=f"JF-{n:04d}-{i}",
+                description="Solid mango wood sideboard with brass handles",
+                category="Sideboard",
+                height_cm=85, depth_cm=45, width_cm=160, cbm=0.61,
+                quantity=i + 1,
+                leather_code="LTH-01", finish_code="FIN-07",
+                notes="<p>Natural finish, <b>no</b> lacquer on the top.</p>",
+                images=[f"/api/images/{uuid.uuid4().hex}.jpg"],
+            )
+            for i in range(items_per_order)
+        ]
+        order = server.Order(sales_order_ref=f"SO-{n:05d}", buyer_name="Buyer", factory="Jaipur", items=items)
+        orders.append(order.model_dump())
+    return orders
+
+
+async def measure(docs: List[dict], runs: int) -> dict:
+    field = create_response_field(name="response", type_=List[server.Order])
+
+    async def validated() -> bytes:
+        content = await serialize_response(field=field, response_content=docs)
+        return JSONResponse(content=content).body
+
+    async def trusted() -> bytes:
+        return server.trusted_response(docs).body
+
+    results = {}
+    for name, render in (("validated", validated), ("trusted", trusted)):
+        await render()  # warm-up
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            body = await render()
+            samples.append(time.perf_counter() - start)
+        results[name] = {**latency_summary(samples), "bytes": len(body)}
+    results["p99_reduction"] = round(1 - results["trusted"]["p99_ms"] / results["validated"]["p99_ms"], 3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=5, help="items per order")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    docs = make_orders(args.orders, args.items)
+    results = asyncio.run(measure(docs, args.runs))
+    print(json.dumps({"orders": args.orders, "items_per_order": args.items, "runs": args.runs, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
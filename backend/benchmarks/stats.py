@@ -0,0 +1,23 @@
+"""Latency summaries shared by the benchmarks"""
+import statistics
+from typing import List
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sample"""
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def latency_summary(samples: List[float]) -> dict:
+    """p50/p95/p99/mean/max in milliseconds for samples given in seconds"""
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    to_ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "p50_ms": to_ms(percentile(ordered, 0.50)),
+        "p95_ms": to_ms(percentile(ordered, 0.95)),
+        "p99_ms": to_ms(percentile(ordered, 0.99)),
+        "mean_ms": to_ms(statistics.fmean(ordered)),
+        "max_ms": to_ms(ordered[-1]),
+    }
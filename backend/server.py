@@ -1,9 +1,13 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Depends, Request, Query
+from fastapi.responses import StreamingResponse, FileResponse, Response, JSONResponse, ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, PyMongoError, DuplicateKeyError, OperationFailure
 import os
 import logging
 from pathlib import Path
@@ -20,6 +24,9 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import Paragraph, Table, TableStyle
+from reportlab.lib.utils import ImageReader
+from PIL import Image as PILImage
+from openpyxl import load_workbook
 from pptx import Presentation
 from pptx.util import Inches, Pt
 import re
@@ -28,6 +35,24 @@ import pandas as pd
 import httpx
 import jwt
 import hashlib
+import copy
+import zlib
+import brotli
+import json
+import asyncio
+import shutil
+import itertools
+import time
+import zipfile
+import multiprocessing
+import threading
+import contextvars
+import socket
+import sys
+from urllib.parse import parse_qsl
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -55,13 +80,702 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+# ============ METRICS ============
+
+# In-process metrics served in Prometheus text format at /api/metrics. Each
+# process keeps its own: deploy/install.sh starts a single uvicorn process,
+# so one scrape sees everything there. Under `uvicorn --workers N` (or
+# several replicas) a scrape sees only the worker that answered it; scrape
+# each worker on its own port, or move these to a shared store first.
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def metric_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{metric_labels(self.label_names, labels)} {value}")
+        return lines
+
+class Gauge(Counter):
+    def set(self, labels: tuple, value: float):
+        with self._lock:
+            self._values[labels] = value
+    
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    """Latency histogram with one series per label tuple.
+    
+    Observations may come from Motor's executor threads, hence the lock.
+    """
+    
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple = METRICS_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, labels: tuple, seconds: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series["buckets"][i] += 1
+                    break
+            series["sum"] += seconds
+            series["count"] += 1
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        bucket_names = self.label_names + ('le',)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{metric_labels(bucket_names, labels + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_bucket{metric_labels(bucket_names, labels + ('+Inf',))} {series['count']}")
+                lines.append(f"{self.name}_sum{metric_labels(self.label_names, labels)} {series['sum']:.6f}")
+                lines.append(f"{self.name}_count{metric_labels(self.label_names, labels)} {series['count']}")
+        return lines
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ('method', 'route', 'handler', 'status'))
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the last body chunk is sent", ('method', 'route', 'handler'))
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ('command', 'collection', 'outcome'))
+outbound_http_duration = Histogram(
+    "outbound_http_duration_seconds", "Outbound httpx request latency", ('target', 'status'))
+render_duration = Histogram(
+    "render_duration_seconds", "PDF/PPT render latency, including time queued for a worker", ('format', 'outcome'))
+render_queue_pending = Gauge(
+    "render_queue_pending", "Renders queued or running in the worker pool", ())
+product_cache_lookups = Counter(
+    "product_cache_lookups_total", "Product cache lookups by result", ('result',))
+product_cache_bytes = Gauge(
+    "product_cache_bytes", "Approximate memory held by cached products", ())
+
+METRICS = [
+    http_requests_total, http_request_duration, mongo_command_duration,
+    outbound_http_duration, render_duration, render_queue_pending,
+    product_cache_lookups, product_cache_bytes,
+]
+
+def render_metrics() -> str:
+    return '\n'.join(line for metric in METRICS for line in metric.render()) + '\n'
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Times every command the Motor client sends"""
+    
+    def __init__(self):
+        self._collections = {}
+    
+    def started(self, event):
+        name = event.command_name
+        collection = event.command.get('collection' if name == 'getMore' else name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ''
+    
+    def _observe(self, event, outcome: str):
+        collection = self._collections.pop(event.request_id, '')
+        mongo_command_duration.observe((event.command_name, collection, outcome), event.duration_micros / 1e6)
+    
+    def succeeded(self, event):
+        self._observe(event, 'ok')
+    
+    def failed(self, event):
+        self._observe(event, 'error')
+
+class MetricsMiddleware:
+    """Counts requests and times them per route template and handler"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+        
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            handler = getattr(getattr(route, "endpoint", None), "__name__", "unmatched")
+            http_requests_total.inc((scope["method"], path, handler, str(status)))
+            http_request_duration.observe((scope["method"], path, handler), time.perf_counter() - start)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandTimer()])
 db = client[os.environ['DB_NAME']]
 
+# ============ IMAGE STORE ============
+
+# Content-addressed image blobs keyed by SHA-256
+IMAGE_STORE_DIR = Path(os.environ.get('IMAGE_STORE_DIR', str(ROOT_DIR / 'image_store')))
+IMAGE_HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+
+# Single-value and list-valued fields that may hold an image (data URI or hash)
+IMAGE_FIELDS = ('image', 'product_image', 'leather_image', 'finish_image', 'logo_image')
+IMAGE_LIST_FIELDS = ('images', 'reference_images')
+
+# Collections whose documents carry image fields
+IMAGE_COLLECTIONS = ('orders', 'products', 'leather_library', 'finish_library', 'quotations')
+
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+]
+# Only these are stored and served inline; SVG can carry script, so it is not one
+RASTER_IMAGE_TYPES = {content_type for _, content_type in IMAGE_SIGNATURES} | {'image/webp'}
+
+def image_path(image_hash: str) -> Path:
+    """Location of a blob in the image store (fanned out by hash prefix)"""
+    return IMAGE_STORE_DIR / image_hash[:2] / image_hash
+
+def store_image_bytes(data: bytes) -> str:
+    """Write image bytes to the store (if not already there) and return the hash"""
+    image_hash = hashlib.sha256(data).hexdigest()
+    path = image_path(image_hash)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{image_hash}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    return image_hash
+
+def externalize_image(value):
+    """Move an inline base64 data URI into the image store, returning its hash.
+    
+    Only raster images are stored; anything else (SVG in particular) is left
+    as it was, so the store never serves a document a browser would run.
+    """
+    if not isinstance(value, str) or not value.startswith('data:'):
+        return value
+    header, _, payload = value.partition(',')
+    if not header.endswith(';base64') or not payload:
+        return value
+    try:
+        data = base64.b64decode(payload)
+    except Exception:
+        return value
+    if sniff_image_type(data[:32]) not in RASTER_IMAGE_TYPES:
+        return value
+    return store_image_bytes(data)
+
+def externalize_images(doc: dict) -> dict:
+    """Replace inline data URIs in a document (and its items) with image hashes"""
+    for field in IMAGE_FIELDS:
+        if field in doc:
+            doc[field] = externalize_image(doc[field])
+    for field in IMAGE_LIST_FIELDS:
+        if isinstance(doc.get(field), list):
+            doc[field] = [externalize_image(v) for v in doc[field]]
+    if isinstance(doc.get('items'), list):
+        for item in doc['items']:
+            if isinstance(item, dict):
+                externalize_images(item)
+    return doc
+
+def load_image_bytes(value) -> Optional[bytes]:
+    """Resolve an image field (store hash or legacy data URI) to raw bytes"""
+    if not value or not isinstance(value, str):
+        return None
+    if IMAGE_HASH_RE.match(value):
+        try:
+            return image_path(value).read_bytes()
+        except OSError:
+            return None
+    if value.startswith('data:image'):
+        try:
+            return base64.b64decode(value.split(',', 1)[1])
+        except Exception:
+            return None
+    return None
+
+def sniff_image_type(head: bytes) -> str:
+    """Guess the content type of stored image bytes from their magic number"""
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head.lstrip().startswith((b'<svg', b'<?xml')):
+        return 'image/svg+xml'
+    return 'application/octet-stream'
+
+# ============ OUTBOUND HTTP ============
+
+# Shared connection pool for fetching "Photo Link" images during imports
+IMPORT_FETCH_CONCURRENCY = int(os.environ.get('IMPORT_FETCH_CONCURRENCY', '16'))
+IMPORT_FETCH_PER_HOST = int(os.environ.get('IMPORT_FETCH_PER_HOST', '4'))
+IMPORT_FETCH_TIMEOUT = float(os.environ.get('IMPORT_FETCH_TIMEOUT', '10'))
+
+http_client = None
+fetch_semaphore = None
+host_semaphores = {}
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared, pooled outbound client (created on first use)"""
+    global http_client, fetch_semaphore
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            timeout=IMPORT_FETCH_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=IMPORT_FETCH_CONCURRENCY,
+                max_keepalive_connections=IMPORT_FETCH_CONCURRENCY
+            )
+        )
+        fetch_semaphore = asyncio.Semaphore(IMPORT_FETCH_CONCURRENCY)
+        host_semaphores.clear()
+    return http_client
+
+async def timed_get(client: httpx.AsyncClient, url: str, target: str, **kwargs) -> httpx.Response:
+    """client.get, recorded in outbound_http_duration under target"""
+    start = time.perf_counter()
+    status = 'error'
+    try:
+        response = await client.get(url, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        outbound_http_duration.observe((target, status), time.perf_counter() - start)
+
+async def fetch_image_to_store(url: str) -> str:
+    """Fetch an image URL into the image store; returns its hash, or '' on failure"""
+    client = get_http_client()
+    try:
+        host = httpx.URL(url).host
+        host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(IMPORT_FETCH_PER_HOST))
+        # Per-host slot first: rows waiting on a slow host must not sit on global slots
+        async with host_semaphore, fetch_semaphore:
+            response = await timed_get(client, url, "image_fetch")
+        if (response.status_code == 200 and 'image' in response.headers.get('content-type', '')
+                and sniff_image_type(response.content[:32]) in RASTER_IMAGE_TYPES):
+            return await asyncio.to_thread(store_image_bytes, response.content)
+    except Exception as e:
+        logger.info(f"Image fetch failed for {url}: {e}")
+    return ''
+
+async def fetch_images(urls: List[str]) -> List[str]:
+    """Fetch many image URLs in parallel, bounded overall and per host"""
+    return await asyncio.gather(*(fetch_image_to_store(url) for url in urls))
+
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+# ============ BATCHED IMPORTS ============
+
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+
+def describe_write_error(write_error: dict) -> str:
+    if write_error.get('code') == 11000:
+        key_value = write_error.get('keyValue') or {}
+        if 'product_code_key' in key_value:
+            return f"Product code '{key_value['product_code_key']}' already exists"
+        return f"Duplicate key {key_value or ''}".strip()
+    return write_error.get('errmsg', 'Write failed')
+
+async def insert_batched(collection, rows: list) -> dict:
+    """Insert (row_number, doc) pairs with unordered insert_many in batches.
+    
+    Returns {row_number: error message} for the rows the server rejected;
+    every other row was written.
+    """
+    failed = {}
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        batch = rows[start:start + IMPORT_BATCH_SIZE]
+        try:
+            await collection.insert_many([doc for _, doc in batch], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get('writeErrors', []):
+                row_number = batch[write_error['index']][0]
+                failed[row_number] = describe_write_error(write_error)
+    return failed
+
+async def update_batched(collection, rows: list) -> dict:
+    """Apply (row_number, id, fields) $set updates with unordered bulk_write in batches.
+    
+    Returns {row_number: error message} like insert_batched.
+    """
+    failed = {}
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        batch = rows[start:start + IMPORT_BATCH_SIZE]
+        try:
+            await collection.bulk_write(
+                [UpdateOne({"id": doc_id}, {"$set": fields}) for _, doc_id, fields in batch], ordered=False
+            )
+        except BulkWriteError as e:
+            for write_error in e.details.get('writeErrors', []):
+                row_number = batch[write_error['index']][0]
+                failed[row_number] = describe_write_error(write_error)
+    return failed
+
+# ============ EXCEL IMPORTS ============
+
+# Error lines and sample rows kept for an import's response
+IMPORT_ERROR_LIMIT = 10
+IMPORT_SAMPLE_LIMIT = 20
+
+# insert: new codes only, existing ones are reported as errors
+# upsert: insert new codes and update rows that differ from the stored doc
+# dry_run: report what upsert would do without writing anything
+IMPORT_MODES = ('insert', 'upsert', 'dry_run')
+IMPORT_MODE_PATTERN = f"^({'|'.join(IMPORT_MODES)})$"
+
+# Per catalog collection: the code field rows are matched on, the fields an
+# upsert compares and overwrites, and the timestamp to bump on update
+CATALOG_IMPORTS = {
+    'products': {
+        'label': 'Product code',
+        'key': 'product_code_key',
+        'fields': ['product_code', 'description', 'size', 'category', 'height_cm', 'depth_cm', 'width_cm', 'cbm',
+                   'fob_price_usd', 'fob_price_gbp', 'warehouse_price_1', 'warehouse_price_2', 'description_words'],
+        'touch': 'updated_at',
+    },
+    'leather_library': {'label': 'Code', 'key': 'code', 'fields': ['name', 'description', 'color']},
+    'finish_library': {'label': 'Code', 'key': 'code', 'fields': ['name', 'description', 'color']},
+    'factories': {'label': 'Code', 'key': 'code', 'fields': ['name']},
+}
+
+def catalog_code_key(code) -> str:
+    return str(code or '').strip().upper()
+
+async def load_catalog_index(collection, key_field: str, fields: List[str]) -> dict:
+    """{normalized code: stored doc} for a whole catalog, from one projected query.
+    
+    image_source is the URL the stored image was fetched from, so an
+    upsert can tell whether a row's image actually changed.
+    """
+    projection = {"_id": 0, "id": 1, key_field: 1, "image_source": 1, **{field: 1 for field in fields}}
+    index = {}
+    async for doc in collection.find({}, projection):
+        index.setdefault(catalog_code_key(doc.get(key_field)), doc)
+    return index
+
+def excel_header_name(value, position: int) -> str:
+    # Blank headers get the names pandas gave them, which header detection relies on
+    if value is None or str(value).strip() == '':
+        return f"unnamed: {position}"
+    return str(value).lower().strip()
+
+def cell_text(row: dict, key: str) -> str:
+    value = row.get(key)
+    return '' if value is None else str(value).strip()
+
+class ExcelRowReader:
+    """Streams the first worksheet of an .xlsx upload as (row number, row dict).
+    
+    openpyxl's read-only mode parses the sheet as it goes, so memory does
+    not grow with the number of rows. Header names are lower-cased and
+    stripped, then renamed through column_mapping; the first column with
+    a given name wins. promote_header(header, first_row) may ask for the
+    first data row to be used as the header instead.
+    """
+    
+    def __init__(self, source, column_mapping: dict, promote_header=None):
+        self.source = source  # path or binary file object
+        self.column_mapping = column_mapping
+        self.promote_header = promote_header
+        self.rows_read = 0  # sheet row number of the last row read
+        self.total_rows = 0  # as declared by the sheet, may overcount
+    
+    def __iter__(self):
+        workbook = load_workbook(self.source, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            self.total_rows = sheet.max_row or 0
+            values = sheet.iter_rows(values_only=True)
+            header = next(values, None)
+            first_row = next(values, None)
+            if header is None or first_row is None:
+                return
+            
+            row_number = 1
+            if self.promote_header and self.promote_header(list(header), list(first_row)):
+                header, first_row = first_row, None
+                row_number = 2
+            columns = []
+            for position, value in enumerate(header):
+                name = excel_header_name(value, position)
+                columns.append(self.column_mapping.get(name, name))
+            
+            for cells in itertools.chain([first_row] if first_row is not None else [], values):
+                row_number += 1
+                self.rows_read = row_number
+                if all(cell is None or cell == '' for cell in cells):
+                    continue
+                row = {}
+                for column, cell in zip(columns, cells):
+                    row.setdefault(column, cell)
+                yield row_number, row
+        finally:
+            workbook.close()
+    
+    async def batches(self, size: int):
+        """Rows in lists of up to size, each list parsed in a worker thread"""
+        rows = iter(self)
+        while True:
+            batch = await asyncio.to_thread(list, itertools.islice(rows, size))
+            if not batch:
+                return
+            yield batch
+
+async def import_excel_rows(reader: ExcelRowReader, collection, parse_row, mode: str = 'insert', progress=None) -> dict:
+    """Parse, fetch images for and write an upload one batch at a time.
+    
+    parse_row(row) returns (doc, image_url) or None to skip the row, and
+    may raise to reject it; the fetched image lands in doc['image']. Rows
+    are matched to stored docs through an in-memory catalog index (see
+    IMPORT_MODES), which also catches codes repeated within the sheet.
+    """
+    spec = CATALOG_IMPORTS[collection.name]
+    index = await load_catalog_index(collection, spec['key'], spec['fields'])
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    error_count = 0
+    errors = []
+    samples = []
+    
+    def add_error(row_number: int, message: str):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < IMPORT_ERROR_LIMIT:
+            errors.append(f"Row {row_number}: {message}")
+    
+    async for batch in reader.batches(IMPORT_BATCH_SIZE):
+        inserts = []
+        updates = []
+        for row_number, row in batch:
+            try:
+                parsed = parse_row(row)
+            except Exception as row_error:
+                add_error(row_number, str(row_error))
+                continue
+            if parsed is None:
+                counts["skipped"] += 1
+                continue
+            doc, image_url = parsed
+            code = catalog_code_key(doc[spec['key']])
+            stored = index.get(code)
+            if stored is None:
+                index[code] = {**{field: doc.get(field) for field in spec['fields']}, "id": doc['id'], "image_source": image_url}
+                inserts.append((row_number, doc, image_url))
+            elif mode == 'insert':
+                add_error(row_number, f"{spec['label']} '{code}' already exists")
+            else:
+                changes = {field: doc.get(field) for field in spec['fields'] if doc.get(field) != stored.get(field)}
+                # Only a new URL is fetched again; a blank one keeps the current image
+                new_image_url = image_url if image_url and image_url != stored.get('image_source') else ''
+                if not changes and not new_image_url:
+                    counts["unchanged"] += 1
+                    continue
+                stored.update(changes)
+                if new_image_url:
+                    stored['image_source'] = new_image_url
+                updates.append((row_number, stored['id'], changes, new_image_url))
+        
+        if mode == 'dry_run':
+            counts["created"] += len(inserts)
+            counts["updated"] += len(updates)
+            samples.extend(doc for _, doc, _ in inserts[:IMPORT_SAMPLE_LIMIT - len(samples)])
+        else:
+            # Fetch image URLs in parallel; a failed fetch leaves the row without an image
+            urls = [url for _, _, url in inserts if url] + [url for _, _, _, url in updates if url]
+            fetched = dict(zip(urls, await fetch_images(urls)))
+            for _, doc, url in inserts:
+                if fetched.get(url):
+                    doc['image'] = fetched[url]
+                    doc['image_source'] = url
+            
+            write_updates = []
+            for row_number, doc_id, changes, url in updates:
+                if fetched.get(url):
+                    changes.update(image=fetched[url], image_source=url)
+                if not changes:
+                    counts["unchanged"] += 1
+                    continue
+                if spec.get('touch'):
+                    changes[spec['touch']] = datetime.now(timezone.utc).isoformat()
+                write_updates.append((row_number, doc_id, changes))
+            
+            failed = await insert_batched(collection, [(row_number, doc) for row_number, doc, _ in inserts])
+            failed.update(await update_batched(collection, write_updates))
+            for row_number, doc, _ in inserts:
+                if row_number not in failed:
+                    counts["created"] += 1
+                    if len(samples) < IMPORT_SAMPLE_LIMIT:
+                        samples.append(doc)
+            counts["updated"] += sum(1 for row_number, _, _ in write_updates if row_number not in failed)
+            for row_number in sorted(failed):
+                add_error(row_number, failed[row_number])
+        
+        if progress:
+            await progress("importing", reader.rows_read, max(reader.total_rows, reader.rows_read))
+    
+    return {**counts, "mode": mode, "errors": errors, "error_count": error_count, "samples": samples}
+
+def import_counts(outcome: dict) -> dict:
+    """The counters every import response reports"""
+    return {key: outcome[key] for key in ("mode", "created", "updated", "unchanged")}
+
+def import_message(outcome: dict, inserted: str) -> str:
+    """Response message; inserted is the insert-mode wording"""
+    summary = f"{outcome['created']} created, {outcome['updated']} updated, {outcome['unchanged']} unchanged"
+    if outcome['mode'] == 'dry_run':
+        return f"Dry run: {summary}"
+    if outcome['mode'] == 'upsert':
+        return summary
+    return inserted
+
+# ============ INDEXES ============
+
+def id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], name="id_unique", unique=True)
+
+def created_at_index() -> IndexModel:
+    # Serves sort("created_at", -1) and (created_at, id) keyset pagination
+    return IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id")
+
+# Indexes every collection is expected to have, ensured at startup
+INDEX_SPECS = {
+    'orders': [
+        id_index(),
+        created_at_index(),
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    'products': [
+        id_index(),
+        created_at_index(),
+        IndexModel([("product_code_key", ASCENDING)], name="product_code_key_unique", unique=True),
+        IndexModel([("description", TEXT), ("category", TEXT)], name="description_category_text"),
+        IndexModel([("category", ASCENDING)], name="category"),
+        IndexModel([("description_words", ASCENDING)], name="description_words"),
+    ],
+    'quotations': [id_index(), created_at_index()],
+    'leather_library': [id_index(), created_at_index()],
+    'finish_library': [id_index(), created_at_index()],
+    'exports': [
+        id_index(),
+        created_at_index(),
+        IndexModel([("order_id", ASCENDING)], name="order_id"),
+    ],
+    'factories': [id_index()],
+    'categories': [id_index()],
+    'template_settings': [id_index()],
+    'counters': [id_index()],
+    'jobs': [
+        id_index(),
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+        IndexModel([("status", ASCENDING), ("heartbeat_at", ASCENDING)], name="status_heartbeat_at"),
+    ],
+    'profiles': [id_index(), created_at_index()],
+}
+
+def index_key(key) -> tuple:
+    """Comparable form of an index key pattern (list of pairs or mapping).
+    
+    Text fields are folded into the _fts/_ftsx pair Mongo reports for an
+    existing text index.
+    """
+    pairs = []
+    for field, direction in dict(key).items():
+        if field == '_ftsx':
+            continue
+        if direction == TEXT:
+            if ('_fts', TEXT) not in pairs:
+                pairs.extend([('_fts', TEXT), ('_ftsx', 1)])
+            continue
+        pairs.append((field, int(direction) if isinstance(direction, float) else direction))
+    return tuple(pairs)
+
+# Indexes superseded by INDEX_SPECS, dropped at startup if present
+OBSOLETE_INDEXES = {
+    'products': ['product_code_ci_unique'],
+}
+
+# Outcome of the last startup index bootstrap: {collection: {index name: status}}
+index_bootstrap_report = {}
+
+async def ensure_indexes() -> dict:
+    """Create any missing index from INDEX_SPECS, logging each one built.
+    
+    An index whose key pattern already exists (under any name) is left
+    alone. A failed build (e.g. duplicate values under a unique index) is
+    logged and reported rather than stopping startup.
+    """
+    report = {}
+    for collection_name, models in INDEX_SPECS.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        for name in OBSOLETE_INDEXES.get(collection_name, []):
+            if name in existing:
+                await collection.drop_index(name)
+                logger.info(f"Dropped obsolete index {name} on {collection_name}")
+                del existing[name]
+        existing_keys = {index_key(info['key']) for info in existing.values()}
+        statuses = {}
+        for model in models:
+            spec = model.document
+            if index_key(spec['key']) in existing_keys:
+                statuses[spec['name']] = "exists"
+                continue
+            try:
+                await collection.create_indexes([model])
+                logger.info(f"Built index {spec['name']} on {collection_name}")
+                statuses[spec['name']] = "created"
+            except PyMongoError as e:
+                logger.error(f"Could not build index {spec['name']} on {collection_name}: {e}")
+                statuses[spec['name']] = f"failed: {e}"
+        report[collection_name] = statuses
+    index_bootstrap_report.clear()
+    index_bootstrap_report.update(report)
+    return report
+
 # Create the main app
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -217,6 +931,7 @@ class TemplateSettings(BaseModel):
     show_borders: bool = True
     header_height_mm: int = 25
     footer_height_mm: int = 20
+    logo_image: str = ""  # Uploaded logo (image store hash); empty uses the default logo
 
 class ExportRecord(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -226,6 +941,24 @@ class ExportRecord(BaseModel):
     filename: str
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
+class Job(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    kind: str
+    status: str = "queued"  # queued, running, completed, failed
+    progress: dict = Field(default_factory=dict)  # {stage, done, total}
+    result: dict = Field(default_factory=dict)
+    error: str = ""
+    download_url: str = ""
+    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    started_at: str = ""
+    finished_at: str = ""
+    attempts: int = 0  # times a worker has claimed it
+
+class ZipExportRequest(BaseModel):
+    order_ids: List[str]
+    format: str = "pdf"  # pdf, ppt or both
+
 class Product(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -343,67 +1076,291 @@ class QuotationUpdate(BaseModel):
 async def root():
     return {"message": "JAIPUR Production Sheet API"}
 
+# --- IMAGES ---
+
+@api_router.get("/images/{image_hash}")
+async def get_image(image_hash: str, request: Request):
+    """Serve an image from the content-addressed store (immutable, long-cached)"""
+    if not IMAGE_HASH_RE.match(image_hash):
+        raise HTTPException(status_code=404, detail="Image not found")
+    path = image_path(image_hash)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    etag = f'"{image_hash}"'
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": etag,
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    
+    with open(path, 'rb') as f:
+        head = f.read(32)
+    media_type = sniff_image_type(head)
+    if media_type not in RASTER_IMAGE_TYPES:
+        # Blobs stored before non-raster uploads were refused: never render them
+        # in the app's origin
+        headers["Content-Security-Policy"] = "sandbox"
+        headers["Content-Disposition"] = "attachment"
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+async def migrate_inline_images() -> dict:
+    """Rewrite inline data URIs in existing documents to image store hashes"""
+    migrated = {}
+    for name in IMAGE_COLLECTIONS:
+        collection = db[name]
+        count = 0
+        async for doc in collection.find({}, {"_id": 0}):
+            before = {k: v for k, v in doc.items() if k in IMAGE_FIELDS + IMAGE_LIST_FIELDS + ('items',)}
+            after = externalize_images(copy.deepcopy(before))
+            changed = {k: v for k, v in after.items() if v != before[k]}
+            if changed:
+                await collection.update_one({"id": doc["id"]}, {"$set": changed})
+                count += 1
+        migrated[name] = count
+    if migrated.get('products'):
+        await bump_catalog_version()
+    return migrated
+
+@api_router.post("/admin/migrate-images")
+async def migrate_images(user: dict = Depends(verify_token)):
+    """One-off migration of inline base64 images into the image store"""
+    migrated = await migrate_inline_images()
+    return {"message": f"{sum(migrated.values())} documents migrated", "migrated": migrated}
+
+# --- PAGINATION ---
+
+MAX_PAGE_LIMIT = 500
+
+# Fields left out of list rows when fields=summary is requested
+SUMMARY_EXCLUDED_FIELDS = {
+    'orders': ['items'],
+    'products': ['images'],
+    'quotations': ['items', 'notes'],
+    'leather_library': ['image'],
+    'finish_library': ['image'],
+    'exports': [],
+}
+
+# Bookkeeping fields stored alongside a document but not part of its model
+INTERNAL_FIELDS = {
+    'products': ['product_code_key', 'description_words', 'image_source'],
+    'leather_library': ['image_source'],
+    'finish_library': ['image_source'],
+}
+
+def read_projection(collection_name: str) -> dict:
+    """Projection returning a stored document exactly as its model serializes it"""
+    return {"_id": 0, **{field: 0 for field in INTERNAL_FIELDS.get(collection_name, [])}}
+
+def trusted_response(content, headers: Optional[dict] = None) -> ORJSONResponse:
+    """Serialize stored documents directly, skipping response_model validation.
+    
+    Documents are validated by their model on write, so re-validating every
+    row on read only costs time; the route's response_model is kept for the
+    API schema. Only pass documents read with read_projection().
+    """
+    return ORJSONResponse(content=content, headers=headers)
+
+def encode_cursor(doc: dict) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of a document"""
+    raw = json.dumps([doc.get('created_at', ''), doc.get('id', '')])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(doc_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def fetch_page(collection, query: dict, limit: Optional[int], cursor: Optional[str], fields: Optional[str]):
+    """Keyset-paginated listing, newest first, ordered by (created_at, id).
+    
+    Returns the page of documents and the cursor for the next page (None on
+    the last page). Without a limit the whole collection is returned.
+    """
+    match = dict(query)
+    if cursor:
+        created_at, doc_id = decode_cursor(cursor)
+        position = {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": doc_id}},
+        ]}
+        # query may carry its own $or (a search filter), so combine rather than merge
+        match = {"$and": [match, position]} if match else position
+    
+    pipeline = [{"$match": match}, {"$sort": {"created_at": -1, "id": -1}}]
+    if limit:
+        pipeline.append({"$limit": limit + 1})
+    
+    projection = read_projection(collection.name)
+    if fields == "summary":
+        if collection.name in ('orders', 'quotations'):
+            pipeline.append({"$addFields": {"item_count": {"$size": {"$ifNull": ["$items", []]}}}})
+        projection.update({field: 0 for field in SUMMARY_EXCLUDED_FIELDS.get(collection.name, [])})
+    pipeline.append({"$project": projection})
+    
+    docs = await collection.aggregate(pipeline).to_list(None)
+    next_cursor = None
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1])
+    return docs, next_cursor
+
+def search_filter(term: Optional[str], fields: List[str]) -> dict:
+    """Case-insensitive substring match of term on any of fields; {} when term is blank"""
+    term = (term or '').strip()
+    if not term:
+        return {}
+    pattern = {"$regex": re.escape(term), "$options": "i"}
+    return {"$or": [{field: pattern} for field in fields]}
+
+async def count_matching(collection, query: dict) -> int:
+    if not query:
+        return await collection.estimated_document_count()
+    return await collection.count_documents(query)
+
+def page_response(docs: list, next_cursor: Optional[str], total: Optional[int] = None):
+    """Trusted response for a page of documents with the next-page cursor header.
+    
+    total, when given, goes out as X-Total-Count: the number of documents the
+    whole listing (all pages) matches.
+    """
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return trusted_response(docs, headers or None)
+
+# --- ORDER COUNTERS ---
+
+# Materialized order counts (total and per status), kept in step with order
+# writes so the dashboard never has to count the orders collection
+ORDER_COUNTERS_ID = "orders"
+
+def status_counter_field(status: str) -> str:
+    return "status." + (status or "").replace(".", "_").replace("$", "_")
+
+async def bump_order_counters(add_status: Optional[str] = None, remove_status: Optional[str] = None):
+    """Apply an order create (add), delete (remove) or status change (both)"""
+    inc = {}
+    if add_status is not None:
+        inc[status_counter_field(add_status)] = 1
+    if remove_status is not None:
+        field = status_counter_field(remove_status)
+        inc[field] = inc.get(field, 0) - 1
+    if add_status is not None and remove_status is None:
+        inc["total"] = 1
+    elif remove_status is not None and add_status is None:
+        inc["total"] = -1
+    inc = {k: v for k, v in inc.items() if v}
+    if inc:
+        await db.counters.update_one({"id": ORDER_COUNTERS_ID}, {"$inc": inc}, upsert=True)
+
+async def rebuild_order_counters() -> dict:
+    """Recount orders per status in one aggregation and replace the counters document"""
+    groups = await db.orders.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]).to_list(None)
+    counters = {"id": ORDER_COUNTERS_ID, "total": 0, "status": {}}
+    for group in groups:
+        field = status_counter_field(group["_id"]).split(".", 1)[1]
+        counters["status"][field] = counters["status"].get(field, 0) + group["count"]
+        counters["total"] += group["count"]
+    await db.counters.replace_one({"id": ORDER_COUNTERS_ID}, counters, upsert=True)
+    return counters
+
 # --- ORDERS ---
 
 @api_router.get("/orders", response_model=List[Order])
-async def get_orders():
-    orders = await db.orders.find({}, {"_id": 0}).to_list(1000)
-    return orders
+async def get_orders(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, pattern="^summary$"),
+    status: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100)
+):
+    """Orders, newest first; status and q (order ref, PO ref or buyer) filter on the server.
+    
+    The first page (no cursor) also carries the matching total in X-Total-Count.
+    """
+    query = search_filter(q, ['sales_order_ref', 'buyer_po_ref', 'buyer_name'])
+    if status:
+        query["status"] = status
+    orders, next_cursor = await fetch_page(db.orders, query, limit, cursor, fields)
+    total = None if cursor else await count_matching(db.orders, query)
+    return page_response(orders, next_cursor, total)
 
 @api_router.get("/orders/{order_id}", response_model=Order)
 async def get_order(order_id: str):
-    order = await db.orders.find_one({"id": order_id}, {"_id": 0})
+    order = await db.orders.find_one({"id": order_id}, read_projection("orders"))
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    return order
+    return trusted_response(order)
 
 @api_router.post("/orders", response_model=Order)
 async def create_order(order_data: OrderCreate):
     order = Order(**order_data.model_dump())
-    doc = order.model_dump()
+    doc = externalize_images(order.model_dump())
     await db.orders.insert_one(doc)
-    return order
+    await bump_order_counters(add_status=doc["status"])
+    return doc
 
 @api_router.put("/orders/{order_id}", response_model=Order)
 async def update_order(order_id: str, order_data: OrderUpdate):
-    existing = await db.orders.find_one({"id": order_id}, {"_id": 0})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
     update_data = {k: v for k, v in order_data.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
     if "items" in update_data:
         update_data["items"] = [item.model_dump() if hasattr(item, 'model_dump') else item for item in update_data["items"]]
+    externalize_images(update_data)
+    
+    # Atomically read the previous status so the counters see the exact transition
+    previous = await db.orders.find_one_and_update(
+        {"id": order_id}, {"$set": update_data}, projection={"_id": 0, "status": 1}
+    )
+    if not previous:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if "status" in update_data and update_data["status"] != previous.get("status"):
+        await bump_order_counters(add_status=update_data["status"], remove_status=previous.get("status"))
+    await export_cache.invalidate_order(order_id)
     
-    await db.orders.update_one({"id": order_id}, {"$set": update_data})
     updated = await db.orders.find_one({"id": order_id}, {"_id": 0})
     return updated
 
 @api_router.delete("/orders/{order_id}")
 async def delete_order(order_id: str):
-    result = await db.orders.delete_one({"id": order_id})
-    if result.deleted_count == 0:
+    deleted = await db.orders.find_one_and_delete({"id": order_id}, projection={"_id": 0, "status": 1})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Order not found")
+    await bump_order_counters(remove_status=deleted.get("status"))
+    await export_cache.invalidate_order(order_id)
     return {"message": "Order deleted"}
 
 # --- LEATHER LIBRARY ---
 
 @api_router.get("/leather-library", response_model=List[LeatherLibraryItem])
-async def get_leather_library():
-    items = await db.leather_library.find({}, {"_id": 0}).to_list(1000)
-    return items
+async def get_leather_library(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, pattern="^summary$")
+):
+    items, next_cursor = await fetch_page(db.leather_library, {}, limit, cursor, fields)
+    return page_response(items, next_cursor)
 
 @api_router.post("/leather-library", response_model=LeatherLibraryItem)
 async def create_leather_item(item: LeatherLibraryItem):
-    doc = item.model_dump()
+    doc = externalize_images(item.model_dump())
     await db.leather_library.insert_one(doc)
-    return item
+    return doc
 
 @api_router.put("/leather-library/{item_id}", response_model=LeatherLibraryItem)
 async def update_leather_item(item_id: str, item: LeatherLibraryItem):
-    await db.leather_library.update_one({"id": item_id}, {"$set": item.model_dump()})
-    return item
+    doc = externalize_images(item.model_dump())
+    await db.leather_library.update_one({"id": item_id}, {"$set": doc})
+    return doc
 
 @api_router.delete("/leather-library/{item_id}")
 async def delete_leather_item(item_id: str):
@@ -413,76 +1370,75 @@ async def delete_leather_item(item_id: str):
     return {"message": "Item deleted"}
 
 @api_router.post("/leather-library/upload-excel")
-async def upload_leather_excel(file: UploadFile = File(...)):
+async def upload_leather_excel(
+    file: UploadFile = File(...),
+    mode: str = Query('insert', pattern=IMPORT_MODE_PATTERN),
+    run_async: bool = Query(False, alias="async")
+):
     """Upload leather items from Excel file"""
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="File must be an Excel file")
     
+    if run_async:
+        return await submit_import_job("import_leather", file.filename, file.file, mode)
+    return await import_leather_excel(file.file, mode)
+
+def parse_library_row(row: dict):
+    """Leather/finish library document and image URL for one sheet row"""
+    code = cell_text(row, 'code')
+    if not code:
+        return None
+    item_data = {
+        'id': str(uuid.uuid4()),
+        'code': code.upper(),
+        'name': cell_text(row, 'name'),
+        'description': cell_text(row, 'description'),
+        'color': cell_text(row, 'color'),
+        'image': '',
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+    image_url = cell_text(row, 'image_url')
+    return item_data, image_url if image_url.startswith('http') else ''
+
+async def import_leather_excel(source, mode: str = 'insert', progress=None) -> dict:
+    column_mapping = {
+        'code': 'code', 'leather code': 'code', 'item code': 'code',
+        'name': 'name', 'leather name': 'name',
+        'description': 'description', 'desc': 'description',
+        'color': 'color',
+        'image': 'image_url', 'image link': 'image_url', 'photo': 'image_url', 'photo link': 'image_url'
+    }
     try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        df.columns = df.columns.str.lower().str.strip()
-        
-        column_mapping = {
-            'code': 'code', 'leather code': 'code', 'item code': 'code',
-            'name': 'name', 'leather name': 'name',
-            'description': 'description', 'desc': 'description',
-            'color': 'color',
-            'image': 'image_url', 'image link': 'image_url', 'photo': 'image_url', 'photo link': 'image_url'
-        }
-        df = df.rename(columns=column_mapping)
-        
-        created = []
-        for idx, row in df.iterrows():
-            code = str(row.get('code', '')).strip()
-            if not code or code == 'nan':
-                continue
-                
-            item_data = {
-                'id': str(uuid.uuid4()),
-                'code': code.upper(),
-                'name': str(row.get('name', '')).strip() if pd.notna(row.get('name')) else '',
-                'description': str(row.get('description', '')).strip() if pd.notna(row.get('description')) else '',
-                'color': str(row.get('color', '')).strip() if pd.notna(row.get('color')) else '',
-                'image': '',
-                'created_at': datetime.now(timezone.utc).isoformat()
-            }
-            
-            # Fetch image from URL if provided
-            image_url = str(row.get('image_url', '')).strip() if pd.notna(row.get('image_url')) else ''
-            if image_url and image_url.startswith('http'):
-                try:
-                    async with httpx.AsyncClient(timeout=10.0) as client:
-                        response = await client.get(image_url)
-                        if response.status_code == 200 and 'image' in response.headers.get('content-type', ''):
-                            item_data['image'] = f"data:{response.headers['content-type']};base64,{base64.b64encode(response.content).decode()}"
-                except:
-                    pass
-            
-            await db.leather_library.insert_one(item_data)
-            created.append({'code': item_data['code'], 'name': item_data['name']})
-        
-        return {"message": f"{len(created)} items imported", "created": len(created), "items": created[:20]}
+        reader = ExcelRowReader(source, column_mapping)
+        outcome = await import_excel_rows(reader, db.leather_library, parse_library_row, mode, progress)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    items = [{'code': doc['code'], 'name': doc['name']} for doc in outcome['samples']]
+    return {"message": import_message(outcome, f"{outcome['created']} items imported"), **import_counts(outcome), "errors": outcome['errors'], "items": items}
 
 # --- FINISH LIBRARY ---
 
 @api_router.get("/finish-library", response_model=List[FinishLibraryItem])
-async def get_finish_library():
-    items = await db.finish_library.find({}, {"_id": 0}).to_list(1000)
-    return items
+async def get_finish_library(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, pattern="^summary$")
+):
+    items, next_cursor = await fetch_page(db.finish_library, {}, limit, cursor, fields)
+    return page_response(items, next_cursor)
 
 @api_router.post("/finish-library", response_model=FinishLibraryItem)
 async def create_finish_item(item: FinishLibraryItem):
-    doc = item.model_dump()
+    doc = externalize_images(item.model_dump())
     await db.finish_library.insert_one(doc)
-    return item
+    return doc
 
 @api_router.put("/finish-library/{item_id}", response_model=FinishLibraryItem)
 async def update_finish_item(item_id: str, item: FinishLibraryItem):
-    await db.finish_library.update_one({"id": item_id}, {"$set": item.model_dump()})
-    return item
+    doc = externalize_images(item.model_dump())
+    await db.finish_library.update_one({"id": item_id}, {"$set": doc})
+    return doc
 
 @api_router.delete("/finish-library/{item_id}")
 async def delete_finish_item(item_id: str):
@@ -492,58 +1448,35 @@ async def delete_finish_item(item_id: str):
     return {"message": "Item deleted"}
 
 @api_router.post("/finish-library/upload-excel")
-async def upload_finish_excel(file: UploadFile = File(...)):
+async def upload_finish_excel(
+    file: UploadFile = File(...),
+    mode: str = Query('insert', pattern=IMPORT_MODE_PATTERN),
+    run_async: bool = Query(False, alias="async")
+):
     """Upload finish items from Excel file"""
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="File must be an Excel file")
     
+    if run_async:
+        return await submit_import_job("import_finish", file.filename, file.file, mode)
+    return await import_finish_excel(file.file, mode)
+
+async def import_finish_excel(source, mode: str = 'insert', progress=None) -> dict:
+    column_mapping = {
+        'code': 'code', 'finish code': 'code', 'item code': 'code',
+        'name': 'name', 'finish name': 'name',
+        'description': 'description', 'desc': 'description',
+        'color': 'color',
+        'image': 'image_url', 'image link': 'image_url', 'photo': 'image_url', 'photo link': 'image_url'
+    }
     try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        df.columns = df.columns.str.lower().str.strip()
-        
-        column_mapping = {
-            'code': 'code', 'finish code': 'code', 'item code': 'code',
-            'name': 'name', 'finish name': 'name',
-            'description': 'description', 'desc': 'description',
-            'color': 'color',
-            'image': 'image_url', 'image link': 'image_url', 'photo': 'image_url', 'photo link': 'image_url'
-        }
-        df = df.rename(columns=column_mapping)
-        
-        created = []
-        for idx, row in df.iterrows():
-            code = str(row.get('code', '')).strip()
-            if not code or code == 'nan':
-                continue
-                
-            item_data = {
-                'id': str(uuid.uuid4()),
-                'code': code.upper(),
-                'name': str(row.get('name', '')).strip() if pd.notna(row.get('name')) else '',
-                'description': str(row.get('description', '')).strip() if pd.notna(row.get('description')) else '',
-                'color': str(row.get('color', '')).strip() if pd.notna(row.get('color')) else '',
-                'image': '',
-                'created_at': datetime.now(timezone.utc).isoformat()
-            }
-            
-            # Fetch image from URL if provided
-            image_url = str(row.get('image_url', '')).strip() if pd.notna(row.get('image_url')) else ''
-            if image_url and image_url.startswith('http'):
-                try:
-                    async with httpx.AsyncClient(timeout=10.0) as client:
-                        response = await client.get(image_url)
-                        if response.status_code == 200 and 'image' in response.headers.get('content-type', ''):
-                            item_data['image'] = f"data:{response.headers['content-type']};base64,{base64.b64encode(response.content).decode()}"
-                except:
-                    pass
-            
-            await db.finish_library.insert_one(item_data)
-            created.append({'code': item_data['code'], 'name': item_data['name']})
-        
-        return {"message": f"{len(created)} items imported", "created": len(created), "items": created[:20]}
+        reader = ExcelRowReader(source, column_mapping)
+        outcome = await import_excel_rows(reader, db.finish_library, parse_library_row, mode, progress)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    items = [{'code': doc['code'], 'name': doc['name']} for doc in outcome['samples']]
+    return {"message": import_message(outcome, f"{outcome['created']} items imported"), **import_counts(outcome), "errors": outcome['errors'], "items": items}
 
 # --- TEMPLATE SETTINGS ---
 
@@ -559,12 +1492,14 @@ async def get_template_settings():
 @api_router.put("/template-settings", response_model=TemplateSettings)
 async def update_template_settings(settings: TemplateSettings):
     settings.id = "default"
+    doc = externalize_images(settings.model_dump())
     await db.template_settings.update_one(
         {"id": "default"}, 
-        {"$set": settings.model_dump()}, 
+        {"$set": doc}, 
         upsert=True
     )
-    return settings
+    await export_cache.clear()
+    return doc
 
 # --- FACTORIES ---
 
@@ -607,40 +1542,43 @@ async def delete_factory(factory_id: str):
     return {"message": "Factory deleted"}
 
 @api_router.post("/factories/upload-excel")
-async def upload_factories_excel(file: UploadFile = File(...)):
+async def upload_factories_excel(
+    file: UploadFile = File(...),
+    mode: str = Query('insert', pattern=IMPORT_MODE_PATTERN),
+    run_async: bool = Query(False, alias="async")
+):
     """Upload factories from Excel file"""
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="File must be an Excel file")
     
+    if run_async:
+        return await submit_import_job("import_factories", file.filename, file.file, mode)
+    return await import_factories_excel(file.file, mode)
+
+def parse_factory_row(row: dict):
+    code = cell_text(row, 'code')
+    if not code:
+        return None
+    factory_doc = {
+        'id': str(uuid.uuid4()),
+        'code': code.upper(),
+        'name': cell_text(row, 'name'),
+    }
+    return factory_doc, ''
+
+async def import_factories_excel(source, mode: str = 'insert', progress=None) -> dict:
+    column_mapping = {
+        'code': 'code', 'factory code': 'code',
+        'name': 'name', 'factory name': 'name',
+    }
     try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        df.columns = df.columns.str.lower().str.strip()
-        
-        column_mapping = {
-            'code': 'code', 'factory code': 'code',
-            'name': 'name', 'factory name': 'name',
-        }
-        df = df.rename(columns=column_mapping)
-        
-        created = []
-        for idx, row in df.iterrows():
-            code = str(row.get('code', '')).strip()
-            if not code or code == 'nan':
-                continue
-                
-            factory_doc = {
-                'id': str(uuid.uuid4()),
-                'code': code.upper(),
-                'name': str(row.get('name', '')).strip() if pd.notna(row.get('name')) else '',
-            }
-            
-            await db.factories.insert_one(factory_doc)
-            created.append({'code': factory_doc['code'], 'name': factory_doc['name']})
-        
-        return {"message": f"{len(created)} factories imported", "created": len(created), "items": created[:20]}
+        reader = ExcelRowReader(source, column_mapping)
+        outcome = await import_excel_rows(reader, db.factories, parse_factory_row, mode, progress)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    items = [{'code': doc['code'], 'name': doc['name']} for doc in outcome['samples']]
+    return {"message": import_message(outcome, f"{outcome['created']} factories imported"), **import_counts(outcome), "errors": outcome['errors'], "items": items}
 
 # --- CATEGORIES ---
 
@@ -715,20 +1653,236 @@ def format_date_ddmmyyyy(date_str):
 # JAIPUR Logo URL
 JAIPUR_LOGO_URL = "https://customer-assets.emergentagent.com/job_furnipdf-maker/artifacts/mdh71t2g_WhatsApp%20Image%202025-12-22%20at%202.24.36%20PM.jpeg"
 
-async def fetch_image_bytes(url: str) -> bytes:
-    """Fetch image from URL and return bytes"""
+# Local cache of the remote logo, revalidated in the background
+CACHE_DIR = Path(os.environ.get('CACHE_DIR', str(ROOT_DIR / 'cache')))
+LOGO_REVALIDATE_SECONDS = int(os.environ.get('LOGO_REVALIDATE_SECONDS', '3600'))
+
+class LogoCache:
+    """The default logo, held in memory and on disk.
+    
+    Exports never wait on the CDN: the cached bytes are served as-is and a
+    background task revalidates them with ETag / Last-Modified. If the CDN
+    is down the last good copy keeps being used.
+    """
+    
+    def __init__(self, url: str, cache_dir: Path):
+        self.url = url
+        self.data_path = cache_dir / 'logo.img'
+        self.meta_path = cache_dir / 'logo.json'
+        self.data = None
+        self.etag = None
+        self.last_modified = None
+        self._task = None
+    
+    def load_from_disk(self):
+        try:
+            meta = json.loads(self.meta_path.read_text())
+            if meta.get('url') != self.url:
+                return
+            self.data = self.data_path.read_bytes()
+            self.etag = meta.get('etag')
+            self.last_modified = meta.get('last_modified')
+        except (OSError, ValueError):
+            pass
+    
+    def _save_to_disk(self):
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        self.data_path.write_bytes(self.data)
+        self.meta_path.write_text(json.dumps({
+            'url': self.url, 'etag': self.etag, 'last_modified': self.last_modified
+        }))
+    
+    async def revalidate(self):
+        """Conditional GET against the logo URL; refresh the cache on 200"""
+        headers = {}
+        if self.data:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await timed_get(client, self.url, "logo", headers=headers)
+        except httpx.HTTPError as e:
+            logger.warning(f"Logo revalidation failed: {e}")
+            return
+        if response.status_code == 200 and response.content:
+            self.data = response.content
+            self.etag = response.headers.get('etag')
+            self.last_modified = response.headers.get('last-modified')
+            try:
+                self._save_to_disk()
+            except OSError as e:
+                logger.warning(f"Could not persist logo cache: {e}")
+        elif response.status_code != 304:
+            logger.warning(f"Logo revalidation returned HTTP {response.status_code}")
+    
+    async def _revalidate_forever(self):
+        while True:
+            await asyncio.sleep(LOGO_REVALIDATE_SECONDS)
+            await self.revalidate()
+    
+    async def start(self):
+        self.load_from_disk()
+        if self.data is None:
+            await self.revalidate()
+        else:
+            asyncio.create_task(self.revalidate())
+        self._task = asyncio.create_task(self._revalidate_forever())
+    
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+logo_cache = LogoCache(JAIPUR_LOGO_URL, CACHE_DIR)
+
+def get_logo_bytes(settings: dict) -> Optional[bytes]:
+    """Logo for exports: the uploaded template logo if set, else the cached default"""
+    return load_image_bytes(settings.get('logo_image')) or logo_cache.data
+
+# Pre-scaled image cache for the PDF renderer (one per render worker process)
+PDF_IMAGE_CACHE_MB = int(os.environ.get('PDF_IMAGE_CACHE_MB', '128'))
+# Resolution images are pre-scaled to before embedding
+PDF_IMAGE_DPI = int(os.environ.get('PDF_IMAGE_DPI', '150'))
+
+def image_cache_key(value) -> str:
+    """Content key for an image reference: store hash, data URI or raw bytes"""
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    if IMAGE_HASH_RE.match(value):
+        return value
+    return hashlib.sha256(value.encode()).hexdigest()
+
+class ImageReaderCache:
+    """Size-bounded LRU of images pre-scaled to the box they are drawn into.
+    
+    Entries are keyed by image content and box, so the same swatch repeated
+    on every page (and across exports) is decoded and scaled only once.
+    Scaled images are re-encoded as JPEG (PNG when they have alpha), since
+    reportlab embeds a JPEG stream as-is but stores anything else as
+    Flate-compressed raw pixels; an image that already fits its box keeps
+    its original bytes. The cache holds those encoded bytes and hands out a
+    fresh ImageReader per lookup, as readers carry a file position and
+    renders share the cache across threads when RENDER_WORKERS=0.
+    """
+    
+    def __init__(self, max_bytes: int, dpi: int, jpeg_quality: int = 85):
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _prescale(self, data: bytes, box_width: float, box_height: float):
+        img = PILImage.open(io.BytesIO(data))
+        max_px = (max(1, int(box_width * self.dpi / 72)), max(1, int(box_height * self.dpi / 72)))
+        if img.width <= max_px[0] and img.height <= max_px[1]:
+            return data
+        img.thumbnail(max_px, PILImage.LANCZOS)
+        buffer = io.BytesIO()
+        if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+            img.convert('RGBA').save(buffer, 'PNG', optimize=True)
+        else:
+            img.convert('L' if img.mode in ('1', 'L') else 'RGB').save(
+                buffer, 'JPEG', quality=self.jpeg_quality, optimize=True
+            )
+        return buffer.getvalue()
+    
+    def get(self, value, box_width: float, box_height: float) -> Optional[ImageReader]:
+        """ImageReader for an image reference scaled to fit the box, or None"""
+        if not value:
+            return None
+        key = (image_cache_key(value), round(box_width), round(box_height))
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        
+        if encoded is None:
+            # Decode and scale outside the lock; two threads missing on the
+            # same key both do the work and the later one replaces the entry
+            data = value if isinstance(value, bytes) else load_image_bytes(value)
+            if not data:
+                return None
+            encoded = self._prescale(data, box_width, box_height)
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self.size_bytes -= len(previous)
+                self._entries[key] = encoded
+                self.size_bytes += len(encoded)
+                while self.size_bytes > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.size_bytes -= len(evicted)
+        return ImageReader(io.BytesIO(encoded))
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+pdf_image_cache = ImageReaderCache(PDF_IMAGE_CACHE_MB * 1024 * 1024, PDF_IMAGE_DPI)
+
+def render_file_atomically(render, order: dict, settings: dict, logo_bytes: bytes, path: str):
+    """Call render(..., output=tmp) and move the result into place at path.
+    
+    If the directory disappears mid-render (cache cleared by hand, or by an
+    older server), it is recreated and the render done once more.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            if response.status_code == 200:
-                return response.content
-    except:
-        pass
-    return None
+        for attempt in range(2):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                render(order, settings, logo_bytes, output=tmp_path)
+                os.replace(tmp_path, path)
+                return
+            except FileNotFoundError:
+                if attempt or os.path.isdir(os.path.dirname(path)):
+                    raise
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None) -> bytes:
-    """Generate PDF that matches the Preview page layout exactly - with LARGE product images"""
-    buffer = io.BytesIO()
+def render_pdf_file_job(order: dict, settings: dict, logo_bytes: bytes, path: str):
+    """Render-worker entry point that writes the PDF straight to path.
+    
+    Nothing but the path crosses the process boundary, and the file only
+    appears at path once complete.
+    """
+    render_file_atomically(generate_pdf, order, settings, logo_bytes, path)
+    return os.getpid(), pdf_image_cache.stats()
+
+def render_ppt_file_job(order: dict, settings: dict, logo_bytes: bytes, path: str):
+    """Render-worker entry point that writes the PPTX straight to path.
+    
+    generate_ppt does not go through pdf_image_cache, so there are no cache
+    stats to report.
+    """
+    render_file_atomically(generate_ppt, order, settings, logo_bytes, path)
+    return os.getpid(), None
+
+def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None, output=None) -> Optional[bytes]:
+    """Generate PDF that matches the Preview page layout exactly - with LARGE product images
+    
+    With output (a path or binary file object) the document is written there
+    and None is returned; otherwise the PDF bytes are returned.
+    """
+    buffer = output if output is not None else io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
     margin = settings.get('page_margin_mm', 12) * mm
@@ -744,8 +1898,7 @@ def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None) -> bytes
         logo_height = 50
         if logo_bytes:
             try:
-                from reportlab.lib.utils import ImageReader
-                logo_img = ImageReader(io.BytesIO(logo_bytes))
+                logo_img = pdf_image_cache.get(logo_bytes, logo_width, logo_height)
                 c.drawImage(logo_img, margin, header_top - logo_height, width=logo_width, height=logo_height, preserveAspectRatio=True)
             except:
                 c.setFillColor(primary_color)
@@ -832,16 +1985,13 @@ def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None) -> bytes
         product_image = item.get('product_image') or (item.get('images', [None])[0] if item.get('images') else None)
         if product_image:
             try:
-                if product_image.startswith('data:image'):
-                    img_data = product_image.split(',')[1]
-                    img_bytes_data = base64.b64decode(img_data)
-                    from reportlab.lib.utils import ImageReader
-                    img = ImageReader(io.BytesIO(img_bytes_data))
+                img = pdf_image_cache.get(product_image, img_section_width - 10, img_height - 10)
+                if img:
                     # Draw image with padding
                     c.drawImage(img, margin + 5, content_y - img_height + 5, 
                                width=img_section_width - 10, height=img_height - 10, 
                                preserveAspectRatio=True)
-            except Exception as e:
+            except Exception:
                 c.setFillColor(HexColor('#888888'))
                 c.setFont("Helvetica", 12)
                 c.drawCentredString(margin + img_section_width/2, content_y - img_height/2, "Image Error")
@@ -861,12 +2011,9 @@ def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None) -> bytes
         if additional_images:
             extra_img_x = margin + 5
             for idx, extra_img in enumerate(additional_images[:4]):  # Max 4 images
-                if extra_img and extra_img.startswith('data:image'):
-                    try:
-                        img_data = extra_img.split(',')[1]
-                        img_bytes_data = base64.b64decode(img_data)
-                        from reportlab.lib.utils import ImageReader
-                        img = ImageReader(io.BytesIO(img_bytes_data))
+                try:
+                    img = pdf_image_cache.get(extra_img, extra_img_size, extra_img_size)
+                    if img:
                         c.drawImage(img, extra_img_x, extra_img_y - extra_img_size, 
                                    width=extra_img_size, height=extra_img_size, 
                                    preserveAspectRatio=True)
@@ -874,8 +2021,8 @@ def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None) -> bytes
                         c.setStrokeColor(HexColor('#dddddd'))
                         c.rect(extra_img_x, extra_img_y - extra_img_size, extra_img_size, extra_img_size)
                         extra_img_x += extra_img_size + 8
-                    except:
-                        pass
+                except:
+                    pass
         
         # Material Swatches (25% width) - taller to match image height
         c.setStrokeColor(HexColor('#dddddd'))
@@ -887,11 +2034,8 @@ def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None) -> bytes
         if item.get('leather_code') or item.get('leather_image'):
             if item.get('leather_image'):
                 try:
-                    if item['leather_image'].startswith('data:image'):
-                        img_data = item['leather_image'].split(',')[1]
-                        img_bytes_data = base64.b64decode(img_data)
-                        from reportlab.lib.utils import ImageReader
-                        img = ImageReader(io.BytesIO(img_bytes_data))
+                    img = pdf_image_cache.get(item['leather_image'], material_section_width - 16, swatch_height - 5)
+                    if img:
                         c.drawImage(img, material_x + 8, swatch_y - swatch_height, 
                                    width=material_section_width - 16, height=swatch_height - 5, 
                                    preserveAspectRatio=True)
@@ -914,11 +2058,8 @@ def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None) -> bytes
         if item.get('finish_code') or item.get('finish_image'):
             if item.get('finish_image'):
                 try:
-                    if item['finish_image'].startswith('data:image'):
-                        img_data = item['finish_image'].split(',')[1]
-                        img_bytes_data = base64.b64decode(img_data)
-                        from reportlab.lib.utils import ImageReader
-                        img = ImageReader(io.BytesIO(img_bytes_data))
+                    img = pdf_image_cache.get(item['finish_image'], material_section_width - 16, swatch_height - 5)
+                    if img:
                         c.drawImage(img, material_x + 8, swatch_y - swatch_height, 
                                    width=material_section_width - 16, height=swatch_height - 5, 
                                    preserveAspectRatio=True)
@@ -1055,35 +2196,525 @@ def generate_pdf(order: dict, settings: dict, logo_bytes: bytes = None) -> bytes
         c.showPage()
     
     c.save()
-    buffer.seek(0)
+    if output is not None:
+        return None
     return buffer.getvalue()
 
-@api_router.get("/orders/{order_id}/export/pdf")
-async def export_order_pdf(order_id: str):
+# --- PROFILING ---
+
+# Admin-only wall-clock profiles of the slow handlers, asked for with an
+# "X-Profile: 1" header or "?profile=1". Stacks are stored collapsed (one
+# "frame;frame;frame count" line per stack), the input flamegraph.pl and
+# speedscope take as-is.
+PROFILED_HANDLERS = {
+    'export_order_pdf', 'export_order_ppt',
+    'upload_leather_excel', 'upload_finish_excel', 'upload_factories_excel', 'upload_products_excel',
+}
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.005'))
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', '50'))
+PROFILE_DIR = CACHE_DIR / 'profiles'
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+class StackSampler:
+    """Samples thread stacks from a background thread into collapsed-stack counts.
+    
+    With thread_ids unset every other thread in the process is sampled, so
+    requests running concurrently appear in the profile too.
+    """
+    
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL, thread_ids: Optional[set] = None, root: str = None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.root = root
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_name(frame))
+                    frame = frame.f_back
+                stack.append(self.root or names.get(thread_id, str(thread_id)))
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self) -> dict:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+def profiled_job(func, *args):
+    """Render-worker wrapper returning (func's result, its collapsed stacks)"""
+    sampler = StackSampler(thread_ids={threading.get_ident()}, root=f"render-worker-{os.getpid()}").start()
+    try:
+        result = func(*args)
+    finally:
+        stacks = sampler.stop()
+    return result, stacks
+
+# The profile being recorded for the current request, if any; renders
+# started under it are sampled inside the worker and merged in
+active_profile = contextvars.ContextVar('active_profile', default=None)
+
+def profile_requested(scope) -> bool:
+    if Headers(scope=scope).get("x-profile", "").lower() in ("1", "true"):
+        return True
+    query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    return query.get("profile", "").lower() in ("1", "true")
+
+def is_admin_request(scope) -> bool:
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.InvalidTokenError:
+        return False
+    return True
+
+def matched_handler(app, scope) -> Optional[str]:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(getattr(route, "endpoint", None), "__name__", None)
+    return None
+
+async def save_profile(profile: dict, stacks: dict):
+    """Write the collapsed stacks to disk, record them, and drop the oldest beyond PROFILE_KEEP"""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    lines = ''.join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+    await asyncio.to_thread((PROFILE_DIR / f"{profile['id']}.folded").write_text, lines)
+    await db.profiles.insert_one(dict(profile))
+    
+    stale = await db.profiles.find({}, {"_id": 0, "id": 1}).sort("created_at", -1).skip(PROFILE_KEEP).to_list(None)
+    if stale:
+        stale_ids = [doc['id'] for doc in stale]
+        await db.profiles.delete_many({"id": {"$in": stale_ids}})
+        for profile_id in stale_ids:
+            (PROFILE_DIR / f"{profile_id}.folded").unlink(missing_ok=True)
+
+class ProfilingMiddleware:
+    """Profiles PROFILED_HANDLERS requests that ask for it, for admins only.
+    
+    The profile id is returned in an X-Profile-Id header; the profile is
+    saved once the response has been sent.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+        handler = matched_handler(scope["app"], scope)
+        if handler not in PROFILED_HANDLERS:
+            await self.app(scope, receive, send)
+            return
+        if not is_admin_request(scope):
+            response = JSONResponse(status_code=401, content={"detail": "Profiling requires an admin token"})
+            await response(scope, receive, send)
+            return
+        
+        profile = {
+            "id": str(uuid.uuid4()),
+            "handler": handler,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": 500,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        
+        async def send_profiled(message):
+            if message["type"] == "http.response.start":
+                profile["status"] = message["status"]
+                MutableHeaders(raw=message["headers"])["X-Profile-Id"] = profile["id"]
+            await send(message)
+        
+        stacks = {}
+        token = active_profile.set(stacks)
+        sampler = StackSampler().start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            profile["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            for stack, count in sampler.stop().items():
+                stacks[stack] = stacks.get(stack, 0) + count
+            profile["samples"] = sampler.samples
+            active_profile.reset(token)
+            try:
+                await save_profile(profile, stacks)
+            except Exception as e:
+                logger.warning(f"Could not save profile {profile['id']}: {e}")
+
+@api_router.get("/admin/profiles")
+async def list_profiles(user: dict = Depends(verify_token)):
+    """Recent profiles, newest first"""
+    return await db.profiles.find({}, {"_id": 0}).sort("created_at", -1).to_list(PROFILE_KEEP)
+
+@api_router.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, user: dict = Depends(verify_token)):
+    """Collapsed stacks for flamegraph.pl or speedscope"""
+    profile = await db.profiles.find_one({"id": profile_id}, {"_id": 0, "id": 1})
+    path = PROFILE_DIR / f"{profile_id}.folded"
+    if not profile or not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(
+        path,
+        media_type="text/plain",
+        headers={"Content-Disposition": f"attachment; filename=profile-{profile_id}.folded"}
+    )
+
+# --- RENDER SERVICE ---
+
+# Process pool for CPU-heavy renderers; 0 workers renders in a thread instead
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', '2'))
+# Jobs allowed in flight (running + queued) before new exports are rejected
+RENDER_MAX_PENDING = int(os.environ.get('RENDER_MAX_PENDING', '8'))
+RENDER_TIMEOUT_SECONDS = float(os.environ.get('RENDER_TIMEOUT_SECONDS', '120'))
+
+class RenderService:
+    """Runs synchronous renderers in a process pool with a bounded queue.
+    
+    A job holds its queue slot until the worker actually finishes, so a
+    render that outlives its timeout still counts against the bound.
+    """
+    
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._executor = None
+        self._slot_freed = None
+    
+    def _get_executor(self):
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+    
+    def _release(self, _future):
+        self.pending -= 1
+        if self._slot_freed is not None:
+            self._slot_freed.set()
+    
+    async def run(self, func, *args, wait: bool = False):
+        """Run func(*args) off the event loop and return its result.
+        
+        When the queue is full a request is turned away with 503, unless
+        wait is set, in which case the call queues for the next free slot.
+        """
+        while self.pending >= self.max_pending:
+            if not wait:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Export queue is full, please retry shortly",
+                    headers={"Retry-After": "5"}
+                )
+            if self._slot_freed is None:
+                self._slot_freed = asyncio.Event()
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            future = loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise HTTPException(status_code=503, detail="Export workers restarting, please retry", headers={"Retry-After": "5"})
+        self.pending += 1
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Export timed out")
+        except BrokenProcessPool:
+            # A worker died (OOM kill, crash in a native library); the pool
+            # refuses all further work, so start a fresh one on the next call
+            logger.error("Render worker died; replacing the process pool")
+            self._discard_executor(executor)
+            raise HTTPException(status_code=503, detail="Export workers restarting, please retry", headers={"Retry-After": "5"})
+    
+    def _discard_executor(self, executor):
+        if executor is not None and executor is self._executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+render_service = RenderService(RENDER_WORKERS, RENDER_MAX_PENDING, RENDER_TIMEOUT_SECONDS)
+
+# Latest PDF image cache stats reported by each render worker, keyed by pid
+render_cache_stats = {}
+
+@api_router.get("/admin/indexes")
+async def get_index_report(user: dict = Depends(verify_token)):
+    """Expected vs. present indexes per collection, plus the startup bootstrap outcome"""
+    collections = {}
+    for collection_name, models in INDEX_SPECS.items():
+        existing = await db[collection_name].index_information()
+        collections[collection_name] = {
+            "expected": [model.document['name'] for model in models],
+            "present": {name: dict(info["key"]) for name, info in existing.items()},
+            "bootstrap": index_bootstrap_report.get(collection_name, {}),
+        }
+    return {"collections": collections}
+
+@api_router.get("/admin/render-cache")
+async def get_render_cache_stats(user: dict = Depends(verify_token)):
+    """PDF image cache hit/miss counters, summed over render workers"""
+    totals = {"entries": 0, "size_bytes": 0, "hits": 0, "misses": 0}
+    for stats in render_cache_stats.values():
+        for key in totals:
+            totals[key] += stats[key]
+    lookups = totals["hits"] + totals["misses"]
+    totals["hit_rate"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+    return {"totals": totals, "workers": {str(pid): stats for pid, stats in render_cache_stats.items()}}
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Request, Mongo, outbound HTTP and render timings in Prometheus text format.
+    
+    Counts are for this process only (see METRICS); X-Metrics-Worker names
+    the process so scrapes landing on different workers can be told apart.
+    """
+    render_queue_pending.set((), render_service.pending)
+    return Response(
+        content=render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+        headers={"X-Metrics-Worker": str(os.getpid())},
+    )
+
+# --- EXPORT CACHE ---
+
+# Bump whenever generate_pdf / generate_ppt output changes, to retire cached files
+EXPORT_RENDERER_VERSION = "2"
+
+# Disk budget for rendered exports; least recently used files go first
+EXPORT_CACHE_MAX_MB = int(os.environ.get('EXPORT_CACHE_MAX_MB', '1024'))
+# Files this young are never deleted: a response may still be streaming them
+EXPORT_CACHE_GRACE_SECONDS = 60
+# Leftover .tmp files older than this belong to a render that died
+EXPORT_CACHE_TMP_EXPIRY_SECONDS = 3600
+EXPORT_CACHE_PRUNE_INTERVAL = 30
+
+class ExportCache:
+    """Rendered exports on disk, one directory per order.
+    
+    Files are named by their ETag, which already covers the order's
+    updated_at, the template settings, the logo and the renderer version,
+    so a stale file can never be served; files are still removed on
+    order/settings changes to reclaim the space, and the least recently
+    used ones when the cache grows past max_bytes. Directories are left in
+    place and files younger than EXPORT_CACHE_GRACE_SECONDS are spared, so
+    a render writing its tmp file or a response streaming a file is never
+    pulled out from under. All deletes run in a worker thread.
+    """
+    
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._last_prune = 0.0
+    
+    def _order_dir(self, order_id: str) -> Path:
+        return self.root / re.sub(r'[^A-Za-z0-9_-]', '_', order_id)
+    
+    def path(self, order_id: str, etag: str, ext: str) -> Path:
+        name = etag.strip('"')
+        return self._order_dir(order_id) / f"{name}.{ext}"
+    
+    def touch(self, path: Path) -> bool:
+        """Mark a cached file as used; False if it is not there"""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+    
+    @staticmethod
+    def _remove_files(directory: Path, cutoff: float) -> int:
+        removed = 0
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file() and not entry.name.endswith('.tmp') and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+    
+    async def invalidate_order(self, order_id: str):
+        cutoff = time.time() - EXPORT_CACHE_GRACE_SECONDS
+        await asyncio.to_thread(self._remove_files, self._order_dir(order_id), cutoff)
+    
+    async def clear(self):
+        cutoff = time.time() - EXPORT_CACHE_GRACE_SECONDS
+        
+        def remove_all():
+            for directory in (self.root.iterdir() if self.root.exists() else []):
+                if directory.is_dir():
+                    self._remove_files(directory, cutoff)
+        
+        await asyncio.to_thread(remove_all)
+    
+    def prune(self) -> int:
+        """Delete least recently used files until the cache fits max_bytes; returns bytes freed"""
+        now = time.time()
+        files = []
+        for path in self.root.glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.endswith('.tmp'):
+                if stat.st_mtime < now - EXPORT_CACHE_TMP_EXPIRY_SECONDS:
+                    path.unlink(missing_ok=True)
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        freed = 0
+        for mtime, size, path in sorted(files):
+            if total - freed <= self.max_bytes:
+                break
+            if mtime >= now - EXPORT_CACHE_GRACE_SECONDS:
+                continue
+            path.unlink(missing_ok=True)
+            freed += size
+        return freed
+    
+    async def maybe_prune(self):
+        """prune() in a worker thread, at most every EXPORT_CACHE_PRUNE_INTERVAL seconds"""
+        if time.monotonic() - self._last_prune < EXPORT_CACHE_PRUNE_INTERVAL:
+            return
+        self._last_prune = time.monotonic()
+        freed = await asyncio.to_thread(self.prune)
+        if freed:
+            logger.info(f"Export cache pruned {freed} bytes")
+
+export_cache = ExportCache(CACHE_DIR / 'exports', EXPORT_CACHE_MAX_MB * 1024 * 1024)
+
+def export_etag(order: dict, settings: dict, logo_bytes: Optional[bytes], ext: str) -> str:
+    """Strong ETag identifying one rendering of an order"""
+    settings_hash = hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+    logo_hash = hashlib.sha256(logo_bytes).hexdigest() if logo_bytes else ''
+    key = '|'.join([
+        order.get('id', ''), order.get('updated_at', ''), settings_hash, logo_hash, EXPORT_RENDERER_VERSION, ext
+    ])
+    return f'"{hashlib.sha256(key.encode()).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags or f"W/{etag}" in tags
+
+def export_cache_headers(etag: str) -> dict:
+    # no-cache: the browser may keep the file but must revalidate (cheap 304)
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+EXPORT_FILE_JOBS = {"pdf": render_pdf_file_job, "pptx": render_ppt_file_job}
+
+async def render_export_file(order: dict, settings: dict, logo_bytes: Optional[bytes], etag: str, ext: str, wait: bool = False):
+    """Path of the cached export for etag, rendering it in a worker if missing.
+    
+    Returns (path, rendered) where rendered is False on a cache hit.
+    """
+    path = export_cache.path(order['id'], etag, ext)
+    profile_stacks = active_profile.get()
+    # A profiled request always renders, so there is something to profile
+    if profile_stacks is None and export_cache.touch(path):
+        return path, False
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        if profile_stacks is None:
+            worker_pid, cache_stats = await render_service.run(
+                EXPORT_FILE_JOBS[ext], order, settings, logo_bytes, str(path), wait=wait
+            )
+        else:
+            (worker_pid, cache_stats), stacks = await render_service.run(
+                profiled_job, EXPORT_FILE_JOBS[ext], order, settings, logo_bytes, str(path), wait=wait
+            )
+            for stack, count in stacks.items():
+                profile_stacks[stack] = profile_stacks.get(stack, 0) + count
+        outcome = 'ok'
+    except HTTPException as e:
+        outcome = {503: 'rejected', 504: 'timeout'}.get(e.status_code, 'error')
+        raise
+    finally:
+        render_duration.observe((ext, outcome), time.perf_counter() - start)
+    if cache_stats is not None:
+        render_cache_stats[worker_pid] = cache_stats
+    await export_cache.maybe_prune()
+    return path, True
+
+async def load_export_order(order_id: str) -> dict:
     order = await db.orders.find_one({"id": order_id}, {"_id": 0})
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    
+    return order
+
+async def load_export_settings():
+    """Template settings and logo bytes shared by every export"""
     settings = await db.template_settings.find_one({"id": "default"}, {"_id": 0})
     if not settings:
         settings = TemplateSettings().model_dump()
+    return settings, get_logo_bytes(settings)
+
+@api_router.get("/orders/{order_id}/export/pdf")
+async def export_order_pdf(order_id: str, request: Request, run_async: bool = Query(False, alias="async")):
+    if run_async:
+        await load_export_order(order_id)
+        return await submit_job("export_pdf", {"order_id": order_id})
     
-    # Fetch logo image
-    logo_bytes = await fetch_image_bytes(JAIPUR_LOGO_URL)
+    order = await load_export_order(order_id)
+    settings, logo_bytes = await load_export_settings()
+    filename = f"order_{order.get('sales_order_ref', order_id)}.pdf"
     
-    pdf_bytes = generate_pdf(order, settings, logo_bytes)
+    etag = export_etag(order, settings, logo_bytes, "pdf")
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=export_cache_headers(etag))
     
-    export_record = ExportRecord(
-        order_id=order_id,
-        export_type="pdf",
-        filename=f"order_{order.get('sales_order_ref', order_id)}.pdf"
-    )
-    await db.exports.insert_one(export_record.model_dump())
+    # The render worker writes the PDF into the export cache and the response
+    # streams it from disk in chunks, so the API process never holds the document
+    pdf_path, rendered = await render_export_file(order, settings, logo_bytes, etag, "pdf")
+    if rendered:
+        export_record = ExportRecord(order_id=order_id, export_type="pdf", filename=filename)
+        await db.exports.insert_one(export_record.model_dump())
     
-    return StreamingResponse(
-        io.BytesIO(pdf_bytes),
+    return FileResponse(
+        pdf_path,
         media_type="application/pdf",
-        headers={"Content-Disposition": f"inline; filename=order_{order.get('sales_order_ref', order_id)}.pdf"}
+        headers={"Content-Disposition": f"inline; filename={filename}", **export_cache_headers(etag)}
     )
 
 @api_router.get("/orders/{order_id}/preview-html")
@@ -1095,33 +2726,73 @@ async def preview_order_html(order_id: str):
 
 # --- PPT EXPORT ---
 
-@api_router.get("/orders/{order_id}/export/ppt")
-async def export_order_ppt(order_id: str):
-    order = await db.orders.find_one({"id": order_id}, {"_id": 0})
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+# Pixels per inch kept for pictures embedded in PPT exports
+PPT_IMAGE_DPI = int(os.environ.get('PPT_IMAGE_DPI', '150'))
+PPT_IMAGE_JPEG_QUALITY = int(os.environ.get('PPT_IMAGE_JPEG_QUALITY', '85'))
+
+def fit_image_to_slot(data: bytes, width_in: float, height_in: Optional[float] = None, dpi: int = PPT_IMAGE_DPI) -> bytes:
+    """Re-encode an image so it has no more pixels than its slide slot can show.
     
-    settings = await db.template_settings.find_one({"id": "default"}, {"_id": 0})
-    if not settings:
-        settings = TemplateSettings().model_dump()
+    With height_in the picture is stretched to the slot, so each axis is capped
+    on its own; without it the aspect ratio is kept. Images that already fit
+    are returned untouched.
+    """
+    img = PILImage.open(io.BytesIO(data))
+    max_width = max(1, int(width_in * dpi))
+    if height_in is None:
+        max_height = max(1, round(img.height * max_width / img.width))
+    else:
+        max_height = max(1, int(height_in * dpi))
+    target = (min(img.width, max_width), min(img.height, max_height))
+    if target == img.size and img.format in ('JPEG', 'PNG'):
+        return data
+    
+    img = img.resize(target, PILImage.LANCZOS)
+    out = io.BytesIO()
+    if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+        img.save(out, format='PNG', optimize=True)
+    else:
+        img.convert('RGB').save(out, format='JPEG', quality=PPT_IMAGE_JPEG_QUALITY, optimize=True)
+    return out.getvalue()
+
+# Serialized base deck (page size plus the logo title slide) per logo hash;
+# every export opens a copy of it instead of rebuilding the logo slide
+ppt_base_decks = {}
+
+def get_ppt_base_deck(logo_bytes: Optional[bytes]) -> bytes:
+    key = hashlib.sha256(logo_bytes).hexdigest() if logo_bytes else ''
+    deck = ppt_base_decks.get(key)
+    if deck is not None:
+        return deck
     
     prs = Presentation()
     prs.slide_width = Inches(10)
     prs.slide_height = Inches(7.5)
-    
-    # Title slide
-    title_slide_layout = prs.slide_layouts[6]  # Blank layout
-    slide = prs.slides.add_slide(title_slide_layout)
+    slide = prs.slides.add_slide(prs.slide_layouts[6])  # Blank layout
     
     # Add logo image to title slide
     try:
-        logo_bytes = await fetch_image_bytes(JAIPUR_LOGO_URL)
         if logo_bytes:
-            logo_stream = io.BytesIO(logo_bytes)
+            logo_stream = io.BytesIO(fit_image_to_slot(logo_bytes, 3))
             slide.shapes.add_picture(logo_stream, Inches(3.5), Inches(2), width=Inches(3))
     except:
         pass
     
+    out = io.BytesIO()
+    prs.save(out)
+    # Only the current logo is ever requested again
+    ppt_base_decks.clear()
+    ppt_base_decks[key] = deck = out.getvalue()
+    return deck
+
+def generate_ppt(order: dict, settings: dict, logo_bytes: bytes = None, output=None) -> Optional[bytes]:
+    """Generate the PPTX production sheet: a title slide plus one slide per item"""
+    prs = Presentation(io.BytesIO(get_ppt_base_deck(logo_bytes)))
+    
+    # Title slide
+    title_slide_layout = prs.slide_layouts[6]  # Blank layout
+    slide = prs.slides[0]
+    
     # Title text
     txBox = slide.shapes.add_textbox(Inches(0.5), Inches(4.5), Inches(9), Inches(1))
     tf = txBox.text_frame
@@ -1164,11 +2835,10 @@ Buyer PO: {order.get('buyer_po_ref', 'N/A')}"""
         
         # Product image (left side, 70%)
         product_image = item.get('product_image') or (item.get('images', [None])[0] if item.get('images') else None)
-        if product_image and product_image.startswith('data:image'):
+        img_bytes = load_image_bytes(product_image)
+        if img_bytes:
             try:
-                img_data = product_image.split(',')[1]
-                img_bytes = base64.b64decode(img_data)
-                img_stream = io.BytesIO(img_bytes)
+                img_stream = io.BytesIO(fit_image_to_slot(img_bytes, 6, 4))
                 slide.shapes.add_picture(img_stream, Inches(0.3), Inches(1), width=Inches(6), height=Inches(4))
             except:
                 # Add placeholder text
@@ -1226,34 +2896,211 @@ Wood Finish: {item.get('wood_finish', 'N/A')}"""
         p.font.size = Pt(11)
         p.font.bold = True
     
+    if output is not None:
+        prs.save(output)
+        return None
+    
     ppt_bytes = io.BytesIO()
     prs.save(ppt_bytes)
-    ppt_bytes.seek(0)
+    return ppt_bytes.getvalue()
+
+@api_router.get("/orders/{order_id}/export/ppt")
+async def export_order_ppt(order_id: str, request: Request, run_async: bool = Query(False, alias="async")):
+    if run_async:
+        await load_export_order(order_id)
+        return await submit_job("export_ppt", {"order_id": order_id})
+    
+    order = await load_export_order(order_id)
+    settings, logo_bytes = await load_export_settings()
+    filename = f"order_{order.get('sales_order_ref', order_id)}.pptx"
+    
+    etag = export_etag(order, settings, logo_bytes, "pptx")
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=export_cache_headers(etag))
     
-    export_record = ExportRecord(
-        order_id=order_id,
-        export_type="ppt",
-        filename=f"order_{order.get('sales_order_ref', order_id)}.pptx"
+    ppt_path, rendered = await render_export_file(order, settings, logo_bytes, etag, "pptx")
+    if rendered:
+        export_record = ExportRecord(order_id=order_id, export_type="ppt", filename=filename)
+        await db.exports.insert_one(export_record.model_dump())
+    
+    return FileResponse(
+        ppt_path,
+        media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        headers={"Content-Disposition": f"attachment; filename={filename}", **export_cache_headers(etag)}
     )
-    await db.exports.insert_one(export_record.model_dump())
+
+# --- ZIP EXPORT ---
+
+ZIP_EXPORT_MAX_ORDERS = int(os.environ.get('ZIP_EXPORT_MAX_ORDERS', '200'))
+ZIP_EXPORT_FORMATS = {"pdf": ["pdf"], "ppt": ["pptx"], "both": ["pdf", "pptx"]}
+ZIP_CHUNK_SIZE = 1024 * 1024
+
+class ZipStreamSink:
+    """Write-only file object collecting ZipFile output between yields.
+    
+    It has no tell()/seek(), so ZipFile writes entries in streaming form
+    (sizes in data descriptors) and never rewinds.
+    """
+    
+    def __init__(self):
+        self._chunks = []
     
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def copy_zip_chunk(source, entry) -> bool:
+    """Copy one chunk of source into the archive entry; False once source is exhausted"""
+    chunk = source.read(ZIP_CHUNK_SIZE)
+    if not chunk:
+        return False
+    entry.write(chunk)
+    return True
+
+def zip_entry_name(order: dict, ext: str, used: set) -> str:
+    base = re.sub(r'[^A-Za-z0-9._-]', '_', f"order_{order.get('sales_order_ref') or order['id']}")
+    name = f"{base}.{ext}"
+    if name in used:
+        name = f"{base}_{order['id'][:8]}.{ext}"
+    used.add(name)
+    return name
+
+def validate_zip_export(request_data: ZipExportRequest):
+    """De-duplicated order ids and the file extensions to render, or 400"""
+    extensions = ZIP_EXPORT_FORMATS.get(request_data.format)
+    if not extensions:
+        raise HTTPException(status_code=400, detail="Format must be pdf, ppt or both")
+    order_ids = list(dict.fromkeys(request_data.order_ids))
+    if not order_ids:
+        raise HTTPException(status_code=400, detail="No orders selected")
+    if len(order_ids) > ZIP_EXPORT_MAX_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {ZIP_EXPORT_MAX_ORDERS} orders per export")
+    return order_ids, extensions
+
+async def load_zip_orders(order_ids: List[str]):
+    """Orders in request order plus an error line for each id not found"""
+    orders = await db.orders.find({"id": {"$in": order_ids}}, {"_id": 0}).to_list(len(order_ids))
+    if not orders:
+        raise HTTPException(status_code=404, detail="Order not found")
+    position = {order_id: i for i, order_id in enumerate(order_ids)}
+    orders.sort(key=lambda order: position[order['id']])
+    found = {order['id'] for order in orders}
+    errors = [f"{order_id}: order not found" for order_id in order_ids if order_id not in found]
+    return orders, errors
+
+def zip_archive_name() -> str:
+    return f"orders_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.zip"
+
+async def zip_export_chunks(orders: List[dict], extensions: List[str], export_type: str,
+                            archive_name: str, errors: List[str], progress=None):
+    """Yield the ZIP archive of the orders' exports chunk by chunk.
+    
+    Renders run concurrently in the render workers and each file is added
+    to the archive as soon as it is ready. PDF and PPTX are compressed
+    already, so entries are stored as-is, and the file reads and archive
+    writes run in a thread to keep the event loop free. Files that fail are
+    listed in errors.txt inside the archive, since a streamed response has
+    already sent its status line.
+    """
+    settings, logo_bytes = await load_export_settings()
+    # One archive never takes more render slots than there are workers, so
+    # single-order exports keep getting through while a big ZIP is running
+    archive_slots = asyncio.Semaphore(max(1, RENDER_WORKERS))
+    
+    async def render(order: dict, ext: str):
+        etag = export_etag(order, settings, logo_bytes, ext)
+        try:
+            async with archive_slots:
+                path, _ = await render_export_file(order, settings, logo_bytes, etag, ext, wait=True)
+        except HTTPException as e:
+            return order, ext, None, e.detail
+        except Exception as e:
+            logger.error(f"ZIP export of order {order['id']} ({ext}) failed: {e}")
+            return order, ext, None, str(e)
+        return order, ext, path, None
+    
+    tasks = [asyncio.ensure_future(render(order, ext)) for order in orders for ext in extensions]
+    sink = ZipStreamSink()
+    used_names = set()
+    exported = set()
+    try:
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for files_done, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                order, ext, path, error = await next_done
+                if path is not None:
+                    try:
+                        source = open(path, 'rb')
+                    except OSError as e:
+                        error = str(e)
+                if error:
+                    errors.append(f"{order.get('sales_order_ref') or order['id']} ({ext}): {error}")
+                else:
+                    with source, archive.open(zip_entry_name(order, ext, used_names), 'w') as entry:
+                        while await asyncio.to_thread(copy_zip_chunk, source, entry):
+                            data = sink.drain()
+                            if data:
+                                yield data
+                    exported.add(order['id'])
+                    yield sink.drain()
+                if progress:
+                    await progress("rendering", files_done, len(tasks))
+            
+            if errors:
+                archive.writestr("errors.txt", "\n".join(errors) + "\n")
+        
+        if exported:
+            records = [
+                ExportRecord(order_id=order['id'], export_type=export_type, filename=archive_name).model_dump()
+                for order in orders if order['id'] in exported
+            ]
+            try:
+                await db.exports.insert_many(records)
+            except PyMongoError as e:
+                logger.warning(f"Could not record ZIP export {archive_name}: {e}")
+        yield sink.drain()
+    finally:
+        # Consumer went away: stop waiting on renders that have not started
+        for task in tasks:
+            task.cancel()
+
+@api_router.post("/orders/export/zip")
+async def export_orders_zip(request_data: ZipExportRequest, run_async: bool = Query(False, alias="async")):
+    """Render several orders and stream them back as one ZIP"""
+    order_ids, extensions = validate_zip_export(request_data)
+    if run_async:
+        return await submit_job("export_zip", {"order_ids": order_ids, "format": request_data.format})
+    
+    orders, errors = await load_zip_orders(order_ids)
+    archive_name = zip_archive_name()
     return StreamingResponse(
-        ppt_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        headers={"Content-Disposition": f"attachment; filename=order_{order.get('sales_order_ref', order_id)}.pptx"}
+        zip_export_chunks(orders, extensions, request_data.format, archive_name, errors),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={archive_name}"}
     )
 
 # --- EXPORT HISTORY ---
 
 @api_router.get("/exports", response_model=List[ExportRecord])
-async def get_exports():
-    exports = await db.exports.find({}, {"_id": 0}).to_list(1000)
-    return exports
+async def get_exports(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, pattern="^summary$")
+):
+    exports, next_cursor = await fetch_page(db.exports, {}, limit, cursor, fields)
+    return page_response(exports, next_cursor)
 
 @api_router.get("/exports/{order_id}", response_model=List[ExportRecord])
 async def get_order_exports(order_id: str):
     exports = await db.exports.find({"order_id": order_id}, {"_id": 0}).to_list(100)
-    return exports
+    return trusted_response(exports)
 
 # --- SAMPLE EXCEL TEMPLATES ---
 
@@ -1347,43 +3194,254 @@ async def download_factories_sample():
 
 # --- PRODUCTS ---
 
+def normalize_product_code(code: str) -> str:
+    """Case- and whitespace-insensitive form of a product code (unique-indexed)"""
+    return (code or '').strip().upper()
+
+def description_words(description: str) -> List[str]:
+    """Distinct lower-cased words of a description, indexed for word-prefix search"""
+    return sorted(set(re.findall(r"\w+", (description or '').lower())))
+
+def with_product_keys(doc: dict) -> dict:
+    """Set the derived lookup fields for the product_code/description doc carries"""
+    if 'product_code' in doc:
+        doc['product_code_key'] = normalize_product_code(doc['product_code'])
+    if 'description' in doc:
+        doc['description_words'] = description_words(doc['description'])
+    return doc
+
+# --- PRODUCT CACHE ---
+
+PRODUCT_CACHE_MAX_BYTES = int(os.environ.get('PRODUCT_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+CATALOG_VERSION_ID = "catalog"
+
+def object_size(value) -> int:
+    """Approximate memory footprint of a document (dicts, lists and scalars)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(object_size(key) + object_size(item) for key, item in value.items())
+    elif isinstance(value, list):
+        size += sum(object_size(item) for item in value)
+    return size
+
+class ProductCache:
+    """Read-through cache of product documents, by id and by normalized code.
+    
+    Bounded by the approximate memory of its entries, least recently used
+    evicted first. Every product write bumps a catalog version kept in
+    Mongo; each lookup reads it (one point read on counters) before
+    touching the cache and drops the whole cache when it moved, so every
+    uvicorn worker sees another worker's write on its next lookup. A
+    document is only stored under the version read before it was fetched,
+    and only while that is still the newest version seen, so a read that
+    races a write in another worker is retired by the next lookup.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # id -> (doc, size)
+        self._ids_by_code = {}
+        self.size = 0
+        self.version = None
+    
+    def clear(self):
+        self._entries.clear()
+        self._ids_by_code.clear()
+        self.size = 0
+        self.version = None
+        product_cache_bytes.set((), 0)
+    
+    async def _sync_version(self) -> int:
+        doc = await db.counters.find_one({"id": CATALOG_VERSION_ID}, {"_id": 0, "version": 1})
+        version = doc.get("version", 0) if doc else 0
+        # Concurrent lookups may finish their reads out of order; only move forward
+        if self.version is None or version > self.version:
+            self.clear()
+            self.version = version
+        return version
+    
+    def _drop(self, product_id: str):
+        entry = self._entries.pop(product_id, None)
+        if entry is None:
+            return
+        doc, size = entry
+        self.size -= size
+        code_key = normalize_product_code(doc.get('product_code', ''))
+        if self._ids_by_code.get(code_key) == product_id:
+            del self._ids_by_code[code_key]
+    
+    def _put(self, doc: dict, version: int):
+        size = object_size(doc)
+        if version != self.version or size > self.max_bytes:
+            return
+        self._drop(doc['id'])
+        self._entries[doc['id']] = (doc, size)
+        self._ids_by_code[normalize_product_code(doc.get('product_code', ''))] = doc['id']
+        self.size += size
+        while self.size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+        product_cache_bytes.set((), self.size)
+    
+    async def _lookup(self, product_id: Optional[str], query: dict) -> Optional[dict]:
+        version = await self._sync_version()
+        if version == self.version and product_id in self._entries:
+            self._entries.move_to_end(product_id)
+            product_cache_lookups.inc(('hit',))
+            return self._entries[product_id][0]
+        product_cache_lookups.inc(('miss',))
+        doc = await db.products.find_one(query, read_projection("products"))
+        if doc:
+            self._put(doc, version)
+        return doc
+    
+    async def get(self, product_id: str) -> Optional[dict]:
+        """The product with this id, or None. The document is shared: do not modify it"""
+        return await self._lookup(product_id, {"id": product_id})
+    
+    async def get_by_code(self, product_code: str) -> Optional[dict]:
+        """The product whose code matches case- and whitespace-insensitively, or None.
+        
+        A code no cached product has is looked up on the product_code_key index.
+        """
+        code_key = normalize_product_code(product_code)
+        return await self._lookup(self._ids_by_code.get(code_key), {"product_code_key": code_key})
+
+product_cache = ProductCache(PRODUCT_CACHE_MAX_BYTES)
+
+async def bump_catalog_version():
+    """Retire cached products in every worker; call after any product write"""
+    await db.counters.update_one({"id": CATALOG_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True)
+    product_cache.clear()
+
+async def backfill_product_keys() -> int:
+    """Set product_code_key and description_words on products written before they existed"""
+    cursor = db.products.find(
+        {"$or": [{"product_code_key": {"$exists": False}}, {"description_words": {"$exists": False}}]},
+        {"_id": 0, "id": 1, "product_code": 1, "description": 1}
+    )
+    updates = [
+        UpdateOne({"id": doc["id"]}, {"$set": with_product_keys({
+            "product_code": doc.get("product_code", ""), "description": doc.get("description", "")
+        })})
+        async for doc in cursor
+    ]
+    if updates:
+        await db.products.bulk_write(updates, ordered=False)
+        logger.info(f"Backfilled product lookup keys on {len(updates)} products")
+    return len(updates)
+
 @api_router.get("/products", response_model=List[Product])
-async def get_products():
-    products = await db.products.find({}, {"_id": 0}).to_list(1000)
-    return products
+async def get_products(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, pattern="^summary$"),
+    category: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100)
+):
+    """Products, newest first; category and q (code or description) filter on the server.
+    
+    The first page (no cursor) also carries the matching total in X-Total-Count.
+    """
+    query = search_filter(q, ['product_code', 'description'])
+    if category:
+        query["category"] = category
+    products, next_cursor = await fetch_page(db.products, query, limit, cursor, fields)
+    total = None if cursor else await count_matching(db.products, query)
+    return page_response(products, next_cursor, total)
+
+# What the product pickers show and copy into an order or quotation item
+PRODUCT_SEARCH_FIELDS = [
+    'id', 'product_code', 'description', 'category', 'size', 'height_cm', 'depth_cm', 'width_cm', 'cbm',
+    'fob_price_usd', 'fob_price_gbp', 'warehouse_price_1', 'warehouse_price_2', 'image',
+]
+PRODUCT_SEARCH_MAX_LIMIT = 50
+
+@api_router.get("/products/search")
+async def search_products(
+    q: str = Query('', max_length=100),
+    limit: int = Query(20, ge=1, le=PRODUCT_SEARCH_MAX_LIMIT)
+):
+    """Product picker lookup, a few KB instead of the whole catalog.
+    
+    Product code prefix matches come first (an exact code sorts ahead of
+    its longer siblings), then text matches on description and category by
+    relevance, then descriptions with words starting with each word of q,
+    on the indexed description_words (the text index stems whole words,
+    so "din" alone does not find "Dining Table"). An empty query lists the
+    first products by code.
+    """
+    projection = {"_id": 0, **{field: 1 for field in PRODUCT_SEARCH_FIELDS}}
+    code_key = normalize_product_code(q)
+    query = {"product_code_key": {"$regex": f"^{re.escape(code_key)}"}} if code_key else {}
+    results = await db.products.find(query, projection).sort("product_code_key", ASCENDING).limit(limit).to_list(limit)
+    if not code_key:
+        return trusted_response(results)
+    
+    seen = {doc['id'] for doc in results}
+    def add(docs):
+        for doc in docs:
+            doc.pop('score', None)
+            if doc['id'] not in seen and len(results) < limit:
+                seen.add(doc['id'])
+                results.append(doc)
+    
+    if len(results) < limit:
+        try:
+            add(await db.products.find(
+                {"$text": {"$search": q}}, {**projection, "score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(limit))
+        except OperationFailure as e:
+            # No text index (not built yet, or dropped): the other matches still answer
+            logger.warning(f"Product text search unavailable: {e}")
+    words = re.findall(r"\w+", q.lower())
+    if words and len(results) < limit:
+        # Anchored, case-sensitive prefixes of lower-cased words: index range scans
+        word_prefixes = [{"description_words": {"$regex": f"^{re.escape(word)}"}} for word in words]
+        add(await db.products.find({"$and": word_prefixes}, projection)
+            .sort("product_code_key", ASCENDING).limit(limit).to_list(limit))
+    return trusted_response(results)
 
 @api_router.get("/products/{product_id}", response_model=Product)
 async def get_product(product_id: str):
-    product = await db.products.find_one({"id": product_id}, {"_id": 0})
+    product = await product_cache.get(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return trusted_response(product)
 
 @api_router.post("/products", response_model=Product)
 async def create_product(product_data: ProductCreate):
-    # Check for duplicate product code
-    existing = await db.products.find_one(
-        {"product_code": {"$regex": f"^{product_data.product_code}$", "$options": "i"}},
-        {"_id": 0}
-    )
-    if existing:
+    # Check for duplicate product code (the unique index still guards the insert)
+    if await product_cache.get_by_code(product_data.product_code):
         raise HTTPException(status_code=400, detail=f"Product code '{product_data.product_code}' already exists")
     
     product = Product(**product_data.model_dump())
-    doc = product.model_dump()
-    await db.products.insert_one(doc)
-    return product
+    doc = with_product_keys(externalize_images(product.model_dump()))
+    try:
+        await db.products.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=f"Product code '{product_data.product_code}' already exists")
+    await bump_catalog_version()
+    return doc
 
 @api_router.put("/products/{product_id}", response_model=Product)
 async def update_product(product_id: str, product_data: ProductUpdate):
-    existing = await db.products.find_one({"id": product_id}, {"_id": 0})
-    if not existing:
+    if not await product_cache.get(product_id):
         raise HTTPException(status_code=404, detail="Product not found")
     
     update_data = {k: v for k, v in product_data.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    with_product_keys(externalize_images(update_data))
+    
+    if "product_code" in update_data:
+        duplicate = await product_cache.get_by_code(update_data["product_code"])
+        if duplicate and duplicate['id'] != product_id:
+            raise HTTPException(status_code=400, detail=f"Product code '{update_data['product_code']}' already exists")
     
-    await db.products.update_one({"id": product_id}, {"$set": update_data})
+    try:
+        await db.products.update_one({"id": product_id}, {"$set": update_data})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=f"Product code '{update_data['product_code']}' already exists")
+    await bump_catalog_version()
     updated = await db.products.find_one({"id": product_id}, {"_id": 0})
     return updated
 
@@ -1392,199 +3450,189 @@ async def delete_product(product_id: str):
     result = await db.products.delete_one({"id": product_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    await bump_catalog_version()
     return {"message": "Product deleted"}
 
 @api_router.post("/products/bulk")
 async def bulk_create_products(products: List[ProductCreate]):
-    created = []
-    for product_data in products:
+    rows = []
+    for row_number, product_data in enumerate(products, start=1):
         product = Product(**product_data.model_dump())
-        doc = product.model_dump()
-        await db.products.insert_one(doc)
-        created.append(product)
-    return {"message": f"{len(created)} products created", "products": created}
+        rows.append((row_number, with_product_keys(externalize_images(product.model_dump()))))
+    
+    failed = await insert_batched(db.products, rows)
+    await bump_catalog_version()
+    created = [Product(**doc) for row_number, doc in rows if row_number not in failed]
+    errors = [f"Row {row_number}: {message}" for row_number, message in sorted(failed.items())]
+    return {"message": f"{len(created)} products created", "products": created, "errors": errors}
 
 @api_router.post("/products/upload-excel")
-async def upload_products_excel(file: UploadFile = File(...)):
+async def upload_products_excel(
+    file: UploadFile = File(...),
+    mode: str = Query('insert', pattern=IMPORT_MODE_PATTERN),
+    run_async: bool = Query(False, alias="async")
+):
     """Upload products from Excel file with optional image URLs"""
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx or .xls)")
     
+    if run_async:
+        return await submit_import_job("import_products", file.filename, file.file, mode)
+    return await import_products_excel(file.file, mode)
+
+def product_header_in_first_row(header: list, first_row: list) -> bool:
+    """Whether the real headers (e.g. "Product Code", "Description") are in the first data row.
+    
+    This handles Excel files with merged header cells or wrong header detection.
+    """
+    first_row_values = ' '.join('nan' if value is None else str(value).lower() for value in first_row)
+    header_keywords = ['product code', 'description', 'cbm', 'photo link', 'h', 'd', 'w']
+    has_header_in_first_row = any(keyword in first_row_values for keyword in header_keywords)
+    return has_header_in_first_row or any(value is None or 'unnamed' in str(value).lower() for value in header)
+
+def safe_float(val, default=0):
+    """Parse a numeric cell, falling back to default for blanks and text"""
     try:
-        # Read Excel file
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        
-        # Check if first row contains actual headers (e.g., "Product Code", "Description")
-        # This handles Excel files with merged header cells or wrong header detection
-        first_row_values = df.iloc[0].astype(str).str.lower().tolist()
-        header_keywords = ['product code', 'description', 'cbm', 'photo link', 'h', 'd', 'w']
-        has_header_in_first_row = any(keyword in ' '.join(first_row_values) for keyword in header_keywords)
-        
-        if has_header_in_first_row or any('unnamed' in str(col).lower() for col in df.columns):
-            # First row contains actual headers - use it and skip
-            new_headers = df.iloc[0].astype(str).tolist()
-            df = df.iloc[1:].reset_index(drop=True)
-            df.columns = new_headers
-        
-        # Normalize column names (handle various formats)
-        column_mapping = {
-            'product code': 'product_code',
-            'productcode': 'product_code',
-            'item code': 'product_code',
-            'itemcode': 'product_code',
-            'code': 'product_code',
-            'description': 'description',
-            'desc': 'description',
-            'size': 'size',
-            'size ( in cm )': 'size',
-            'size (cm)': 'size',
-            'h': 'height_cm',
-            'height': 'height_cm',
-            'height_cm': 'height_cm',
-            'd': 'depth_cm',
-            'depth': 'depth_cm',
-            'depth_cm': 'depth_cm',
-            'w': 'width_cm',
-            'width': 'width_cm',
-            'width_cm': 'width_cm',
-            'cbm': 'cbm',
-            'fob india price $': 'fob_price_usd',
-            'fob $': 'fob_price_usd',
-            'fob_price_usd': 'fob_price_usd',
-            'fob india price £': 'fob_price_gbp',
-            'fob £': 'fob_price_gbp',
-            'fob_price_gbp': 'fob_price_gbp',
-            'warehouse price £700': 'warehouse_price_1',
-            'warehouse_price_1': 'warehouse_price_1',
-            'warehouse price £2000': 'warehouse_price_2',
-            'warehouse_price_2': 'warehouse_price_2',
-            'photo link': 'image_url',
-            'photolink': 'image_url',
-            'image': 'image_url',
-            'image_url': 'image_url',
-            'photo': 'image_url',
-            'picture': 'image_url',
-            'category': 'category',
-        }
-        
-        # Rename columns
-        df.columns = df.columns.str.lower().str.strip()
-        df = df.rename(columns=column_mapping)
-        
-        created_products = []
-        skipped = 0
-        errors = []
-        
-        for idx, row in df.iterrows():
-            try:
-                # Skip rows without product code
-                product_code = str(row.get('product_code', '')).strip()
-                if not product_code or product_code == 'nan' or product_code == '':
-                    skipped += 1
-                    continue
-                
-                # Parse numeric fields safely
-                def safe_float(val, default=0):
-                    try:
-                        if pd.isna(val) or val == '' or val == 'nan':
-                            return default
-                        return float(val)
-                    except:
-                        return default
-                
-                # Build product data
-                product_data = {
-                    'product_code': product_code.upper(),
-                    'description': str(row.get('description', '')).strip() if pd.notna(row.get('description')) else '',
-                    'size': str(row.get('size', '')).strip() if pd.notna(row.get('size')) else '',
-                    'category': str(row.get('category', '')).strip() if pd.notna(row.get('category')) else '',
-                    'height_cm': safe_float(row.get('height_cm')),
-                    'depth_cm': safe_float(row.get('depth_cm')),
-                    'width_cm': safe_float(row.get('width_cm')),
-                    'cbm': safe_float(row.get('cbm')),
-                    'fob_price_usd': safe_float(row.get('fob_price_usd')),
-                    'fob_price_gbp': safe_float(row.get('fob_price_gbp')),
-                    'warehouse_price_1': safe_float(row.get('warehouse_price_1')),
-                    'warehouse_price_2': safe_float(row.get('warehouse_price_2')),
-                    'image': '',
-                    'images': []
-                }
-                
-                # Handle image URL - try to fetch and convert to base64
-                image_url = str(row.get('image_url', '')).strip() if pd.notna(row.get('image_url')) else ''
-                if image_url and image_url != 'nan' and image_url != '#REF!' and image_url.startswith('http'):
-                    try:
-                        async with httpx.AsyncClient(timeout=10.0) as client:
-                            response = await client.get(image_url)
-                            if response.status_code == 200:
-                                content_type = response.headers.get('content-type', 'image/jpeg')
-                                if 'image' in content_type:
-                                    image_base64 = base64.b64encode(response.content).decode('utf-8')
-                                    product_data['image'] = f"data:{content_type};base64,{image_base64}"
-                    except Exception as img_error:
-                        # Log but continue without image
-                        pass
-                
-                # Create product
-                product = Product(**product_data)
-                doc = product.model_dump()
-                await db.products.insert_one(doc)
-                created_products.append({
-                    'product_code': product.product_code,
-                    'description': product.description
-                })
-                
-            except Exception as row_error:
-                errors.append(f"Row {idx + 2}: {str(row_error)}")
-        
-        return {
-            "message": f"Successfully imported {len(created_products)} products",
-            "created": len(created_products),
-            "skipped": skipped,
-            "errors": errors[:10] if errors else [],  # Return first 10 errors only
-            "products": created_products[:20]  # Return first 20 products
-        }
-        
+        if val is None or val == '' or val == 'nan':
+            return default
+        return float(val)
+    except (TypeError, ValueError):
+        return default
+
+def parse_product_row(row: dict):
+    # Skip rows without product code
+    product_code = cell_text(row, 'product_code')
+    if not product_code or product_code == 'nan':
+        return None
+    
+    product_data = {
+        'product_code': product_code.upper(),
+        'description': cell_text(row, 'description'),
+        'size': cell_text(row, 'size'),
+        'category': cell_text(row, 'category'),
+        'height_cm': safe_float(row.get('height_cm')),
+        'depth_cm': safe_float(row.get('depth_cm')),
+        'width_cm': safe_float(row.get('width_cm')),
+        'cbm': safe_float(row.get('cbm')),
+        'fob_price_usd': safe_float(row.get('fob_price_usd')),
+        'fob_price_gbp': safe_float(row.get('fob_price_gbp')),
+        'warehouse_price_1': safe_float(row.get('warehouse_price_1')),
+        'warehouse_price_2': safe_float(row.get('warehouse_price_2')),
+        'image': '',
+        'images': []
+    }
+    
+    # Image URL is fetched into the image store as the batch is imported
+    image_url = cell_text(row, 'image_url')
+    if image_url == '#REF!' or not image_url.startswith('http'):
+        image_url = ''
+    
+    return with_product_keys(Product(**product_data).model_dump()), image_url
+
+async def import_products_excel(source, mode: str = 'insert', progress=None) -> dict:
+    # Normalize column names (handle various formats)
+    column_mapping = {
+        'product code': 'product_code',
+        'productcode': 'product_code',
+        'item code': 'product_code',
+        'itemcode': 'product_code',
+        'code': 'product_code',
+        'description': 'description',
+        'desc': 'description',
+        'size': 'size',
+        'size ( in cm )': 'size',
+        'size (cm)': 'size',
+        'h': 'height_cm',
+        'height': 'height_cm',
+        'height_cm': 'height_cm',
+        'd': 'depth_cm',
+        'depth': 'depth_cm',
+        'depth_cm': 'depth_cm',
+        'w': 'width_cm',
+        'width': 'width_cm',
+        'width_cm': 'width_cm',
+        'cbm': 'cbm',
+        'fob india price $': 'fob_price_usd',
+        'fob $': 'fob_price_usd',
+        'fob_price_usd': 'fob_price_usd',
+        'fob india price £': 'fob_price_gbp',
+        'fob £': 'fob_price_gbp',
+        'fob_price_gbp': 'fob_price_gbp',
+        'warehouse price £700': 'warehouse_price_1',
+        'warehouse_price_1': 'warehouse_price_1',
+        'warehouse price £2000': 'warehouse_price_2',
+        'warehouse_price_2': 'warehouse_price_2',
+        'photo link': 'image_url',
+        'photolink': 'image_url',
+        'image': 'image_url',
+        'image_url': 'image_url',
+        'photo': 'image_url',
+        'picture': 'image_url',
+        'category': 'category',
+    }
+    
+    try:
+        reader = ExcelRowReader(source, column_mapping, promote_header=product_header_in_first_row)
+        outcome = await import_excel_rows(reader, db.products, parse_product_row, mode, progress)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing Excel file: {str(e)}")
+    finally:
+        # Rows may have been written before a failure, so bump either way
+        if mode != 'dry_run':
+            await bump_catalog_version()
+    
+    created_products = [
+        {'product_code': doc['product_code'], 'description': doc['description']}
+        for doc in outcome['samples']
+    ]
+    return {
+        "message": import_message(outcome, f"Successfully imported {outcome['created']} products"),
+        **import_counts(outcome),
+        "skipped": outcome['skipped'],
+        "errors": outcome['errors'],  # First IMPORT_ERROR_LIMIT errors only
+        "products": created_products  # First IMPORT_SAMPLE_LIMIT products
+    }
 
 # --- DASHBOARD STATS ---
 
 @api_router.get("/dashboard/stats")
 async def get_dashboard_stats():
-    total_orders = await db.orders.count_documents({})
-    draft_orders = await db.orders.count_documents({"status": "Draft"})
-    in_production = await db.orders.count_documents({"status": "In Production"})
-    completed = await db.orders.count_documents({"status": "Done"})
+    counters = await db.counters.find_one({"id": ORDER_COUNTERS_ID}, {"_id": 0})
+    if not counters:
+        counters = await rebuild_order_counters()
+    by_status = counters.get("status", {})
     
-    recent_orders = await db.orders.find({}, {"_id": 0}).sort("created_at", -1).limit(5).to_list(5)
+    recent_orders, _ = await fetch_page(db.orders, {}, 5, None, "summary")
     
     return {
-        "total_orders": total_orders,
-        "draft_orders": draft_orders,
-        "in_production": in_production,
-        "completed": completed,
+        "total_orders": counters.get("total", 0),
+        "draft_orders": by_status.get("Draft", 0),
+        "in_production": by_status.get("In Production", 0),
+        "completed": by_status.get("Done", 0),
         "recent_orders": recent_orders
     }
 
 # --- QUOTATIONS ---
 
 @api_router.get("/quotations", response_model=List[Quotation])
-async def get_quotations():
-    quotations = await db.quotations.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return quotations
+async def get_quotations(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, pattern="^summary$")
+):
+    quotations, next_cursor = await fetch_page(db.quotations, {}, limit, cursor, fields)
+    return page_response(quotations, next_cursor)
 
 @api_router.get("/quotations/{quotation_id}", response_model=Quotation)
 async def get_quotation(quotation_id: str):
-    quotation = await db.quotations.find_one({"id": quotation_id}, {"_id": 0})
+    quotation = await db.quotations.find_one({"id": quotation_id}, read_projection("quotations"))
     if not quotation:
         raise HTTPException(status_code=404, detail="Quotation not found")
-    return quotation
+    return trusted_response(quotation)
 
 @api_router.post("/quotations", response_model=Quotation)
 async def create_quotation(quotation: QuotationCreate):
-    doc = Quotation(**quotation.model_dump()).model_dump()
+    doc = externalize_images(Quotation(**quotation.model_dump()).model_dump())
     await db.quotations.insert_one(doc)
     return doc
 
@@ -1596,6 +3644,7 @@ async def update_quotation(quotation_id: str, quotation: QuotationUpdate):
     
     update_data = {k: v for k, v in quotation.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    externalize_images(update_data)
     
     await db.quotations.update_one({"id": quotation_id}, {"$set": update_data})
     updated = await db.quotations.find_one({"id": quotation_id}, {"_id": 0})
@@ -1629,15 +3678,454 @@ async def duplicate_quotation(quotation_id: str):
     await db.quotations.insert_one(new_quotation)
     return new_quotation
 
+# --- JOBS ---
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_STORE_DIR = Path(os.environ.get('JOB_STORE_DIR', str(ROOT_DIR / 'job_store')))
+JOB_RETENTION_HOURS = int(os.environ.get('JOB_RETENTION_HOURS', '24'))
+# Minimum seconds between progress writes for one job
+JOB_PROGRESS_INTERVAL = 1.0
+# A running job whose worker has not renewed its lease for this long is
+# presumed dead (process killed or crashed) and is queued again
+JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', '60'))
+# Claims per job, so one that keeps killing its worker ends up failed
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+
+class JobContext:
+    """What a job handler sees: its parameters, files and progress reporting"""
+    
+    def __init__(self, job: dict):
+        self.job = job
+        self.id = job['id']
+        self.params = job.get('params', {})
+        self.latest_progress = job.get('progress', {})
+        self.download = None
+        self._last_write = 0.0
+        self._writing = False
+    
+    @property
+    def directory(self) -> Path:
+        return JOB_STORE_DIR / self.id
+    
+    @property
+    def input_path(self) -> Path:
+        return self.directory / self.job['input_file']
+    
+    def set_download(self, filename: str, media_type: str):
+        """Offer directory/filename as the job's result file"""
+        self.download = {"filename": filename, "media_type": media_type}
+    
+    async def progress(self, stage: str, done: int, total: int):
+        # Throttled: the runner writes the final value when the job ends
+        self.latest_progress = {"stage": stage, "done": done, "total": total}
+        now = time.monotonic()
+        if self._writing or now - self._last_write < JOB_PROGRESS_INTERVAL:
+            return
+        self._writing = True
+        self._last_write = now
+        try:
+            await db.jobs.update_one({"id": self.id}, {"$set": {"progress": self.latest_progress}})
+        finally:
+            self._writing = False
+
+class JobRunner:
+    """In-process asyncio workers draining jobs persisted in db.jobs.
+    
+    Claiming is an atomic queued -> running update that records this
+    process as owner and counts the attempt, so a job runs once even if it
+    is enqueued twice or by several uvicorn workers. The owner renews a
+    lease (heartbeat_at) while the job runs; a job whose lease lapsed is
+    queued again by whichever worker notices, or failed once it has used
+    JOB_MAX_ATTEMPTS. Jobs still queued are picked up at startup.
+    """
+    
+    def __init__(self, workers: int, lease_seconds: int = JOB_LEASE_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers = {}
+        self._queue = None
+        self._tasks = []
+        self._running = set()  # ids of jobs this process is running
+        self._last_purge = 0.0
+    
+    def register(self, kind: str, handler):
+        self.handlers[kind] = handler
+    
+    async def submit(self, kind: str, params: dict, input_name: str = None, input_stream=None) -> dict:
+        job = Job(kind=kind).model_dump()
+        job['params'] = params
+        if input_stream is not None:
+            job['input_file'] = f"input{Path(input_name or '').suffix}"
+            path = JOB_STORE_DIR / job['id'] / job['input_file']
+            
+            def write():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, 'wb') as out:
+                    shutil.copyfileobj(input_stream, out)
+            
+            await asyncio.to_thread(write)
+        await db.jobs.insert_one(dict(job))
+        if self._queue is not None:
+            self._queue.put_nowait(job['id'])
+        return job
+    
+    async def start(self):
+        self._queue = asyncio.Queue()
+        await self.requeue_stale()
+        async for job in db.jobs.find({"status": "queued"}, {"_id": 0, "id": 1}).sort("created_at", ASCENDING):
+            self._queue.put_nowait(job['id'])
+        if self._queue.qsize():
+            logger.info(f"Resuming {self._queue.qsize()} queued jobs")
+        await self.purge_expired()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._keep_leases()))
+    
+    def _lease_cutoff(self) -> str:
+        return (datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)).isoformat()
+    
+    async def requeue_stale(self) -> int:
+        """Queue again (or fail, past max_attempts) running jobs whose lease lapsed"""
+        cutoff = self._lease_cutoff()
+        stale = {"status": "running", "$or": [
+            {"heartbeat_at": {"$lt": cutoff}}, {"heartbeat_at": {"$exists": False}},
+        ]}
+        requeued = 0
+        async for job in db.jobs.find(stale, {"_id": 0, "id": 1, "attempts": 1}):
+            # Re-check the lease in the update itself, in case the owner renewed it meanwhile
+            claim = {"id": job['id'], **stale}
+            if job.get('attempts', 0) >= self.max_attempts:
+                await db.jobs.update_one(claim, {"$set": {
+                    "status": "failed",
+                    "error": f"Worker stopped responding; gave up after {job.get('attempts', 0)} attempts",
+                    "finished_at": datetime.now(timezone.utc).isoformat(),
+                }})
+                continue
+            result = await db.jobs.update_one(claim, {"$set": {"status": "queued", "started_at": "", "owner": ""}})
+            if result.modified_count:
+                requeued += 1
+                if self._queue is not None:
+                    self._queue.put_nowait(job['id'])
+        if requeued:
+            logger.warning(f"Requeued {requeued} jobs whose worker stopped renewing its lease")
+        return requeued
+    
+    async def _keep_leases(self):
+        """Renew this process's leases, and take over lapsed ones, a few times per lease"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 4)
+            try:
+                if self._running:
+                    await db.jobs.update_many(
+                        {"id": {"$in": list(self._running)}, "owner": self.owner, "status": "running"},
+                        {"$set": {"heartbeat_at": datetime.now(timezone.utc).isoformat()}}
+                    )
+                await self.requeue_stale()
+            except PyMongoError as e:
+                logger.warning(f"Job lease renewal failed: {e}")
+    
+    async def stop(self):
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if interrupted:
+            # A shutdown is not the job's fault: hand it back without using up an attempt
+            await db.jobs.update_many(
+                {"id": {"$in": interrupted}, "owner": self.owner, "status": "running"},
+                {"$set": {"status": "queued", "started_at": "", "owner": ""}, "$inc": {"attempts": -1}}
+            )
+    
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            now = datetime.now(timezone.utc).isoformat()
+            claimed = {"status": "running", "started_at": now, "heartbeat_at": now, "owner": self.owner}
+            job = await db.jobs.find_one_and_update(
+                {"id": job_id, "status": "queued"}, {"$set": claimed, "$inc": {"attempts": 1}},
+                projection={"_id": 0}
+            )
+            if job is not None:
+                self._running.add(job_id)
+                try:
+                    await self._run({**job, **claimed})
+                finally:
+                    self._running.discard(job_id)
+            if time.monotonic() - self._last_purge > 3600:
+                await self.purge_expired()
+    
+    async def _run(self, job: dict):
+        ctx = JobContext(job)
+        update = {"status": "completed", "error": ""}
+        try:
+            handler = self.handlers.get(job['kind'])
+            if handler is None:
+                raise ValueError(f"Unknown job kind '{job['kind']}'")
+            update["result"] = await handler(ctx) or {}
+            if ctx.download:
+                update["download"] = ctx.download
+                update["download_url"] = f"/api/jobs/{ctx.id}/download"
+        except HTTPException as e:
+            update.update(status="failed", error=str(e.detail))
+        except Exception as e:
+            logger.exception(f"Job {ctx.id} ({job['kind']}) failed")
+            update.update(status="failed", error=str(e))
+        
+        update["progress"] = ctx.latest_progress
+        update["finished_at"] = datetime.now(timezone.utc).isoformat()
+        # Only while still the owner: a job requeued after a lapsed lease belongs to its new run
+        await db.jobs.update_one({"id": ctx.id, "owner": self.owner, "status": "running"}, {"$set": update})
+        if job.get('input_file'):
+            ctx.input_path.unlink(missing_ok=True)
+    
+    async def purge_expired(self):
+        """Drop finished jobs and their files after JOB_RETENTION_HOURS"""
+        self._last_purge = time.monotonic()
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=JOB_RETENTION_HOURS)).isoformat()
+        query = {"status": {"$in": ["completed", "failed"]}, "finished_at": {"$lt": cutoff}}
+        expired = await db.jobs.find(query, {"_id": 0, "id": 1}).to_list(None)
+        for job in expired:
+            await asyncio.to_thread(shutil.rmtree, JOB_STORE_DIR / job['id'], True)
+        if expired:
+            await db.jobs.delete_many({"id": {"$in": [job['id'] for job in expired]}})
+
+job_runner = JobRunner(JOB_WORKERS)
+
+async def submit_job(kind: str, params: dict, input_name: str = None, input_stream=None) -> JSONResponse:
+    """Queue a job and answer 202 with where to poll for it"""
+    job = await job_runner.submit(kind, params, input_name, input_stream)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job['id'], "status": job['status'], "status_url": f"/api/jobs/{job['id']}"}
+    )
+
+async def submit_import_job(kind: str, filename: str, upload, mode: str) -> JSONResponse:
+    return await submit_job(kind, {"filename": filename, "mode": mode}, filename, upload)
+
+EXCEL_IMPORTERS = {
+    "import_products": import_products_excel,
+    "import_leather": import_leather_excel,
+    "import_finish": import_finish_excel,
+    "import_factories": import_factories_excel,
+}
+
+async def run_excel_import_job(ctx: JobContext) -> dict:
+    return await EXCEL_IMPORTERS[ctx.job['kind']](ctx.input_path, ctx.params.get('mode', 'insert'), ctx.progress)
+
+async def run_order_export_job(ctx: JobContext) -> dict:
+    ext, export_type, media_type = {
+        "export_pdf": ("pdf", "pdf", "application/pdf"),
+        "export_ppt": ("pptx", "ppt", "application/vnd.openxmlformats-officedocument.presentationml.presentation"),
+    }[ctx.job['kind']]
+    order = await load_export_order(ctx.params['order_id'])
+    settings, logo_bytes = await load_export_settings()
+    filename = f"order_{order.get('sales_order_ref', order['id'])}.{ext}"
+    
+    await ctx.progress("rendering", 0, 1)
+    etag = export_etag(order, settings, logo_bytes, ext)
+    path, rendered = await render_export_file(order, settings, logo_bytes, etag, ext, wait=True)
+    if rendered:
+        export_record = ExportRecord(order_id=order['id'], export_type=export_type, filename=filename)
+        await db.exports.insert_one(export_record.model_dump())
+    await ctx.progress("rendering", 1, 1)
+    
+    # Copied out of the export cache, which an order edit may clear before download
+    ctx.directory.mkdir(parents=True, exist_ok=True)
+    await asyncio.to_thread(shutil.copyfile, path, ctx.directory / filename)
+    ctx.set_download(filename, media_type)
+    return {"filename": filename}
+
+async def run_zip_export_job(ctx: JobContext) -> dict:
+    request_data = ZipExportRequest(**ctx.params)
+    order_ids, extensions = validate_zip_export(request_data)
+    orders, errors = await load_zip_orders(order_ids)
+    archive_name = zip_archive_name()
+    
+    ctx.directory.mkdir(parents=True, exist_ok=True)
+    with open(ctx.directory / archive_name, 'wb') as archive_file:
+        async for chunk in zip_export_chunks(orders, extensions, request_data.format, archive_name, errors, ctx.progress):
+            archive_file.write(chunk)
+    ctx.set_download(archive_name, "application/zip")
+    return {"filename": archive_name, "orders": len(orders), "errors": errors}
+
+for kind in EXCEL_IMPORTERS:
+    job_runner.register(kind, run_excel_import_job)
+job_runner.register("export_pdf", run_order_export_job)
+job_runner.register("export_ppt", run_order_export_job)
+job_runner.register("export_zip", run_zip_export_job)
+
+@api_router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "params": 0, "download": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@api_router.get("/jobs/{job_id}/download")
+async def download_job_result(job_id: str):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "status": 1, "download": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job['status'] != "completed" or not job.get('download'):
+        raise HTTPException(status_code=409, detail="Job has no file to download yet")
+    
+    path = JOB_STORE_DIR / job_id / job['download']['filename']
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Job result has expired")
+    return FileResponse(
+        path,
+        media_type=job['download']['media_type'],
+        headers={"Content-Disposition": f"attachment; filename={job['download']['filename']}"}
+    )
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# ============ COMPRESSION ============
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+# Low brotli qualities compress about as fast as gzip -6 and still smaller
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+
+# Content types that are compressed already (OOXML files such as PPTX and
+# XLSX are ZIP containers); compressing them again only burns CPU
+INCOMPRESSIBLE_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/pdf', 'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/vnd.openxmlformats-officedocument.',
+)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """br or gzip, whichever the client accepts first in that order"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ('br', 'gzip'):
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith('image/svg'):
+        return True
+    return bool(content_type) and not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+class StreamCompressor:
+    """Incremental br/gzip encoder; every chunk is flushed so streams keep moving"""
+    
+    def __init__(self, encoding: str):
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class CompressionMiddleware:
+    """Compresses responses with br or gzip, as negotiated from Accept-Encoding.
+    
+    Responses that are small, already encoded, partial or of an
+    incompressible type pass through untouched. A streamed body is
+    compressed chunk by chunk as it is sent, never buffered whole.
+    """
+    
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        compressor = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (message["status"] in (204, 206, 304) or "content-encoding" in headers
+                        or "content-range" in headers or not is_compressible(headers.get("content-type", ""))):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether it is worth it
+                    start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = StreamCompressor(encoding)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body = compressor.compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+            
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+        
+        await self.app(scope, receive, send_compressed)
+
+# Innermost, so a profile covers only the handler
+app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(CompressionMiddleware)
+
+# Outside compression, so request timings include the time spent compressing
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Profile-Id"],
 )
 
 logging.basicConfig(
@@ -1646,6 +4134,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def bootstrap_indexes():
+    await backfill_product_keys()
+    await ensure_indexes()
+
+@app.on_event("startup")
+async def bootstrap_order_counters():
+    # Self-heal any drift (e.g. writes made outside the API) once per start
+    await rebuild_order_counters()
+
+@app.on_event("startup")
+async def start_logo_cache():
+    await logo_cache.start()
+
+@app.on_event("startup")
+async def start_job_runner():
+    await job_runner.start()
+
+@app.on_event("shutdown")
+async def stop_job_runner():
+    await job_runner.stop()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+
+@app.on_event("shutdown")
+async def shutdown_render_service():
+    render_service.shutdown()
+
+@app.on_event("shutdown")
+async def stop_logo_cache():
+    logo_cache.stop()
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await close_http_client()
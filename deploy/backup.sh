@@ -11,6 +11,7 @@ set -e
 
 # Configuration
 BACKUP_DIR="/backup/mongodb"
+IMAGE_STORE_DIR="/var/www/jaipur-furniture/backend/image_store"
 DATE=$(date +%Y%m%d_%H%M%S)
 RETENTION_DAYS=7
 
@@ -30,6 +31,12 @@ mkdir -p $BACKUP_DIR
 echo -e "${YELLOW}Backing up MongoDB...${NC}"
 mongodump --db jaipur_furniture --out $BACKUP_DIR/$DATE
 
+# Backup image store (documents only hold image hashes)
+if [ -d "$IMAGE_STORE_DIR" ]; then
+    echo -e "${YELLOW}Backing up image store...${NC}"
+    cp -r $IMAGE_STORE_DIR $BACKUP_DIR/$DATE/image_store
+fi
+
 # Compress backup
 echo -e "${YELLOW}Compressing backup...${NC}"
 cd $BACKUP_DIR
@@ -57,6 +57,7 @@ const translations = {
     productUpdated: 'Product updated successfully',
     productDeleted: 'Product deleted successfully',
     showing: 'Showing',
+    loadMore: 'Load more',
     of: 'of',
     productsLabel: 'products',
     product: 'Product',
@@ -431,6 +432,7 @@ const translations = {
     productUpdated: 'प्रोडक्ट सफलतापूर्वक अपडेट किया गया',
     productDeleted: 'प्रोडक्ट सफलतापूर्वक हटाया गया',
     showing: 'दिखा रहा है',
+    loadMore: 'और लोड करें',
     of: 'में से',
     productsLabel: 'प्रोडक्ट्स',
     product: 'प्रोडक्ट',
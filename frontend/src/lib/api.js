@@ -35,28 +35,49 @@ api.interceptors.response.use(
   }
 );
 
+// Resolve an image field (image store hash, data URI or URL) to an <img> src
+export const imageUrl = (value) => (
+  value && /^[0-9a-f]{64}$/.test(value) ? `${API}/images/${value}` : value
+);
+
+// Page size for cursor-paginated list pages
+export const PAGE_SIZE = 50;
+
 // Orders API
 export const ordersApi = {
   getAll: () => api.get('/orders'),
+  getPage: (params) => api.get('/orders', { params }),
   getById: (id) => api.get(`/orders/${id}`),
   create: (data) => api.post('/orders', data),
   update: (id, data) => api.put(`/orders/${id}`, data),
   delete: (id) => api.delete(`/orders/${id}`),
   exportPdf: (id) => `${API}/orders/${id}/export/pdf`,
   exportPpt: (id) => `${API}/orders/${id}/export/ppt`,
+  exportZip: (orderIds, format = 'pdf') => api.post(
+    '/orders/export/zip',
+    { order_ids: orderIds, format },
+    { responseType: 'blob' }
+  ),
   previewHtml: (id) => api.get(`/orders/${id}/preview-html`),
 };
 
+// Background jobs API (imports/exports started with ?async=true)
+export const jobsApi = {
+  get: (id) => api.get(`/jobs/${id}`),
+  downloadUrl: (id) => `${API}/jobs/${id}/download`,
+};
+
 // Leather Library API
 export const leatherApi = {
   getAll: () => api.get('/leather-library'),
   create: (data) => api.post('/leather-library', data),
   update: (id, data) => api.put(`/leather-library/${id}`, data),
   delete: (id) => api.delete(`/leather-library/${id}`),
-  uploadExcel: (file) => {
+  uploadExcel: (file, mode = 'insert') => {
     const formData = new FormData();
     formData.append('file', file);
     return api.post('/leather-library/upload-excel', formData, {
+      params: { mode },
       headers: { 'Content-Type': 'multipart/form-data' },
     });
   },
@@ -68,10 +89,11 @@ export const finishApi = {
   create: (data) => api.post('/finish-library', data),
   update: (id, data) => api.put(`/finish-library/${id}`, data),
   delete: (id) => api.delete(`/finish-library/${id}`),
-  uploadExcel: (file) => {
+  uploadExcel: (file, mode = 'insert') => {
     const formData = new FormData();
     formData.append('file', file);
     return api.post('/finish-library/upload-excel', formData, {
+      params: { mode },
       headers: { 'Content-Type': 'multipart/form-data' },
     });
   },
@@ -93,10 +115,11 @@ export const factoriesApi = {
   getAll: () => api.get('/factories'),
   create: (data) => api.post('/factories', data),
   delete: (id) => api.delete(`/factories/${id}`),
-  uploadExcel: (file) => {
+  uploadExcel: (file, mode = 'insert') => {
     const formData = new FormData();
     formData.append('file', file);
     return api.post('/factories/upload-excel', formData, {
+      params: { mode },
       headers: { 'Content-Type': 'multipart/form-data' },
     });
   },
@@ -105,15 +128,19 @@ export const factoriesApi = {
 // Products API
 export const productsApi = {
   getAll: () => api.get('/products'),
+  getPage: (params) => api.get('/products', { params }),
   getById: (id) => api.get(`/products/${id}`),
+  // Ranked, projected matches for the product pickers (code prefix, then description/category)
+  search: (q, limit = 20) => api.get('/products/search', { params: { q, limit } }),
   create: (data) => api.post('/products', data),
   update: (id, data) => api.put(`/products/${id}`, data),
   delete: (id) => api.delete(`/products/${id}`),
   bulkCreate: (products) => api.post('/products/bulk', products),
-  uploadExcel: (file) => {
+  uploadExcel: (file, mode = 'insert') => {
     const formData = new FormData();
     formData.append('file', file);
     return api.post('/products/upload-excel', formData, {
+      params: { mode },
       headers: {
         'Content-Type': 'multipart/form-data',
       },
@@ -122,6 +149,28 @@ export const productsApi = {
   downloadSample: () => `${BACKEND_URL}/api/templates/products-sample`,
 };
 
+// Fill in product_image from the catalog for items saved without one
+export const withCatalogImages = async (items = []) => {
+  const codes = [...new Set(
+    items.filter(item => !item.product_image && item.product_code).map(item => item.product_code)
+  )];
+  if (codes.length === 0) return items;
+  const matches = await Promise.all(codes.map(code =>
+    productsApi.search(code, 1)
+      .then(response => response.data.find(p => p.product_code === code))
+      .catch(() => null)
+  ));
+  const catalogImages = {};
+  codes.forEach((code, index) => {
+    if (matches[index]?.image) catalogImages[code] = matches[index].image;
+  });
+  return items.map(item => (
+    !item.product_image && catalogImages[item.product_code]
+      ? { ...item, product_image: catalogImages[item.product_code] }
+      : item
+  ));
+};
+
 // Templates API (for sample downloads)
 export const templatesApi = {
   productsSample: () => `${BACKEND_URL}/api/templates/products-sample`,
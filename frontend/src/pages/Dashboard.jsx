@@ -173,7 +173,7 @@ export default function Dashboard() {
                       {order.status}
                     </Badge>
                     <span className="text-xs text-muted-foreground">
-                      {order.items?.length || 0} {t('items')}
+                      {order.item_count ?? order.items?.length ?? 0} {t('items')}
                     </span>
                   </div>
                 </Link>
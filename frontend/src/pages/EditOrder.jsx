@@ -1,6 +1,6 @@
 import { useState, useEffect, useCallback } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { ordersApi, factoriesApi, categoriesApi, leatherApi, finishApi, productsApi } from '../lib/api';
+import { ordersApi, factoriesApi, categoriesApi, leatherApi, finishApi, productsApi, withCatalogImages, imageUrl } from '../lib/api';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -101,30 +101,18 @@ export default function EditOrder() {
 
   const loadData = async () => {
     try {
-      const [orderRes, factoriesRes, categoriesRes, leatherRes, finishRes, productsRes] = await Promise.all([
+      const [orderRes, factoriesRes, categoriesRes, leatherRes, finishRes] = await Promise.all([
         ordersApi.getById(id),
         factoriesApi.getAll(),
         categoriesApi.getAll(),
         leatherApi.getAll(),
         finishApi.getAll(),
-        productsApi.getAll(),
       ]);
       
       // Auto-fill missing product_image from catalog for existing items
       const orderData = orderRes.data;
-      const productsList = productsRes.data;
-      
       if (orderData.items && orderData.items.length > 0) {
-        orderData.items = orderData.items.map(item => {
-          // If item doesn't have product_image, try to get it from catalog
-          if (!item.product_image && item.product_code) {
-            const catalogProduct = productsList.find(p => p.product_code === item.product_code);
-            if (catalogProduct && catalogProduct.image) {
-              return { ...item, product_image: catalogProduct.image };
-            }
-          }
-          return item;
-        });
+        orderData.items = await withCatalogImages(orderData.items);
       }
       
       setOrder(orderData);
@@ -132,7 +120,6 @@ export default function EditOrder() {
       setCategories(categoriesRes.data);
       setLeatherLibrary(leatherRes.data);
       setFinishLibrary(finishRes.data);
-      setProducts(productsList);
       
       if (orderData.entry_date) {
         setDate(new Date(orderData.entry_date));
@@ -146,14 +133,30 @@ export default function EditOrder() {
     }
   };
 
-  // Filter products based on search
-  const filteredProducts = products.filter(p => 
-    p.product_code?.toLowerCase().includes(productSearch.toLowerCase()) ||
-    p.description?.toLowerCase().includes(productSearch.toLowerCase())
-  );
+  // Search the catalog as the product code is typed
+  useEffect(() => {
+    if (!showProductSuggestions) return undefined;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await productsApi.search(productSearch, 10);
+        setProducts(response.data);
+      } catch (error) {
+        console.error('Error searching products:', error);
+      }
+    }, 200);
+    return () => clearTimeout(timer);
+  }, [productSearch, showProductSuggestions]);
 
   // Handle product selection from suggestions
-  const handleProductSelect = (product) => {
+  const handleProductSelect = async (match) => {
+    // Search results are trimmed down; load the full product for its images
+    let product = match;
+    try {
+      product = (await productsApi.getById(match.id)).data;
+    } catch (error) {
+      console.error('Error loading product:', error);
+    }
+    
     // Get product image from catalog
     const mainProductImage = product.image || '';
     // Additional images from catalog (if any) - NOT including main image
@@ -524,7 +527,7 @@ export default function EditOrder() {
                   {/* Show product_image first, then fallback to images[0] */}
                   {(item.product_image || (item.images?.length > 0)) ? (
                     <img 
-                      src={item.product_image || item.images[0]} 
+                      src={imageUrl(item.product_image || item.images[0])} 
                       alt={item.product_code}
                       className="w-16 h-16 object-cover rounded-sm border"
                     />
@@ -599,7 +602,7 @@ export default function EditOrder() {
                       handleItemChange('product_code', value);
                       setShowProductSuggestions(value.length > 0);
                     }}
-                    onFocus={() => setShowProductSuggestions(productSearch.length > 0 || products.length > 0)}
+                    onFocus={() => setShowProductSuggestions(true)}
                     placeholder="Type to search products..."
                     className="font-mono pl-9"
                     data-testid="item-product-code"
@@ -609,12 +612,12 @@ export default function EditOrder() {
                 {/* Product Suggestions Dropdown */}
                 {showProductSuggestions && (
                   <div className="absolute z-50 w-full mt-1 bg-white border border-border rounded-md shadow-lg max-h-60 overflow-y-auto">
-                    {filteredProducts.length === 0 ? (
+                    {products.length === 0 ? (
                       <div className="p-3 text-sm text-muted-foreground text-center">
                         No products found. You can still add manually.
                       </div>
                     ) : (
-                      filteredProducts.slice(0, 10).map((product) => (
+                      products.map((product) => (
                         <div
                           key={product.id}
                           className="p-3 hover:bg-muted cursor-pointer border-b border-border last:border-b-0"
@@ -633,11 +636,6 @@ export default function EditOrder() {
                         </div>
                       ))
                     )}
-                    {filteredProducts.length > 10 && (
-                      <div className="p-2 text-xs text-center text-muted-foreground bg-muted">
-                        +{filteredProducts.length - 10} more products...
-                      </div>
-                    )}
                   </div>
                 )}
               </div>
@@ -809,7 +807,7 @@ export default function EditOrder() {
                     {currentItem.leather_image ? (
                       <div className="relative group">
                         <img 
-                          src={currentItem.leather_image} 
+                          src={imageUrl(currentItem.leather_image)} 
                           alt="Leather swatch"
                           className="w-full h-24 object-cover rounded-sm border"
                         />
@@ -875,7 +873,7 @@ export default function EditOrder() {
                     {currentItem.finish_image ? (
                       <div className="relative group">
                         <img 
-                          src={currentItem.finish_image} 
+                          src={imageUrl(currentItem.finish_image)} 
                           alt="Finish swatch"
                           className="w-full h-24 object-cover rounded-sm border"
                         />
@@ -1017,7 +1015,7 @@ export default function EditOrder() {
                   {currentItem.product_image ? (
                     <div className="relative group w-40 h-40">
                       <img 
-                        src={currentItem.product_image} 
+                        src={imageUrl(currentItem.product_image)} 
                         alt="Product"
                         className="w-full h-full object-cover rounded-sm border-2 border-primary/50"
                       />
@@ -1080,7 +1078,7 @@ export default function EditOrder() {
                       {currentItem.images.map((img, idx) => (
                         <div key={idx} className="relative group">
                           <img 
-                            src={img} 
+                            src={imageUrl(img)} 
                             alt={`Product ${idx + 1}`}
                             className="w-24 h-24 object-cover rounded-sm border"
                           />
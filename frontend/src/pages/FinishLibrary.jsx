@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from 'react';
-import { finishApi, templatesApi } from '../lib/api';
+import { finishApi, templatesApi, imageUrl } from '../lib/api';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -185,7 +185,7 @@ export default function FinishLibrary() {
           {items.map((item) => (
             <Card key={item.id} className="card-hover overflow-hidden">
               {item.image ? (
-                <div className="h-40 overflow-hidden"><img src={item.image} alt={item.name} className="w-full h-full object-cover" /></div>
+                <div className="h-40 overflow-hidden"><img src={imageUrl(item.image)} alt={item.name} className="w-full h-full object-cover" /></div>
               ) : (
                 <div className="h-40 flex items-center justify-center" style={{ backgroundColor: item.color || '#d4a574' }}>
                   <span className="text-4xl font-serif font-bold text-white/80">{item.code.charAt(0)}</span>
@@ -225,7 +225,7 @@ export default function FinishLibrary() {
               <Label>{t('image')}</Label>
               {formData.image ? (
                 <div className="relative">
-                  <img src={formData.image} alt="Preview" className="w-full h-32 object-cover rounded-sm border" />
+                  <img src={imageUrl(formData.image)} alt="Preview" className="w-full h-32 object-cover rounded-sm border" />
                   <button onClick={() => setFormData(prev => ({ ...prev, image: '' }))} className="absolute top-2 right-2 bg-destructive text-white rounded-full p-1"><X size={14} /></button>
                 </div>
               ) : (
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
-import { ordersApi, productsApi } from '../lib/api';
+import { ordersApi, withCatalogImages, imageUrl } from '../lib/api';
 import { Button } from '../components/ui/button';
 import { 
   ArrowLeft, 
@@ -45,26 +45,12 @@ export default function OrderPreview() {
 
   const loadOrder = async () => {
     try {
-      const [orderRes, productsRes] = await Promise.all([
-        ordersApi.getById(id),
-        productsApi.getAll(),
-      ]);
+      const orderRes = await ordersApi.getById(id);
       
       // Auto-fill missing product_image from catalog for existing items
       const orderData = orderRes.data;
-      const productsList = productsRes.data;
-      
       if (orderData.items && orderData.items.length > 0) {
-        orderData.items = orderData.items.map(item => {
-          // If item doesn't have product_image, try to get it from catalog
-          if (!item.product_image && item.product_code) {
-            const catalogProduct = productsList.find(p => p.product_code === item.product_code);
-            if (catalogProduct && catalogProduct.image) {
-              return { ...item, product_image: catalogProduct.image };
-            }
-          }
-          return item;
-        });
+        orderData.items = await withCatalogImages(orderData.items);
       }
       
       setOrder(orderData);
@@ -176,14 +162,14 @@ export default function OrderPreview() {
             <div style="width: 75%;">
               ${mainImage 
                 ? `<div style="border: 1px solid #ddd; border-radius: 4px; padding: 6px; background: white; display: flex; align-items: center; justify-content: center; height: ${mainImageHeight}px;">
-                    <img src="${mainImage}" alt="Product" style="max-width: 100%; max-height: ${mainImageHeight - 12}px; object-fit: contain;" />
+                    <img src="${imageUrl(mainImage)}" alt="Product" style="max-width: 100%; max-height: ${mainImageHeight - 12}px; object-fit: contain;" />
                   </div>`
                 : `<div style="width: 100%; height: ${mainImageHeight}px; display: flex; align-items: center; justify-content: center; background: #f8f8f8; border: 1px solid #ddd; border-radius: 4px; color: #888;">No Image Available</div>`
               }
               ${additionalImages.length > 0 ? `
                 <div style="display: flex; gap: 8px; margin-top: 8px; flex-wrap: wrap;">
                   ${additionalImages.slice(0, 4).map(img => `
-                    <img src="${img}" alt="Additional" style="width: ${additionalImageSize}px; height: ${additionalImageSize}px; object-fit: cover; border: 1px solid #ddd; border-radius: 4px; flex-shrink: 0;" />
+                    <img src="${imageUrl(img)}" alt="Additional" style="width: ${additionalImageSize}px; height: ${additionalImageSize}px; object-fit: cover; border: 1px solid #ddd; border-radius: 4px; flex-shrink: 0;" />
                   `).join('')}
                   ${additionalImages.length > 4 ? `
                     <div style="width: ${additionalImageSize}px; height: ${additionalImageSize}px; border: 1px solid #ddd; border-radius: 4px; display: flex; align-items: center; justify-content: center; font-size: 12px; color: #666;">+${additionalImages.length - 4} more</div>
@@ -197,7 +183,7 @@ export default function OrderPreview() {
               ${item.leather_image || item.leather_code ? `
                 <div style="border: 1px solid #ddd; border-radius: 4px; padding: 6px; background: #fafafa;">
                   ${item.leather_image 
-                    ? `<img src="${item.leather_image}" alt="Leather" style="width: 100%; height: ${swatchHeight}px; object-fit: cover; border-radius: 4px; margin-bottom: 4px;" />`
+                    ? `<img src="${imageUrl(item.leather_image)}" alt="Leather" style="width: 100%; height: ${swatchHeight}px; object-fit: cover; border-radius: 4px; margin-bottom: 4px;" />`
                     : `<div style="width: 100%; height: ${swatchHeight}px; background: linear-gradient(135deg, #8B4513, #A0522D); border-radius: 4px; margin-bottom: 4px;"></div>`
                   }
                   <p style="font-size: 9px; color: #666; text-align: center; text-transform: uppercase; margin: 0;">Leather</p>
@@ -207,7 +193,7 @@ export default function OrderPreview() {
               ${item.finish_image || item.finish_code ? `
                 <div style="border: 1px solid #ddd; border-radius: 4px; padding: 6px; background: #fafafa;">
                   ${item.finish_image 
-                    ? `<img src="${item.finish_image}" alt="Finish" style="width: 100%; height: ${swatchHeight}px; object-fit: cover; border-radius: 4px; margin-bottom: 4px;" />`
+                    ? `<img src="${imageUrl(item.finish_image)}" alt="Finish" style="width: 100%; height: ${swatchHeight}px; object-fit: cover; border-radius: 4px; margin-bottom: 4px;" />`
                     : `<div style="width: 100%; height: ${swatchHeight}px; background: linear-gradient(135deg, #D4A574, #C4956A); border-radius: 4px; margin-bottom: 4px;"></div>`
                   }
                   <p style="font-size: 9px; color: #666; text-align: center; text-transform: uppercase; margin: 0;">Finish</p>
@@ -481,14 +467,14 @@ export default function OrderPreview() {
             <div style="width: 75%;">
               ${mainImage 
                 ? `<div style="border: 1px solid #ddd; border-radius: 4px; padding: 6px; background: white; display: flex; align-items: center; justify-content: center; height: ${mainImageHeight}px;">
-                    <img src="${mainImage}" alt="Product" style="max-width: 100%; max-height: ${mainImageHeight - 12}px; object-fit: contain;" />
+                    <img src="${imageUrl(mainImage)}" alt="Product" style="max-width: 100%; max-height: ${mainImageHeight - 12}px; object-fit: contain;" />
                   </div>`
                 : `<div style="width: 100%; height: ${mainImageHeight}px; display: flex; align-items: center; justify-content: center; background: #f8f8f8; border: 1px solid #ddd; border-radius: 4px; color: #888;">No Image Available</div>`
               }
               ${additionalImages.length > 0 ? `
                 <div style="display: flex; gap: 8px; margin-top: 8px; flex-wrap: wrap;">
                   ${additionalImages.slice(0, 4).map(img => `
-                    <img src="${img}" alt="Additional" style="width: ${additionalImageSize}px; height: ${additionalImageSize}px; object-fit: cover; border: 1px solid #ddd; border-radius: 4px; flex-shrink: 0;" />
+                    <img src="${imageUrl(img)}" alt="Additional" style="width: ${additionalImageSize}px; height: ${additionalImageSize}px; object-fit: cover; border: 1px solid #ddd; border-radius: 4px; flex-shrink: 0;" />
                   `).join('')}
                   ${additionalImages.length > 4 ? `
                     <div style="width: ${additionalImageSize}px; height: ${additionalImageSize}px; border: 1px solid #ddd; border-radius: 4px; display: flex; align-items: center; justify-content: center; font-size: 12px; color: #666;">+${additionalImages.length - 4} more</div>
@@ -502,7 +488,7 @@ export default function OrderPreview() {
               ${item.leather_image || item.leather_code ? `
                 <div style="border: 1px solid #ddd; border-radius: 4px; padding: 6px; background: #fafafa;">
                   ${item.leather_image 
-                    ? `<img src="${item.leather_image}" alt="Leather" style="width: 100%; height: ${swatchHeight}px; object-fit: cover; border-radius: 4px; margin-bottom: 4px;" />`
+                    ? `<img src="${imageUrl(item.leather_image)}" alt="Leather" style="width: 100%; height: ${swatchHeight}px; object-fit: cover; border-radius: 4px; margin-bottom: 4px;" />`
                     : `<div style="width: 100%; height: ${swatchHeight}px; background: linear-gradient(135deg, #8B4513, #A0522D); border-radius: 4px; margin-bottom: 4px;"></div>`
                   }
                   <p style="font-size: 9px; color: #666; text-align: center; text-transform: uppercase; margin: 0;">Leather</p>
@@ -512,7 +498,7 @@ export default function OrderPreview() {
               ${item.finish_image || item.finish_code ? `
                 <div style="border: 1px solid #ddd; border-radius: 4px; padding: 6px; background: #fafafa;">
                   ${item.finish_image 
-                    ? `<img src="${item.finish_image}" alt="Finish" style="width: 100%; height: ${swatchHeight}px; object-fit: cover; border-radius: 4px; margin-bottom: 4px;" />`
+                    ? `<img src="${imageUrl(item.finish_image)}" alt="Finish" style="width: 100%; height: ${swatchHeight}px; object-fit: cover; border-radius: 4px; margin-bottom: 4px;" />`
                     : `<div style="width: 100%; height: ${swatchHeight}px; background: linear-gradient(135deg, #D4A574, #C4956A); border-radius: 4px; margin-bottom: 4px;"></div>`
                   }
                   <p style="font-size: 9px; color: #666; text-align: center; text-transform: uppercase; margin: 0;">Finish</p>
@@ -809,7 +795,7 @@ function PreviewPage({ order, item, pageNum, totalPages }) {
           {mainProductImage ? (
             <div className="border border-[#ddd] rounded p-2 bg-white flex items-center justify-center min-h-[340px]">
               <img 
-                src={mainProductImage} 
+                src={imageUrl(mainProductImage)} 
                 alt={item.product_code}
                 className="max-w-full max-h-[360px] object-contain"
               />
@@ -831,7 +817,7 @@ function PreviewPage({ order, item, pageNum, totalPages }) {
               {additionalImages.slice(0, 4).map((img, idx) => (
                 <img 
                   key={idx}
-                  src={img} 
+                  src={imageUrl(img)} 
                   alt={`Additional ${idx + 1}`}
                   className="w-[216px] h-[216px] object-cover border border-[#ddd] rounded flex-shrink-0"
                 />
@@ -852,7 +838,7 @@ function PreviewPage({ order, item, pageNum, totalPages }) {
             <div className="border border-[#ddd] rounded p-2 bg-[#fafafa]">
               {item.leather_image ? (
                 <img 
-                  src={item.leather_image} 
+                  src={imageUrl(item.leather_image)} 
                   alt={item.leather_code || 'Leather'}
                   className="w-full h-28 object-cover rounded mb-1"
                 />
@@ -871,7 +857,7 @@ function PreviewPage({ order, item, pageNum, totalPages }) {
             <div className="border border-[#ddd] rounded p-2 bg-[#fafafa]">
               {item.finish_image ? (
                 <img 
-                  src={item.finish_image} 
+                  src={imageUrl(item.finish_image)} 
                   alt={item.finish_code || 'Finish'}
                   className="w-full h-28 object-cover rounded mb-1"
                 />
@@ -1,6 +1,6 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
-import { ordersApi } from '../lib/api';
+import { ordersApi, PAGE_SIZE } from '../lib/api';
 import { Card, CardContent } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Badge } from '../components/ui/badge';
@@ -67,24 +67,41 @@ export default function OrdersList() {
   const { t } = useLanguage();
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
   const [deleteDialogOpen, setDeleteDialogOpen] = useState(false);
   const [orderToDelete, setOrderToDelete] = useState(null);
+  // Only the latest request may update the list, so a slow page can't land after a newer filter
+  const requestRef = useRef(0);
 
+  // Search and status filter on the server; wait for typing to pause before reloading
   useEffect(() => {
-    loadOrders();
-  }, []);
+    const timer = setTimeout(() => loadOrders(), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, statusFilter]);
 
-  const loadOrders = async () => {
+  const loadOrders = async (cursor = null) => {
+    const request = ++requestRef.current;
+    if (cursor) setLoadingMore(true);
     try {
-      const response = await ordersApi.getAll();
-      setOrders(response.data);
+      const response = await ordersApi.getPage({
+        limit: PAGE_SIZE,
+        fields: 'summary',
+        ...(statusFilter !== 'all' ? { status: statusFilter } : {}),
+        ...(searchTerm.trim() ? { q: searchTerm.trim() } : {}),
+        ...(cursor ? { cursor } : {}),
+      });
+      if (request !== requestRef.current) return;
+      setOrders(prev => (cursor ? [...prev, ...response.data] : response.data));
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error loading orders:', error);
       toast.error(t('failedToLoad'));
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -104,17 +121,6 @@ export default function OrdersList() {
     }
   };
 
-  const filteredOrders = orders.filter(order => {
-    const matchesSearch = 
-      order.sales_order_ref?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      order.buyer_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      order.buyer_po_ref?.toLowerCase().includes(searchTerm.toLowerCase());
-    
-    const matchesStatus = statusFilter === 'all' || order.status === statusFilter;
-    
-    return matchesSearch && matchesStatus;
-  });
-
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64" data-testid="orders-loading">
@@ -172,7 +178,7 @@ export default function OrdersList() {
       {/* Orders Table */}
       <Card data-testid="orders-table-card">
         <CardContent className="p-0">
-          {filteredOrders.length === 0 ? (
+          {orders.length === 0 ? (
             <div className="empty-state" data-testid="empty-orders">
               <FileText className="empty-state-icon mx-auto" />
               <p className="mb-4">{t('noOrdersFound')}</p>
@@ -195,7 +201,7 @@ export default function OrdersList() {
                   </TableRow>
                 </TableHeader>
                 <TableBody>
-                  {filteredOrders.map((order) => (
+                  {orders.map((order) => (
                     <TableRow key={order.id} data-testid={`order-row-${order.id}`}>
                       <TableCell className="font-mono font-medium">
                         {order.sales_order_ref || '-'}
@@ -205,7 +211,7 @@ export default function OrdersList() {
                         {order.buyer_po_ref || '-'}
                       </TableCell>
                       <TableCell className="hidden md:table-cell">{formatDateDDMMYYYY(order.entry_date)}</TableCell>
-                      <TableCell>{order.items?.length || 0}</TableCell>
+                      <TableCell>{order.item_count ?? order.items?.length ?? 0}</TableCell>
                       <TableCell>
                         <Badge className={statusColors[order.status] || 'bg-gray-100'}>
                           {order.status}
@@ -241,6 +247,18 @@ export default function OrdersList() {
                   ))}
                 </TableBody>
               </Table>
+              {nextCursor && (
+                <div className="flex justify-center py-4">
+                  <Button
+                    variant="outline"
+                    onClick={() => loadOrders(nextCursor)}
+                    disabled={loadingMore}
+                    data-testid="load-more-orders"
+                  >
+                    {t('loadMore')}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from 'react';
-import { productsApi, categoriesApi, templatesApi } from '../lib/api';
+import { productsApi, categoriesApi, templatesApi, imageUrl, PAGE_SIZE } from '../lib/api';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -48,6 +48,9 @@ export default function Products() {
   const [products, setProducts] = useState([]);
   const [categories, setCategories] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalProducts, setTotalProducts] = useState(0);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [categoryFilter, setCategoryFilter] = useState('all');
   const [dialogOpen, setDialogOpen] = useState(false);
@@ -76,21 +79,45 @@ export default function Products() {
   const fileInputRef = useRef(null);
   const excelInputRef = useRef(null);
 
+  // Only the latest request may update the list, so a slow page can't land after a newer filter
+  const requestRef = useRef(0);
+
   useEffect(() => {
-    loadData();
+    loadCategories();
   }, []);
 
+  // Search and category filter on the server; wait for typing to pause before reloading
+  useEffect(() => {
+    const timer = setTimeout(() => loadData(), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, categoryFilter]);
+
+  const loadCategories = async () => {
+    // Categories API might not exist, handle gracefully
+    try {
+      const categoriesRes = await categoriesApi.getAll();
+      setCategories(categoriesRes.data || []);
+    } catch {
+      setCategories([]);
+    }
+  };
+
+  const fetchProducts = (cursor) => productsApi.getPage({
+    limit: PAGE_SIZE,
+    fields: 'summary',
+    ...(categoryFilter !== 'all' ? { category: categoryFilter } : {}),
+    ...(searchTerm.trim() ? { q: searchTerm.trim() } : {}),
+    ...(cursor ? { cursor } : {}),
+  });
+
   const loadData = async () => {
+    const request = ++requestRef.current;
     try {
-      const productsRes = await productsApi.getAll();
+      const productsRes = await fetchProducts(null);
+      if (request !== requestRef.current) return;
       setProducts(productsRes.data);
-      // Categories API might not exist, handle gracefully
-      try {
-        const categoriesRes = await categoriesApi.getAll();
-        setCategories(categoriesRes.data || []);
-      } catch {
-        setCategories([]);
-      }
+      setNextCursor(productsRes.headers['x-next-cursor'] || null);
+      setTotalProducts(Number(productsRes.headers['x-total-count'] ?? productsRes.data.length));
     } catch (error) {
       console.error('Error loading data:', error);
       toast.error(t('failedToLoad'));
@@ -99,6 +126,23 @@ export default function Products() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    const request = ++requestRef.current;
+    setLoadingMore(true);
+    try {
+      const productsRes = await fetchProducts(nextCursor);
+      if (request !== requestRef.current) return;
+      setProducts(prev => [...prev, ...productsRes.data]);
+      setNextCursor(productsRes.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error loading products:', error);
+      toast.error(t('failedToLoad'));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleExcelUpload = async (e) => {
     const file = e.target.files?.[0];
     if (!file) return;
@@ -130,8 +174,16 @@ export default function Products() {
     }
   };
 
-  const openDialog = (product = null) => {
+  const openDialog = async (product = null) => {
     if (product) {
+      // List rows are summaries - load the full product (with its gallery) before editing
+      try {
+        product = (await productsApi.getById(product.id)).data;
+      } catch (error) {
+        console.error('Error loading product:', error);
+        toast.error(t('failedToLoad'));
+        return;
+      }
       setFormData({
         product_code: product.product_code || '',
         description: product.description || '',
@@ -210,6 +262,7 @@ export default function Products() {
     try {
       await productsApi.delete(productToDelete.id);
       setProducts(products.filter(p => p.id !== productToDelete.id));
+      setTotalProducts(total => Math.max(0, total - 1));
       toast.success(t('productDeleted'));
     } catch (error) {
       console.error('Error deleting product:', error);
@@ -239,15 +292,6 @@ export default function Products() {
     }
   };
 
-  // Filter products
-  const filteredProducts = products.filter(product => {
-    const matchesSearch = !searchTerm || 
-      product.product_code?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      product.description?.toLowerCase().includes(searchTerm.toLowerCase());
-    const matchesCategory = categoryFilter === 'all' || product.category === categoryFilter;
-    return matchesSearch && matchesCategory;
-  });
-
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64" data-testid="products-loading">
@@ -318,7 +362,7 @@ export default function Products() {
       </Card>
 
       {/* Products Grid */}
-      {filteredProducts.length === 0 ? (
+      {products.length === 0 ? (
         <Card data-testid="empty-products">
           <CardContent className="py-12 text-center">
             <Package className="mx-auto text-muted-foreground mb-4" size={48} />
@@ -330,7 +374,7 @@ export default function Products() {
         </Card>
       ) : (
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-4" data-testid="products-grid">
-          {filteredProducts.map((product) => (
+          {products.map((product) => (
             <Card 
               key={product.id} 
               className="card-hover overflow-hidden"
@@ -340,7 +384,7 @@ export default function Products() {
               <div className="aspect-square bg-muted relative">
                 {product.image ? (
                   <img 
-                    src={product.image} 
+                    src={imageUrl(product.image)} 
                     alt={product.description}
                     className="w-full h-full object-cover"
                   />
@@ -419,9 +463,17 @@ export default function Products() {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="flex justify-center mt-6">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore} data-testid="load-more-products">
+            {t('loadMore')}
+          </Button>
+        </div>
+      )}
+
       {/* Stats */}
       <div className="mt-6 text-sm text-muted-foreground text-center">
-        {t('showing')} {filteredProducts.length} {t('of')} {products.length} {t('productsLabel')}
+        {t('showing')} {products.length} {t('of')} {totalProducts} {t('productsLabel')}
       </div>
 
       {/* Add/Edit Product Dialog */}
@@ -599,7 +651,7 @@ export default function Products() {
               <div className="flex gap-4">
                 {formData.image ? (
                   <div className="relative w-32 h-32 border rounded-sm overflow-hidden">
-                    <img src={formData.image} alt="Product" className="w-full h-full object-cover" />
+                    <img src={imageUrl(formData.image)} alt="Product" className="w-full h-full object-cover" />
                     <Button
                       variant="destructive"
                       size="icon"
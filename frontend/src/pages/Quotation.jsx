@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { productsApi, quotationsApi } from '../lib/api';
+import { productsApi, quotationsApi, imageUrl } from '../lib/api';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -46,7 +46,6 @@ import * as XLSX from 'xlsx';
 export default function Quotation() {
   const { t } = useLanguage();
   const [products, setProducts] = useState([]);
-  const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedProducts, setSelectedProducts] = useState([]);
@@ -69,21 +68,23 @@ export default function Quotation() {
   });
 
   useEffect(() => {
-    loadProducts();
     loadSavedQuotations();
   }, []);
 
-  const loadProducts = async () => {
-    try {
-      const response = await productsApi.getAll();
-      setProducts(response.data);
-    } catch (error) {
-      console.error('Error loading products:', error);
-      toast.error('Failed to load products');
-    } finally {
-      setLoading(false);
-    }
-  };
+  // Search the catalog while the product dialog is open
+  useEffect(() => {
+    if (!productDialogOpen) return undefined;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await productsApi.search(searchTerm, 50);
+        setProducts(response.data);
+      } catch (error) {
+        console.error('Error searching products:', error);
+        toast.error('Failed to load products');
+      }
+    }, 200);
+    return () => clearTimeout(timer);
+  }, [searchTerm, productDialogOpen]);
 
   const loadSavedQuotations = async () => {
     try {
@@ -597,7 +598,7 @@ export default function Quotation() {
               <div class="product-column">
                 <div class="product-image-section">
                   ${item.image 
-                    ? `<img src="${item.image}" alt="${item.product_code}" class="product-image" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';" /><div class="no-image" style="display:none;">Image Not Available</div>`
+                    ? `<img src="${imageUrl(item.image)}" alt="${item.product_code}" class="product-image" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';" /><div class="no-image" style="display:none;">Image Not Available</div>`
                     : `<div class="no-image">No Product Image</div>`
                   }
                 </div>
@@ -767,45 +768,42 @@ export default function Quotation() {
   };
   const addSelectedProducts = () => {
     const newItems = [];
-    selectedProducts.forEach(productId => {
-      const product = products.find(p => p.id === productId);
-      if (product) {
-        // Check if already exists
-        const exists = quotationItems.some(item => item.product_code === product.product_code);
-        if (!exists) {
-          // Get price based on selected price type
-          let fobPrice = 0;
-          switch(quotationDetails.currency) {
-            case 'FOB_USD':
-              fobPrice = product.fob_price_usd || 0;
-              break;
-            case 'FOB_GBP':
-              fobPrice = product.fob_price_gbp || 0;
-              break;
-            case 'WH_700':
-              fobPrice = product.warehouse_price_1 || product.warehouse_price_700 || 0;
-              break;
-            case 'WH_2000':
-              fobPrice = product.warehouse_price_2 || product.warehouse_price_2000 || 0;
-              break;
-            default:
-              fobPrice = product.fob_price_usd || 0;
-          }
-
-          newItems.push({
-            id: product.id,
-            product_code: product.product_code,
-            description: product.description,
-            height_cm: product.height_cm,
-            depth_cm: product.depth_cm,
-            width_cm: product.width_cm,
-            cbm: product.cbm,
-            quantity: 1,
-            fob_price: fobPrice,
-            total: fobPrice,
-            image: product.image || ''
-          });
+    selectedProducts.forEach(product => {
+      // Check if already exists
+      const exists = quotationItems.some(item => item.product_code === product.product_code);
+      if (!exists) {
+        // Get price based on selected price type
+        let fobPrice = 0;
+        switch(quotationDetails.currency) {
+          case 'FOB_USD':
+            fobPrice = product.fob_price_usd || 0;
+            break;
+          case 'FOB_GBP':
+            fobPrice = product.fob_price_gbp || 0;
+            break;
+          case 'WH_700':
+            fobPrice = product.warehouse_price_1 || product.warehouse_price_700 || 0;
+            break;
+          case 'WH_2000':
+            fobPrice = product.warehouse_price_2 || product.warehouse_price_2000 || 0;
+            break;
+          default:
+            fobPrice = product.fob_price_usd || 0;
         }
+
+        newItems.push({
+          id: product.id,
+          product_code: product.product_code,
+          description: product.description,
+          height_cm: product.height_cm,
+          depth_cm: product.depth_cm,
+          width_cm: product.width_cm,
+          cbm: product.cbm,
+          quantity: 1,
+          fob_price: fobPrice,
+          total: fobPrice,
+          image: product.image || ''
+        });
       }
     });
     
@@ -820,17 +818,13 @@ export default function Quotation() {
     setProductDialogOpen(false);
   };
 
-  const toggleProductSelection = (productId) => {
+  // Selections keep the product itself, so they survive a new search
+  const toggleProductSelection = (product) => {
     setSelectedProducts(prev => 
-      prev.includes(productId) ? prev.filter(id => id !== productId) : [...prev, productId]
+      prev.some(p => p.id === product.id) ? prev.filter(p => p.id !== product.id) : [...prev, product]
     );
   };
 
-  const filteredProducts = products.filter(product =>
-    product.product_code?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    product.description?.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
   const totals = calculateTotals();
   const currencyInfo = getCurrencyInfo(quotationDetails.currency);
   const currencySymbol = currencyInfo.symbol;
@@ -1102,10 +1096,10 @@ export default function Quotation() {
                 </TableRow>
               </TableHeader>
               <TableBody>
-                {filteredProducts.map((product) => (
-                  <TableRow key={product.id} className="cursor-pointer" onClick={() => toggleProductSelection(product.id)}>
+                {products.map((product) => (
+                  <TableRow key={product.id} className="cursor-pointer" onClick={() => toggleProductSelection(product)}>
                     <TableCell>
-                      <Checkbox checked={selectedProducts.includes(product.id)} />
+                      <Checkbox checked={selectedProducts.some(p => p.id === product.id)} />
                     </TableCell>
                     <TableCell className="font-mono font-semibold">{product.product_code}</TableCell>
                     <TableCell>{product.description}</TableCell>
@@ -1,12 +1,12 @@
 import { useState, useEffect } from 'react';
-import { templateApi } from '../lib/api';
+import { templateApi, imageUrl } from '../lib/api';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
 import { Label } from '../components/ui/label';
 import { Switch } from '../components/ui/switch';
 import { Separator } from '../components/ui/separator';
-import { Save, RotateCcw } from 'lucide-react';
+import { Save, RotateCcw, Upload, X } from 'lucide-react';
 import { toast } from 'sonner';
 
 const defaultSettings = {
@@ -21,6 +21,7 @@ const defaultSettings = {
   show_borders: true,
   header_height_mm: 25,
   footer_height_mm: 20,
+  logo_image: '',
 };
 
 export default function TemplateSettings() {
@@ -48,10 +49,19 @@ export default function TemplateSettings() {
     setSettings(prev => ({ ...prev, [field]: value }));
   };
 
+  const handleLogoUpload = (e) => {
+    const file = e.target.files?.[0];
+    if (!file) return;
+    const reader = new FileReader();
+    reader.onload = (ev) => handleInputChange('logo_image', ev.target.result);
+    reader.readAsDataURL(file);
+  };
+
   const handleSave = async () => {
     setSaving(true);
     try {
-      await templateApi.update(settings);
+      const response = await templateApi.update(settings);
+      setSettings({ ...defaultSettings, ...response.data });
       toast.success('Settings saved successfully');
     } catch (error) {
       console.error('Error saving settings:', error);
@@ -137,6 +147,40 @@ export default function TemplateSettings() {
               </p>
             </div>
           </div>
+          <div className="space-y-2">
+            <Label>Logo Image</Label>
+            <div className="flex items-center gap-4">
+              {settings.logo_image ? (
+                <div className="relative">
+                  <img
+                    src={imageUrl(settings.logo_image)}
+                    alt="Logo"
+                    className="h-16 object-contain border rounded-sm p-1"
+                  />
+                  <button
+                    type="button"
+                    onClick={() => handleInputChange('logo_image', '')}
+                    className="absolute -top-2 -right-2 bg-destructive text-white rounded-full p-0.5"
+                    data-testid="remove-logo-btn"
+                  >
+                    <X size={12} />
+                  </button>
+                </div>
+              ) : (
+                <span className="text-sm text-muted-foreground">Using default JAIPUR logo</span>
+              )}
+              <label className="cursor-pointer">
+                <input type="file" accept="image/*" className="hidden" onChange={handleLogoUpload} data-testid="logo-upload-input" />
+                <span className="inline-flex items-center gap-2 text-sm border rounded-sm px-3 py-2 hover:bg-muted">
+                  <Upload size={16} />
+                  Upload Logo
+                </span>
+              </label>
+            </div>
+            <p className="text-xs text-muted-foreground">
+              Used in PDF and PPT exports instead of the default logo
+            </p>
+          </div>
 
           <Separator />
 
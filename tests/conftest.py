@@ -0,0 +1,43 @@
+"""Shared setup: the backend imported against an in-memory database and temp stores"""
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+for _env in ('IMAGE_STORE_DIR', 'CACHE_DIR', 'JOB_STORE_DIR'):
+    os.environ.setdefault(_env, tempfile.mkdtemp(prefix=f"test-{_env.lower()}-"))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'jaipur_test')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+mongomock_motor = pytest.importorskip('mongomock_motor')
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh in-memory database behind server.db for each test"""
+    database = mongomock_motor.AsyncMongoMockClient()['jaipur_test']
+    monkeypatch.setattr(server, 'db', database)
+    server.product_cache.clear()
+    return database
+
+
+@pytest.fixture
+def xlsx():
+    """Build an .xlsx upload from a list of rows (the first sheet only)"""
+    def build(rows):
+        workbook = Workbook()
+        sheet = workbook.active
+        for row in rows:
+            sheet.append(row)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        return buffer
+    return build
@@ -0,0 +1,36 @@
+"""Response compression: Accept-Encoding negotiation and which content types are compressed"""
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br", "br"),
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("gzip;q=0.5, br;q=0", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0, gzip", "gzip"),
+    ("identity", None),
+    ("deflate", None),
+    ("", None),
+    ("br;q=abc, gzip", "gzip"),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert server.negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("content_type, expected", [
+    ("application/json", True),
+    ("text/html; charset=utf-8", True),
+    ("image/svg+xml", True),
+    ("image/jpeg", False),
+    ("application/pdf", False),
+    ("application/zip", False),
+    ("application/vnd.openxmlformats-officedocument.presentationml.presentation", False),
+    ("", False),
+])
+def test_is_compressible(content_type, expected):
+    assert server.is_compressible(content_type) is expected
@@ -0,0 +1,107 @@
+"""Excel catalog imports: header detection, row numbering and the insert/upsert/dry_run modes"""
+import asyncio
+
+import server
+
+PRODUCT_HEADERS = ["Product Code", "Description", "Size ( in Cm )", "H", "D", "W", "CBM", "FOB India Price $"]
+
+
+def product_sheet(*rows):
+    """A products sheet laid out like the real ones: a title row, the headers, then rows"""
+    return [["JAIPUR Product List"], PRODUCT_HEADERS, *rows]
+
+
+def product_row(code, description="Mango wood sideboard", price=250):
+    return [code, description, "160*45 cm", 85, 45, 160, 0.61, price]
+
+
+def stored_products(db):
+    return asyncio.run(db.products.find({}, {"_id": 0}).sort("product_code_key", 1).to_list(None))
+
+
+def test_title_row_promotes_the_real_header(db, xlsx):
+    upload = xlsx(product_sheet(product_row("tab-1", "Dining table")))
+
+    result = asyncio.run(server.import_products_excel(upload))
+
+    assert result["created"] == 1
+    assert result["errors"] == []
+    [product] = stored_products(db)
+    assert product["product_code"] == "TAB-1"
+    assert product["description"] == "Dining table"
+    assert (product["height_cm"], product["depth_cm"], product["width_cm"]) == (85, 45, 160)
+    assert product["fob_price_usd"] == 250
+
+
+def test_errors_carry_sheet_row_numbers(db, xlsx):
+    # Sheet rows: 1 title, 2 header, 3 P-1, 4 no code, 5 P-1 again, 6 P-2
+    upload = xlsx(product_sheet(
+        product_row("P-1"),
+        [None, "Row without a code"],
+        product_row(" p-1 ", "Same code, other case and padding"),
+        product_row("P-2"),
+    ))
+
+    result = asyncio.run(server.import_products_excel(upload))
+
+    assert (result["created"], result["skipped"]) == (2, 1)
+    assert result["errors"] == ["Row 5: Product code 'P-1' already exists"]
+    assert [p["product_code"] for p in stored_products(db)] == ["P-1", "P-2"]
+
+
+def test_codes_repeated_within_a_library_sheet_are_rejected(db, xlsx):
+    # Headers in the first row: data starts at sheet row 2
+    upload = xlsx([
+        ["Code", "Name", "Color"],
+        ["LTH-01", "Tan", "Brown"],
+        ["lth-01", "Tan again", "Brown"],
+        ["LTH-02", "Black", "Black"],
+    ])
+
+    result = asyncio.run(server.import_leather_excel(upload))
+
+    assert result["created"] == 2
+    assert result["errors"] == ["Row 3: Code 'LTH-01' already exists"]
+    stored = asyncio.run(db.leather_library.find({}, {"_id": 0, "code": 1, "name": 1}).to_list(None))
+    assert sorted((doc["code"], doc["name"]) for doc in stored) == [("LTH-01", "Tan"), ("LTH-02", "Black")]
+
+
+def test_insert_mode_rejects_codes_already_stored(db, xlsx):
+    asyncio.run(server.import_products_excel(xlsx(product_sheet(product_row("P-1")))))
+
+    result = asyncio.run(server.import_products_excel(xlsx(product_sheet(product_row("P-1", price=999), product_row("P-2")))))
+
+    assert (result["mode"], result["created"], result["updated"], result["unchanged"]) == ("insert", 1, 0, 0)
+    assert result["errors"] == ["Row 3: Product code 'P-1' already exists"]
+    assert [p["fob_price_usd"] for p in stored_products(db)] == [250, 250]
+
+
+def test_upsert_counts_created_updated_and_unchanged(db, xlsx):
+    asyncio.run(server.import_products_excel(xlsx(product_sheet(product_row("P-1"), product_row("P-2")))))
+
+    result = asyncio.run(server.import_products_excel(
+        xlsx(product_sheet(product_row("P-1"), product_row("P-2", price=300), product_row("P-3"))),
+        mode="upsert",
+    ))
+
+    assert (result["mode"], result["created"], result["updated"], result["unchanged"]) == ("upsert", 1, 1, 1)
+    assert result["errors"] == []
+    assert [(p["product_code"], p["fob_price_usd"]) for p in stored_products(db)] == [
+        ("P-1", 250), ("P-2", 300), ("P-3", 250),
+    ]
+
+
+def test_dry_run_counts_without_writing(db, xlsx):
+    asyncio.run(server.import_products_excel(xlsx(product_sheet(product_row("P-1")))))
+    before = stored_products(db)
+
+    result = asyncio.run(server.import_products_excel(
+        xlsx(product_sheet(product_row("P-1", price=300), product_row("P-2"))),
+        mode="dry_run",
+    ))
+
+    assert (result["mode"], result["created"], result["updated"], result["unchanged"]) == ("dry_run", 1, 1, 0)
+    assert result["errors"] == []
+    assert result["message"] == "Dry run: 1 created, 1 updated, 0 unchanged"
+    assert [p["product_code"] for p in result["products"]] == ["P-2"]
+    assert stored_products(db) == before
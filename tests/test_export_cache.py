@@ -0,0 +1,72 @@
+"""Export cache on disk: deletes spare in-flight renders, and the cache stays under its size cap"""
+import asyncio
+import os
+import time
+
+import server
+
+
+def write(path, size, age_seconds):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age_seconds
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_invalidate_keeps_young_files_and_in_flight_renders(tmp_path):
+    cache = server.ExportCache(tmp_path, max_bytes=10**6)
+    old = write(cache.path("o1", '"old"', "pdf"), 10, age_seconds=3600)
+    young = write(cache.path("o1", '"young"', "pdf"), 10, age_seconds=1)
+    tmp = write(tmp_path / "o1" / "new.pdf.abc.tmp", 10, age_seconds=3600)
+    other = write(cache.path("o2", '"old"', "pdf"), 10, age_seconds=3600)
+
+    asyncio.run(cache.invalidate_order("o1"))
+
+    assert (old.exists(), young.exists(), tmp.exists(), other.exists()) == (False, True, True, True)
+
+    asyncio.run(cache.clear())
+
+    assert (young.exists(), tmp.exists(), other.exists()) == (True, True, False)
+
+
+def test_prune_drops_least_recently_used_files_first(tmp_path):
+    cache = server.ExportCache(tmp_path, max_bytes=250)
+    oldest = write(cache.path("o1", '"a"', "pdf"), 100, age_seconds=500)
+    used = write(cache.path("o2", '"b"', "pdf"), 100, age_seconds=400)
+    newer = write(cache.path("o3", '"c"', "pdf"), 100, age_seconds=300)
+    assert cache.touch(used)
+    stale_tmp = write(tmp_path / "o4" / "x.pdf.abc.tmp", 100, age_seconds=2 * server.EXPORT_CACHE_TMP_EXPIRY_SECONDS)
+
+    freed = cache.prune()
+
+    assert freed == 100
+    assert (oldest.exists(), used.exists(), newer.exists(), stale_tmp.exists()) == (False, True, True, False)
+    assert not cache.touch(oldest)
+
+
+def test_prune_never_deletes_files_inside_the_grace_period(tmp_path):
+    cache = server.ExportCache(tmp_path, max_bytes=0)
+    fresh = write(cache.path("o1", '"a"', "pdf"), 100, age_seconds=1)
+
+    assert cache.prune() == 0
+    assert fresh.exists()
+
+
+def test_render_recreates_a_directory_removed_mid_render(tmp_path):
+    path = tmp_path / "o1" / "etag.pdf"
+    calls = []
+
+    def render(order, settings, logo_bytes, output):
+        calls.append(output)
+        with open(output, "wb") as f:
+            f.write(b"%PDF")
+        if len(calls) == 1:
+            os.remove(output)
+            os.rmdir(path.parent)
+
+    server.render_file_atomically(render, {}, {}, b"", str(path))
+
+    assert len(calls) == 2
+    assert path.read_bytes() == b"%PDF"
+    assert os.listdir(path.parent) == ["etag.pdf"]
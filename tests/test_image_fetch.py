@@ -0,0 +1,53 @@
+"""Import image fetches: a slow host must not hold up the others"""
+import asyncio
+import io
+
+import httpx
+from PIL import Image
+
+import server
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def test_slow_host_does_not_take_every_global_slot(monkeypatch):
+    async def scenario():
+        release_slow = asyncio.Event()
+
+        async def fake_get(client, url, target, **kwargs):
+            if "slow.example" in url:
+                await release_slow.wait()
+            return httpx.Response(200, headers={"content-type": "image/png"}, content=png_bytes())
+
+        monkeypatch.setattr(server, "http_client", object())
+        monkeypatch.setattr(server, "fetch_semaphore", asyncio.Semaphore(2))
+        monkeypatch.setattr(server, "host_semaphores", {})
+        monkeypatch.setattr(server, "IMPORT_FETCH_PER_HOST", 1)
+        monkeypatch.setattr(server, "timed_get", fake_get)
+
+        slow = [asyncio.create_task(server.fetch_image_to_store(f"https://slow.example/{n}.png")) for n in range(3)]
+        await asyncio.sleep(0)
+        fast = await asyncio.wait_for(server.fetch_image_to_store("https://fast.example/a.png"), timeout=1)
+
+        assert fast
+        release_slow.set()
+        assert all(await asyncio.gather(*slow))
+    asyncio.run(scenario())
+
+
+def test_svg_from_a_photo_link_is_not_stored(monkeypatch):
+    async def fake_get(client, url, target, **kwargs):
+        return httpx.Response(200, headers={"content-type": "image/svg+xml"}, content=b'<svg xmlns="x"/>')
+
+    monkeypatch.setattr(server, "http_client", object())
+    monkeypatch.setattr(server, "host_semaphores", {})
+    monkeypatch.setattr(server, "timed_get", fake_get)
+
+    async def scenario():
+        monkeypatch.setattr(server, "fetch_semaphore", asyncio.Semaphore(1))
+        return await server.fetch_image_to_store("https://cdn.example/logo.svg")
+    assert asyncio.run(scenario()) == ''
@@ -0,0 +1,110 @@
+"""Background jobs: leases keep a live worker's job, stale ones are retried up to a cap"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import server
+
+
+def iso(seconds_ago: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)).isoformat()
+
+
+async def running_job(db, job_id, heartbeat_seconds_ago, attempts=1, owner="other-host:1:abc"):
+    job = server.Job(id=job_id, kind="echo", status="running", attempts=attempts).model_dump()
+    job.update(owner=owner, heartbeat_at=iso(heartbeat_seconds_ago), params={})
+    await db.jobs.insert_one(job)
+
+
+async def wait_for(db, job_id, status, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} is {job['status']}, not {status}")
+
+
+def runner(runs):
+    job_runner = server.JobRunner(1, lease_seconds=60, max_attempts=2)
+
+    async def echo(ctx):
+        runs.append(ctx.id)
+        return {"ok": True}
+    job_runner.register("echo", echo)
+    return job_runner
+
+
+def test_submitted_job_runs_once_and_records_its_owner(db):
+    async def scenario():
+        runs = []
+        job_runner = runner(runs)
+        await job_runner.start()
+        try:
+            job = await job_runner.submit("echo", {})
+            done = await wait_for(db, job["id"], "completed")
+        finally:
+            await job_runner.stop()
+        assert runs == [job["id"]]
+        assert (done["attempts"], done["owner"], done["result"]) == (1, job_runner.owner, {"ok": True})
+    asyncio.run(scenario())
+
+
+def test_startup_leaves_a_live_workers_job_alone(db):
+    async def scenario():
+        runs = []
+        await running_job(db, "live", heartbeat_seconds_ago=5)
+        job_runner = runner(runs)
+        await job_runner.start()
+        await asyncio.sleep(0.05)
+        await job_runner.stop()
+        job = await db.jobs.find_one({"id": "live"}, {"_id": 0})
+        assert (job["status"], job["owner"], runs) == ("running", "other-host:1:abc", [])
+    asyncio.run(scenario())
+
+
+def test_job_with_a_lapsed_lease_is_run_again(db):
+    async def scenario():
+        runs = []
+        await running_job(db, "stale", heartbeat_seconds_ago=600)
+        job_runner = runner(runs)
+        await job_runner.start()
+        try:
+            done = await wait_for(db, "stale", "completed")
+        finally:
+            await job_runner.stop()
+        assert runs == ["stale"]
+        assert (done["attempts"], done["owner"]) == (2, job_runner.owner)
+    asyncio.run(scenario())
+
+
+def test_job_that_used_its_attempts_fails_instead_of_retrying(db):
+    async def scenario():
+        runs = []
+        await running_job(db, "crashy", heartbeat_seconds_ago=600, attempts=2)
+        job_runner = runner(runs)
+        await job_runner.start()
+        await job_runner.stop()
+        job = await db.jobs.find_one({"id": "crashy"}, {"_id": 0})
+        assert job["status"] == "failed"
+        assert "gave up after 2 attempts" in job["error"]
+        assert runs == []
+    asyncio.run(scenario())
+
+
+def test_shutdown_hands_a_running_job_back_without_using_an_attempt(db):
+    async def scenario():
+        started = asyncio.Event()
+        job_runner = server.JobRunner(1, lease_seconds=60, max_attempts=2)
+
+        async def slow(ctx):
+            started.set()
+            await asyncio.sleep(60)
+        job_runner.register("slow", slow)
+        await job_runner.start()
+        job = await job_runner.submit("slow", {})
+        await started.wait()
+        await job_runner.stop()
+        stored = await db.jobs.find_one({"id": job["id"]}, {"_id": 0})
+        assert (stored["status"], stored["attempts"], stored["owner"]) == ("queued", 0, "")
+    asyncio.run(scenario())
@@ -0,0 +1,73 @@
+"""Keyset pagination: fetch_page cursors walk a listing once, newest first"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def seed_orders(db, created_at_values):
+    docs = [
+        {"id": f"order-{n:02d}", "created_at": created_at, "buyer_name": "Acme" if n % 2 else "Other", "items": []}
+        for n, created_at in enumerate(created_at_values)
+    ]
+    asyncio.run(db.orders.insert_many([dict(doc) for doc in docs]))
+    return docs
+
+
+def walk(db, query, limit):
+    """Every page of a listing, following cursors until the last page"""
+    pages = []
+    cursor = None
+    while True:
+        docs, cursor = asyncio.run(server.fetch_page(db.orders, query, limit, cursor, None))
+        pages.append([doc["id"] for doc in docs])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trips():
+    doc = {"created_at": "2025-01-02T03:04:05+00:00", "id": "order-01"}
+    assert server.decode_cursor(server.encode_cursor(doc)) == (doc["created_at"], doc["id"])
+
+
+def test_invalid_cursor_is_a_400():
+    with pytest.raises(HTTPException) as raised:
+        server.decode_cursor("not-a-cursor")
+    assert raised.value.status_code == 400
+
+
+def test_pages_cover_the_listing_once_newest_first(db):
+    docs = seed_orders(db, [f"2025-01-{day:02d}T00:00:00+00:00" for day in range(1, 8)])
+
+    pages = walk(db, {}, 3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    newest_first = [doc["id"] for doc in sorted(docs, key=lambda doc: doc["created_at"], reverse=True)]
+    assert sum(pages, []) == newest_first
+
+
+def test_equal_timestamps_are_ordered_by_id(db):
+    seed_orders(db, ["2025-01-01T00:00:00+00:00"] * 5)
+
+    pages = walk(db, {}, 2)
+
+    assert sum(pages, []) == ["order-04", "order-03", "order-02", "order-01", "order-00"]
+
+
+def test_cursor_keeps_a_search_filter(db):
+    seed_orders(db, [f"2025-01-{day:02d}T00:00:00+00:00" for day in range(1, 8)])
+
+    pages = walk(db, server.search_filter("acme", ["buyer_name", "sales_order_ref"]), 2)
+
+    assert sum(pages, []) == ["order-05", "order-03", "order-01"]
+
+
+def test_without_a_limit_everything_comes_back_in_one_page(db):
+    seed_orders(db, [f"2025-01-{day:02d}T00:00:00+00:00" for day in range(1, 4)])
+
+    docs, cursor = asyncio.run(server.fetch_page(db.orders, {}, None, None, None))
+
+    assert [doc["id"] for doc in docs] == ["order-02", "order-01", "order-00"]
+    assert cursor is None
@@ -0,0 +1,56 @@
+"""PDF image cache: scaled images stay JPEG (PNG with alpha), fitting ones pass through"""
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import server
+
+
+def encode(mode, size, fmt):
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red").save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def cached_bytes(reader):
+    return reader.fp.getvalue()
+
+
+def test_image_that_fits_its_box_keeps_its_bytes():
+    cache = server.ImageReaderCache(1024 * 1024, dpi=72)
+    data = encode('RGB', (100, 80), 'JPEG')
+
+    assert cached_bytes(cache.get(data, 200, 200)) == data
+
+
+def test_scaled_image_is_reencoded_as_jpeg():
+    cache = server.ImageReaderCache(1024 * 1024, dpi=72)
+
+    reader = cache.get(encode('RGB', (2000, 1500), 'PNG'), 200, 200)
+
+    assert reader.jpeg_fh() is not None
+    assert reader.getSize() == (200, 150)
+
+
+def test_scaled_image_with_alpha_stays_png():
+    cache = server.ImageReaderCache(1024 * 1024, dpi=72)
+
+    reader = cache.get(encode('RGBA', (800, 800), 'PNG'), 100, 100)
+
+    assert cached_bytes(reader).startswith(b'\x89PNG')
+    assert reader.getSize() == (100, 100)
+
+
+def test_repeated_lookups_hit_and_the_cache_stays_within_its_budget():
+    data = [encode('RGB', (400 + n, 400), 'PNG') for n in range(8)]
+    entry_size = len(server.ImageReaderCache(1024 * 1024, dpi=72)._prescale(data[0], 50, 50))
+    cache = server.ImageReaderCache(entry_size * 3, dpi=72)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda n: cache.get(data[n % 8], 50, 50), range(64)))
+    stats = cache.stats()
+
+    assert stats["hits"] + stats["misses"] == 64
+    assert stats["size_bytes"] <= cache.max_bytes
+    assert stats["size_bytes"] == sum(len(encoded) for encoded in cache._entries.values())
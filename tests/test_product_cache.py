@@ -0,0 +1,98 @@
+"""Product cache: every worker sees another worker's write on its next lookup"""
+import asyncio
+
+import server
+
+
+async def add_product(db, product_id, code, price=100):
+    doc = server.with_product_keys(server.Product(id=product_id, product_code=code, fob_price_usd=price).model_dump())
+    await db.products.insert_one(doc)
+
+
+async def write_in_other_worker(db, product_id, **changes):
+    """What another uvicorn worker's product write does to the shared database"""
+    await db.products.update_one({"id": product_id}, {"$set": changes})
+    await db.counters.update_one({"id": server.CATALOG_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True)
+
+
+def test_lookups_see_another_workers_write_at_once(db):
+    async def scenario():
+        cache = server.ProductCache(1024 * 1024)
+        await add_product(db, "p1", "TAB-1")
+        assert (await cache.get("p1"))["fob_price_usd"] == 100
+        assert (await cache.get("p1"))["fob_price_usd"] == 100  # served from the cache
+
+        await write_in_other_worker(db, "p1", fob_price_usd=250)
+
+        assert (await cache.get("p1"))["fob_price_usd"] == 250
+    asyncio.run(scenario())
+
+
+class RacingProducts:
+    """db.products whose find_one returns the stored doc, then lets another worker write"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __getattr__(self, name):
+        return getattr(self.db.products, name)
+
+    async def find_one(self, *args, **kwargs):
+        doc = await self.db.products.find_one(*args, **kwargs)
+        await write_in_other_worker(self.db, "p1", fob_price_usd=250)
+        return doc
+
+
+class RacingDatabase:
+    def __init__(self, db):
+        self.db = db
+        self.products = RacingProducts(db)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+def test_read_racing_a_write_is_not_served_after_it(db, monkeypatch):
+    async def scenario():
+        cache = server.ProductCache(1024 * 1024)
+        await add_product(db, "p1", "TAB-1")
+
+        monkeypatch.setattr(server, "db", RacingDatabase(db))
+        assert (await cache.get("p1"))["fob_price_usd"] == 100
+        monkeypatch.setattr(server, "db", db)
+
+        assert (await cache.get("p1"))["fob_price_usd"] == 250
+    asyncio.run(scenario())
+
+
+def test_code_lookups_are_normalized_and_cached(db):
+    async def scenario():
+        cache = server.ProductCache(1024 * 1024)
+        await add_product(db, "p1", "TAB-1")
+
+        assert (await cache.get_by_code(" tab-1 "))["id"] == "p1"
+        assert "p1" in cache._entries
+        assert (await cache.get_by_code("TAB-1"))["id"] == "p1"
+        assert await cache.get_by_code("TAB-2") is None
+    asyncio.run(scenario())
+
+
+def test_create_and_update_reject_duplicate_codes(db):
+    async def scenario():
+        await add_product(db, "p1", "TAB-1")
+        await add_product(db, "p2", "TAB-2")
+        try:
+            await server.create_product(server.ProductCreate(product_code="tab-1"))
+        except server.HTTPException as e:
+            assert e.status_code == 400
+        else:
+            raise AssertionError("duplicate code was accepted")
+        try:
+            await server.update_product("p2", server.ProductUpdate(product_code="Tab-1"))
+        except server.HTTPException as e:
+            assert e.status_code == 400
+        else:
+            raise AssertionError("duplicate code was accepted")
+        # Keeping its own code is not a duplicate
+        assert (await server.update_product("p1", server.ProductUpdate(product_code="TAB-1")))["id"] == "p1"
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+"""Product picker search: code prefixes first, then word prefixes of the description"""
+import asyncio
+import json
+
+from pymongo.errors import OperationFailure
+
+import server
+
+
+class ProductsWithoutTextIndex:
+    """db.products as Mongo behaves before the text index exists"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __getattr__(self, name):
+        return getattr(self.db.products, name)
+
+    def find(self, query, *args, **kwargs):
+        if "$text" in query:
+            raise OperationFailure("text index required for $text query", code=27)
+        return self.db.products.find(query, *args, **kwargs)
+
+
+class DatabaseWithoutTextIndex:
+    def __init__(self, db):
+        self.db = db
+        self.products = ProductsWithoutTextIndex(db)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+def search(q, limit=20):
+    response = asyncio.run(server.search_products(q=q, limit=limit))
+    return [doc["product_code"] for doc in json.loads(response.body)]
+
+
+def seed(db, products):
+    for code, description in products:
+        product = server.Product(product_code=code, description=description)
+        asyncio.run(db.products.insert_one(server.with_product_keys(product.model_dump())))
+
+
+def test_code_prefix_then_description_word_prefix(db, monkeypatch):
+    monkeypatch.setattr(server, "db", DatabaseWithoutTextIndex(db))
+    seed(db, [
+        ("DIN-1", "Dining table"),
+        ("TAB-2", "Coffee table, round"),
+        ("X-4", "Sofa-dining set"),
+        ("CH-3", "Chair"),
+    ])
+
+    assert search("din") == ["DIN-1", "X-4"]
+    assert search("tab") == ["TAB-2", "DIN-1"]
+    assert search("dining ta") == ["DIN-1"]
+    assert search("ROUND") == ["TAB-2"]
+    assert search("sideboard") == []
+    assert search("") == ["CH-3", "DIN-1", "TAB-2", "X-4"]
+    assert search("", limit=2) == ["CH-3", "DIN-1"]
+
+
+def test_description_words_follow_updates(db, monkeypatch):
+    monkeypatch.setattr(server, "db", DatabaseWithoutTextIndex(db))
+    seed(db, [("P-1", "Dining table")])
+    [product] = asyncio.run(db.products.find({}, {"_id": 0, "id": 1}).to_list(None))
+
+    asyncio.run(server.update_product(product["id"], server.ProductUpdate(description="Oak bench")))
+
+    assert search("ben") == ["P-1"]
+    assert search("din") == []
+
+
+def test_backfill_adds_lookup_keys_to_old_products(db):
+    asyncio.run(db.products.insert_one({"id": "p1", "product_code": " tab-1", "description": "Dining Table"}))
+
+    assert asyncio.run(server.backfill_product_keys()) == 1
+
+    stored = asyncio.run(db.products.find_one({"id": "p1"}, {"_id": 0}))
+    assert stored["product_code_key"] == "TAB-1"
+    assert stored["description_words"] == ["dining", "table"]